@@ -0,0 +1,320 @@
+"""
+Agent graph benchmark harness.
+
+Drives the real agent graphs offline and deterministically:
+
+- brainstorming: brainstorming_agent.agent.graph, from the question through
+  retrieval, grading and the answer to the feedback interrupt and its resume
+- coordinator: coordinator_agent, which calls both sub-agents on every turn
+- feedback: feedback_agent
+- researcher: research(), the researcher agent behind its answer cache
+
+Every model profile in the registry is replaced by a scripted ScriptedChatModel.
+Embeddings come from the hashing embedder. Retrieval runs against a fixture index
+built from the PDFs in data/bsky-docs, split with a character splitter so no
+tokenizer download is needed. Answer caches are disabled unless --answer-cache
+is given, so every turn takes the full path.
+
+For each target it reports:
+- end-to-end turn latency (mean, p50, p95, p99)
+- LLM calls and input/output tokens per turn
+- per-node latency and calls per turn, keyed by node path, e.g. "tools/model" for
+  a sub-agent's model node inside the coordinator's tools node
+- each graph's node list and the top retrieved sources per question, so changes
+  to graph structure or retrieval show up as a diff of the JSON output
+- the snapshot of the built-in instrumentation (src/utils/instrumentation.py)
+
+Usage (from the project root):
+    python benchmarks/agent_graphs.py [--targets brainstorming coordinator feedback researcher]
+        [--conversations 12] [--turns 2] [--latency 0.0] [--answer-cache] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+sys.path.insert(0, ".")
+# Provider clients are constructed at import time; the fakes never call them
+for variable in ("OPENAI_API_KEY", "ANTHROPIC_API_KEY", "TAVILY_API_KEY"):
+    os.environ.setdefault(variable, "benchmark")
+os.environ["RAG_WARM_UP"] = "0"
+# Labels created by the run stay in memory instead of the local label store
+os.environ.setdefault("LABEL_STORE_PATH", ":memory:")
+# The brainstorming graph interrupts for feedback, which needs a checkpointer
+if os.getenv("CHECKPOINTER", "none") == "none":
+    os.environ["CHECKPOINTER"] = "memory"
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from langgraph.types import Command
+
+from benchmarks.fakes import ScriptedChatModel
+from benchmarks.relevance_grading import HashingEmbeddings
+from src.utils.local_corpus import ParsedTextCache, load_local_documents
+from src.utils.instrumentation import metrics
+from src.utils.model_registry import registry
+from src.utils.vector_store import NumpyVectorStore
+
+DEFAULT_QUESTIONS = "benchmarks/fixtures/agent_questions.json"
+CORPUS = "data/bsky-docs"
+TARGETS = ["brainstorming", "coordinator", "feedback", "researcher"]
+
+# ---- Fakes ----
+
+def _brainstorming_script(messages):
+    # The agent node (system prompt first) retrieves for the question; every other
+    # call (rewrite, answer, summary) is a plain prompt answered directly
+    if isinstance(messages[0], SystemMessage) and isinstance(messages[-1], HumanMessage):
+        return [("retrieve_bsky_docs", {"query": messages[-1].text})]
+    return None
+
+def _claude_script(messages):
+    # Shared by the researcher and feedback agents; the system prompt tells them apart
+    if not isinstance(messages[-1], HumanMessage):
+        return None
+    system = messages[0].text if isinstance(messages[0], SystemMessage) else ""
+    if "research agent" in system:
+        return [("retrieve_context", {"query": messages[-1].text})]
+    if "create a label" in system:
+        return [("get_label", {"identifier": "health_claims"})]
+    return None
+
+def install_fake_models(latency: float) -> None:
+    registry.register("openai", ScriptedChatModel(
+        latency=latency,
+        script=_brainstorming_script,
+        structured={"EvaluateDocument": {"binary_score": "yes"}},
+    ))
+    registry.register("claude", ScriptedChatModel(latency=latency, script=_claude_script))
+    registry.register("coordinator", ScriptedChatModel(
+        latency=latency,
+        tool_calls=[("retrieve_additional_context", "query"), ("provide_feedback_on_label", "request")],
+    ))
+    # src/__init__ built the shared Claude model when the registry was imported; the
+    # agents import it from there, so rebind it before any agent module is loaded
+    import src
+    src.model = registry.get("claude")
+
+def install_fake_embeddings(embeddings) -> None:
+    from src.utils import embedding_cache
+    for model in (None, "text-embedding-3-large"):
+        embedding_cache._shared[model] = embedding_cache.CachedEmbeddings(embeddings)
+
+def build_fixture_store(embeddings, cache_dir: str) -> NumpyVectorStore:
+    docs = load_local_documents(CORPUS, ParsedTextCache(cache_dir))
+    splits = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200).split_documents(docs)
+    return NumpyVectorStore.from_texts(
+        [split.page_content for split in splits], embeddings, [split.metadata for split in splits]
+    )
+
+def use_store(manager, store) -> None:
+    manager.set_builder(lambda refresh=False: store)
+
+# ---- Recording ----
+
+def _percentiles(values: list[float]) -> dict:
+    if not values:
+        return {}
+    if len(values) == 1:
+        return {"mean": values[0], "p50": values[0], "p95": values[0], "p99": values[0]}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {"mean": statistics.fmean(values), "p50": cuts[49], "p95": cuts[94], "p99": cuts[98]}
+
+def _round(stats: dict, digits: int = 6) -> dict:
+    return {key: round(value, digits) for key, value in stats.items()}
+
+class Recorder(BaseCallbackHandler):
+    """Collects node timings, LLM calls and tokens from the callbacks of a graph run."""
+
+    run_inline = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = {}
+        self.node_seconds = defaultdict(list)
+        self.llm_calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        metadata = metadata or {}
+        node = metadata.get("langgraph_node")
+        # Only the node's own run, not the runnables nested inside it
+        if node and kwargs.get("name") == node:
+            namespace = metadata.get("langgraph_checkpoint_ns", node)
+            path = "/".join(part.split(":")[0] for part in namespace.split("|"))
+            with self._lock:
+                self._started[run_id] = (path, time.perf_counter())
+
+    def _finish(self, run_id):
+        with self._lock:
+            started = self._started.pop(run_id, None)
+            if started:
+                path, start = started
+                self.node_seconds[path].append(time.perf_counter() - start)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        # Interrupts surface as errors; the node still ran
+        self._finish(run_id)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        with self._lock:
+            self.llm_calls += 1
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        with self._lock:
+            for generations in response.generations:
+                for generation in generations:
+                    usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                    self.input_tokens += usage.get("input_tokens", 0)
+                    self.output_tokens += usage.get("output_tokens", 0)
+
+# ---- Targets ----
+# Each returns (graph, run_turn), where run_turn(conversation, question, config) runs one turn
+
+def brainstorming_target():
+    from brainstorming_agent.agent import graph
+
+    def run_turn(conversation, question, config):
+        config = {**config, "configurable": {"thread_id": f"brainstorming-{conversation}"}}
+        graph.invoke({"messages": [{"role": "user", "content": question}]}, config)
+        graph.invoke(Command(resume="Looks good, thanks"), config)
+
+    return graph, run_turn
+
+def coordinator_target():
+    from src.coordinator_agent import coordinator_agent
+
+    def run_turn(conversation, question, config):
+        config = {**config, "configurable": {"thread_id": f"coordinator-{conversation}"}}
+        coordinator_agent.invoke({"messages": [{"role": "user", "content": question}]}, config)
+
+    return coordinator_agent, run_turn
+
+def feedback_target():
+    from src.feedback_agent import feedback_agent
+
+    def run_turn(conversation, question, config):
+        feedback_agent.invoke({"messages": [{"role": "user", "content": question}]}, config)
+
+    return feedback_agent, run_turn
+
+def researcher_target():
+    from src import researcher_agent
+    from langchain_core.runnables import RunnableLambda
+
+    # research() is a plain function; wrapping it gives its calls a callback context
+    research = RunnableLambda(researcher_agent.research)
+
+    def run_turn(conversation, question, config):
+        research.invoke(question, config)
+
+    return researcher_agent.researcher_agent, run_turn
+
+# ---- Runner ----
+
+def run_target(name, questions, conversations, turns) -> dict:
+    graph, run_turn = globals()[f"{name}_target"]()
+    recorder = Recorder()
+    config = {"callbacks": [recorder]}
+    metrics.reset()
+
+    latencies, calls, input_tokens, output_tokens = [], [], [], []
+    for conversation in range(conversations):
+        for turn in range(turns):
+            question = questions[(conversation * turns + turn) % len(questions)]
+            before = (recorder.llm_calls, recorder.input_tokens, recorder.output_tokens)
+            start = time.perf_counter()
+            run_turn(conversation, question, config)
+            latencies.append(time.perf_counter() - start)
+            calls.append(recorder.llm_calls - before[0])
+            input_tokens.append(recorder.input_tokens - before[1])
+            output_tokens.append(recorder.output_tokens - before[2])
+
+    total_turns = len(latencies)
+    nodes = {
+        path: {"calls_per_turn": round(len(seconds) / total_turns, 3), **_round(_percentiles(seconds))}
+        for path, seconds in sorted(recorder.node_seconds.items())
+    }
+    return {
+        "target": name,
+        "turns": total_turns,
+        "latency_seconds": _round(_percentiles(latencies)),
+        "llm_calls_per_turn": _round(_percentiles(calls), 3),
+        "input_tokens_per_turn": _round(_percentiles(input_tokens), 1),
+        "output_tokens_per_turn": _round(_percentiles(output_tokens), 1),
+        "nodes": nodes,
+        "graph_nodes": list(graph.get_graph().nodes),
+        # What the built-in instrumentation recorded for the same turns
+        "instrumentation": metrics.snapshot(),
+    }
+
+def retrieval_fingerprint(store, questions) -> dict:
+    from src.utils.indexing import search_index
+    return {
+        question: [doc.metadata.get("title") or doc.metadata.get("source") for doc in search_index(store, question, k=2)]
+        for question in questions
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=TARGETS)
+    parser.add_argument("--questions", default=DEFAULT_QUESTIONS)
+    parser.add_argument("--conversations", type=int, default=12)
+    parser.add_argument("--turns", type=int, default=2, help="turns per conversation")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated seconds per model call")
+    parser.add_argument("--answer-cache", action="store_true", help="keep the semantic answer caches on")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    with open(args.questions, encoding="utf-8") as questions_file:
+        questions = json.load(questions_file)
+
+    embeddings = HashingEmbeddings()
+    install_fake_models(args.latency)
+    install_fake_embeddings(embeddings)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = time.perf_counter()
+        store = build_fixture_store(embeddings, cache_dir)
+        index_seconds = time.perf_counter() - start
+
+    from src import researcher_agent
+    from brainstorming_agent.utils import nodes, tools
+    use_store(tools.index_manager, store)
+    use_store(researcher_agent.index_manager, store)
+    if not args.answer_cache:
+        # A threshold above 1 can never match
+        nodes.answer_cache.threshold = 1.1
+        researcher_agent.answer_cache.threshold = 1.1
+
+    results = {
+        "config": {
+            "conversations": args.conversations,
+            "turns": args.turns,
+            "latency": args.latency,
+            "answer_cache": args.answer_cache,
+        },
+        "fixture": {"corpus": CORPUS, "chunks": len(store.ids), "index_seconds": round(index_seconds, 3)},
+        "retrieval": retrieval_fingerprint(store, questions),
+        "targets": [run_target(name, questions, args.conversations, args.turns) for name in args.targets],
+    }
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(results, output_file, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
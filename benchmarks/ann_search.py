@@ -0,0 +1,77 @@
+"""
+ANN recall/latency benchmark.
+
+Measures recall@k and per-query latency of the IVF index (and hnswlib when it
+is installed) against exact NumpyVectorStore search. The corpus is a synthetic
+Gaussian mixture, which is closer to real embedding clusters than uniform noise.
+
+Usage (from the project root):
+    python benchmarks/ann_search.py [--size 100000] [--dim 256] [--queries 100] [--k 4]
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+sys.path.insert(0, ".")
+from src.utils.ann_index import hnswlib, make_ann_index
+from src.utils.vector_store import NumpyVectorStore
+
+def make_corpus(size: int, dim: int, n_queries: int, clusters: int = 200, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    corpus = centers[rng.integers(0, clusters, size)] + 0.5 * rng.standard_normal((size, dim), dtype=np.float32)
+    queries = centers[rng.integers(0, clusters, n_queries)] + 0.5 * rng.standard_normal((n_queries, dim), dtype=np.float32)
+    return corpus, queries
+
+def search_ids(store: NumpyVectorStore, queries: np.ndarray, k: int) -> tuple[list[set], float]:
+    results, start = [], time.perf_counter()
+    for query in queries:
+        results.append({doc.id for doc in store.similarity_search_by_vector(query, k=k)})
+    per_query_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    return results, per_query_ms
+
+def run(size: int, dim: int, n_queries: int, k: int) -> list[dict]:
+    corpus, queries = make_corpus(size, dim, n_queries)
+    texts = [str(i) for i in range(size)]
+    metadatas = [{} for _ in texts]
+    embedding = DeterministicFakeEmbedding(size=dim)
+
+    exact = NumpyVectorStore.from_matrix(corpus, texts, metadatas, embedding)
+    truth, exact_ms = search_ids(exact, queries, k)
+    rows = [{"mode": "exact", "recall": 1.0, "query_ms": exact_ms, "build_s": 0.0}]
+
+    configs = [{"mode": "ivf", "n_probe": n_probe} for n_probe in (1, 2, 4, 8, 16, 32)]
+    if hnswlib is not None:
+        configs += [{"mode": "hnsw", "ef_search": ef} for ef in (16, 32, 64, 128)]
+
+    for config in configs:
+        start = time.perf_counter()
+        store = NumpyVectorStore.from_matrix(
+            exact.matrix, texts, metadatas, embedding, normalized=True, ann_index=make_ann_index(config)
+        )
+        build_s = time.perf_counter() - start
+        found, query_ms = search_ids(store, queries, k)
+        recall = float(np.mean([len(a & b) / k for a, b in zip(found, truth)]))
+        rows.append({**config, "recall": recall, "query_ms": query_ms, "build_s": build_s})
+
+    return [{"size": size, "dim": dim, "k": k, **row} for row in rows]
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=4)
+    args = parser.parse_args()
+
+    for row in run(args.size, args.dim, args.queries, args.k):
+        print(json.dumps(row))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
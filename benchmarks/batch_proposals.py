@@ -0,0 +1,111 @@
+"""
+Batch proposal benchmark.
+
+Runs the batch proposal agent end to end (propose, the single review interrupt,
+resume with approve-all) on generated CSVs of label requests. Every batch size
+is run with the same concurrency and rate limit. The report covers:
+
+- proposals per second, which should track min(concurrency / latency, rate limit)
+- peak traced Python memory during the run, which should stay flat as the batch
+  grows because requests are read and results written one at a time
+- counts by status; every 10th request gets an identifier export would reject and
+  every 25th repeats an earlier one, so the invalid paths are exercised too
+
+The model is a ScriptedChatModel fake with a fixed simulated latency.
+
+Usage (from the project root):
+    python benchmarks/batch_proposals.py [--sizes 100 500] [--concurrency 8] [--rate 50] [--latency 0.05]
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, ".")
+# Provider clients are constructed at import time; the fakes never call them
+for variable in ("OPENAI_API_KEY", "ANTHROPIC_API_KEY"):
+    os.environ.setdefault(variable, "benchmark")
+# Labels created by the run stay in memory instead of the local label store
+os.environ.setdefault("LABEL_STORE_PATH", ":memory:")
+
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.types import Command
+
+from benchmarks.fakes import ScriptedChatModel
+from src import batch_proposal_agent
+from src.utils.model_registry import registry
+
+def _label(messages) -> dict:
+    # The request is "Label <n>: ..."; n picks the identifier
+    n = int(re.search(r"Label (\d+)", messages[-1].content).group(1))
+    # Label values are letters only, so n is spelled with a-j
+    identifier = "label_" + "".join(chr(ord("a") + int(digit)) for digit in str(n))
+    if n % 10 == 9:
+        identifier = f"Label-{n}"
+    elif n % 25 == 24:
+        identifier = "label_a"
+    return {
+        "identifier": identifier,
+        "severity": "inform",
+        "blurs": "none",
+        "default_setting": "warn",
+        "locales": [{"lang": "en", "name": f"Label {n}", "description": f"Posts matching idea {n}"}],
+    }
+
+def write_requests(path: str, size: int) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["request"])
+        for n in range(size):
+            writer.writerow([f"Label {n}: flag posts that push idea {n} " + "with some extra context " * 10])
+
+def run(size: int, directory: str, concurrency: int, rate: float) -> dict:
+    source = os.path.join(directory, f"requests-{size}.csv")
+    output = os.path.join(directory, f"proposals-{size}.jsonl")
+    write_requests(source, size)
+
+    graph = batch_proposal_agent.build_workflow(directory).compile(checkpointer=InMemorySaver())
+    config = {"configurable": {"thread_id": f"batch-{size}"}}
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    state = graph.invoke(
+        {"source": source, "output": output, "max_concurrency": concurrency, "requests_per_second": rate}, config
+    )
+    propose_seconds = time.perf_counter() - start
+    state = graph.invoke(Command(resume={"default": "approve"}), config)
+    total_seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "size": size,
+        "proposals_per_second": round(size / propose_seconds, 1),
+        "propose_seconds": round(propose_seconds, 3),
+        "total_seconds": round(total_seconds, 3),
+        "peak_traced_mb": round(peak / 2**20, 2),
+        **{key: state.get(key) for key in ("proposed", "invalid", "failed", "approved", "rejected")},
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500])
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=50.0, help="requests per second")
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated seconds per model call")
+    args = parser.parse_args()
+
+    registry.register("claude", ScriptedChatModel(latency=args.latency, structured={"LabelValueDefinition": _label}))
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            print(json.dumps(run(size, directory, args.concurrency, args.rate)))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Checkpointer benchmark.
+
+Runs a small message-appending graph for a growing number of turns on several
+threads and reports, at each checkpointed turn count, the per-turn write latency
+(one invoke, which saves the checkpoints and pending writes of the turn) and
+read latency (get_state) for:
+
+- memory: InMemorySaver
+- sqlite: stock SqliteSaver, one commit per write
+- batched: BatchedSqliteSaver, WAL + synchronous=NORMAL, batched commits and pruning
+
+Each turn appends a user and an assistant message of --message-words words, so
+state size grows with the conversation the way a real chat does.
+
+Usage (from the project root):
+    python benchmarks/checkpointer.py [--turns 200] [--threads 4] [--report-every 50] [--message-words 60]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+sys.path.insert(0, ".")
+from src.utils.checkpointing import BatchedSqliteSaver
+
+def build_graph(checkpointer, words: int):
+    def respond(state):
+        return {"messages": [AIMessage(content=" ".join(["reply"] * words))]}
+
+    workflow = StateGraph(MessagesState)
+    workflow.add_node("respond", respond)
+    workflow.add_edge(START, "respond")
+    workflow.add_edge("respond", END)
+    return workflow.compile(checkpointer=checkpointer)
+
+def make_savers(directory: str) -> dict:
+    stock = SqliteSaver(sqlite3.connect(os.path.join(directory, "stock.sqlite"), check_same_thread=False))
+    return {
+        "memory": InMemorySaver(),
+        "sqlite": stock,
+        "batched": BatchedSqliteSaver.from_path(os.path.join(directory, "batched.sqlite")),
+    }
+
+def run(saver, turns: int, threads: int, report_every: int, words: int) -> list[dict]:
+    graph = build_graph(saver, words)
+    message = " ".join(["question"] * words)
+    rows, writes, reads = [], [], []
+    for turn in range(1, turns + 1):
+        for thread in range(threads):
+            config = {"configurable": {"thread_id": f"thread-{thread}"}}
+            start = time.perf_counter()
+            graph.invoke({"messages": [{"role": "user", "content": message}]}, config)
+            writes.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            graph.get_state(config)
+            reads.append(time.perf_counter() - start)
+        if turn % report_every == 0:
+            rows.append({
+                "turns": turn,
+                "write_ms_p50": round(statistics.median(writes) * 1000, 3),
+                "write_ms_max": round(max(writes) * 1000, 3),
+                "read_ms_p50": round(statistics.median(reads) * 1000, 3),
+                "read_ms_max": round(max(reads) * 1000, 3),
+            })
+            writes, reads = [], []
+    return rows
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--report-every", type=int, default=50)
+    parser.add_argument("--message-words", type=int, default=60)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, saver in make_savers(directory).items():
+            for row in run(saver, args.turns, args.threads, args.report_every, args.message_words):
+                print(json.dumps({"checkpointer": name, **row}))
+            if isinstance(saver, BatchedSqliteSaver):
+                saver.flush()
+                print(json.dumps({"checkpointer": name, "compacted": False, **saver.stats()}))
+                saver.compact()
+                print(json.dumps({"checkpointer": name, "compacted": True, **saver.stats()}))
+                saver.close()
+            elif isinstance(saver, SqliteSaver):
+                saver.conn.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Coordinator load test.
+
+Drives the coordinator with many concurrent conversations and reports
+conversations per second for the sync path (invoke from a thread pool, as a
+threaded server would) and the async path (ainvoke on one event loop with
+asyncio.gather). Every turn calls both sub-agent tools, so the async path also
+shows the two sub-agent calls running concurrently within a conversation.
+
+All models are ScriptedChatModel fakes with a fixed simulated latency, so the
+numbers measure orchestration overhead rather than provider speed. The
+researcher's answer cache is disabled so every conversation reaches the
+sub-agents.
+
+Usage (from the project root):
+    python benchmarks/coordinator_load.py [--conversations 50] [--concurrency 10] [--latency 0.05]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, ".")
+# Provider clients are constructed at import time; the fakes never call them
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("ANTHROPIC_API_KEY", "benchmark")
+
+from langchain.agents import create_agent
+
+from benchmarks.fakes import ScriptedChatModel
+from benchmarks.relevance_grading import HashingEmbeddings
+from src import coordinator_agent, researcher_agent
+from src.utils.semantic_cache import SemanticCache
+
+def build_coordinator(latency: float, token_latency: float = 0.0):
+    """Rebuilds the coordinator and both sub-agents on fake models."""
+    researcher_agent.researcher_agent = create_agent(
+        ScriptedChatModel(latency=latency, token_latency=token_latency, answer_prefix="Research")
+    )
+    # A threshold above 1 can never match, so every query reaches the researcher
+    researcher_agent.answer_cache = SemanticCache(HashingEmbeddings(), threshold=1.1)
+    coordinator_agent.feedback_agent = create_agent(
+        ScriptedChatModel(latency=latency, token_latency=token_latency, answer_prefix="Feedback")
+    )
+
+    model = ScriptedChatModel(
+        latency=latency,
+        token_latency=token_latency,
+        tool_calls=[("retrieve_additional_context", "query"), ("provide_feedback_on_label", "request")],
+    )
+    return create_agent(
+        model,
+        tools=[coordinator_agent.retrieve_additional_context, coordinator_agent.provide_feedback_on_label],
+        system_prompt=coordinator_agent.COORDINATOR_AGENT_PROMPT,
+    )
+
+def _conversation(i: int) -> dict:
+    return {"messages": [{"role": "user", "content": f"label posts about topic {i}"}]}
+
+def run_sync(agent, conversations: int, concurrency: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda i: agent.invoke(_conversation(i)), range(conversations)))
+    return time.perf_counter() - start
+
+async def run_async(agent, conversations: int, concurrency: int) -> float:
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with limit:
+            return await agent.ainvoke(_conversation(i))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(conversations)))
+    return time.perf_counter() - start
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--conversations", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated seconds per model call")
+    args = parser.parse_args()
+
+    agent = build_coordinator(args.latency)
+    # One warm-up conversation per path so graph compilation is not timed
+    agent.invoke(_conversation(-1))
+    asyncio.run(agent.ainvoke(_conversation(-1)))
+
+    for mode, seconds in (
+        ("sync", run_sync(agent, args.conversations, args.concurrency)),
+        ("async", asyncio.run(run_async(agent, args.conversations, args.concurrency))),
+    ):
+        print(json.dumps({
+            "mode": mode,
+            "conversations": args.conversations,
+            "concurrency": args.concurrency,
+            "latency": args.latency,
+            "seconds": round(seconds, 3),
+            "conversations_per_second": round(args.conversations / seconds, 2),
+        }))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""
+Coordinator streaming benchmark.
+
+Checks that sub-agent output reaches the coordinator's stream while the nested
+chain is still running, and measures time-to-first-token against the time the
+non-streaming ainvoke takes to return. Uses the same fake coordinator as
+coordinator_load.py, with streaming fake models that emit one word per chunk.
+
+Three measurements per run:
+- ainvoke: seconds until the final coordinator answer is available
+- custom: stream_mode="custom" events forwarded from the sub-agents
+- events: on_chat_model_stream events seen by astream_events
+
+Usage (from the project root):
+    python benchmarks/coordinator_streaming.py [--latency 0.2] [--token-latency 0.01]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter
+
+from coordinator_load import build_coordinator, _conversation
+
+async def measure(agent) -> list[dict]:
+    start = time.perf_counter()
+    await agent.ainvoke(_conversation(0))
+    rows = [{"mode": "ainvoke", "first_token_seconds": None, "total_seconds": round(time.perf_counter() - start, 3)}]
+
+    start, first, kinds = time.perf_counter(), None, Counter()
+    async for event in agent.astream(_conversation(1), stream_mode="custom"):
+        if first is None and event.get("type") == "token":
+            first = time.perf_counter() - start
+        kinds[f"{event['agent']}:{event['type']}"] += 1
+    rows.append({
+        "mode": "custom",
+        "first_token_seconds": round(first, 3) if first is not None else None,
+        "total_seconds": round(time.perf_counter() - start, 3),
+        "events": dict(kinds),
+    })
+
+    start, first, count = time.perf_counter(), None, 0
+    async for event in agent.astream_events(_conversation(2), version="v2"):
+        if event["event"] == "on_chat_model_stream" and event["data"]["chunk"].text:
+            first = first if first is not None else time.perf_counter() - start
+            count += 1
+    rows.append({
+        "mode": "events",
+        "first_token_seconds": round(first, 3) if first is not None else None,
+        "total_seconds": round(time.perf_counter() - start, 3),
+        "token_events": count,
+    })
+    return rows
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.2, help="simulated seconds before a model's first chunk")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="simulated seconds between chunks")
+    args = parser.parse_args()
+
+    agent = build_coordinator(args.latency, token_latency=args.token_latency)
+    for row in asyncio.run(measure(agent)):
+        print(json.dumps(row))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
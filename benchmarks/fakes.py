@@ -0,0 +1,173 @@
+"""
+Offline fakes for benchmarks.
+
+ScriptedChatModel stands in for a provider chat model: it sleeps for a fixed
+latency (time.sleep when called synchronously, asyncio.sleep when awaited, like
+a real HTTP round trip would block or yield) and answers from the conversation
+alone, so one instance can be shared by concurrent conversations.
+
+Streaming (_stream/_astream) waits the same latency before the first chunk and
+then emits the answer word by word, token_latency apart, so time-to-first-token
+can be measured separately from total time.
+
+If tool_calls is set, a turn that ends with a user message is answered with one
+call per configured tool, all in the same message; once the tool results are in
+the model replies with a final answer. Without tool_calls it always answers
+directly. For anything more specific, script maps the conversation to the tool
+calls to make, as (name, args) pairs, or None to answer directly.
+
+with_structured_output(schema) returns the values in structured[schema name]
+(schema defaults otherwise), still as one model call with simulated latency. A
+callable entry is called with the conversation and returns the values.
+
+Usage:
+    from benchmarks.fakes import ScriptedChatModel
+    model = ScriptedChatModel(latency=0.05, tool_calls=[("retrieve_additional_context", "query")])
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from typing import AsyncIterator, Callable, Iterator
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+
+def _text(message: BaseMessage) -> str:
+    return message.content if isinstance(message.content, str) else str(message.content)
+
+def _token_count(messages: list[BaseMessage]) -> int:
+    # Whitespace tokens are close enough to compare runs against each other
+    return sum(len(_text(message).split()) for message in messages)
+
+class ScriptedChatModel(BaseChatModel):
+    """Deterministic, stateless chat model with simulated latency."""
+
+    latency: float = 0.05
+    token_latency: float = 0.0
+    answer_prefix: str = "Answer"
+    tool_calls: list[tuple[str, str]] = []
+    script: Callable[[list[BaseMessage]], list[tuple[str, dict]] | None] | None = None
+    structured: dict[str, dict | Callable[[list[BaseMessage]], dict]] = {}
+    # Tool results quoted in the final answer are cut to this many words
+    quote_words: int = 30
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def with_structured_output(self, schema, **kwargs):
+        return self.bind(structured_schema=schema.__name__) | RunnableLambda(
+            lambda message: schema.model_validate_json(message.content)
+        )
+
+    def _planned_calls(self, messages: list[BaseMessage]) -> list[tuple[str, dict]]:
+        if self.script is not None:
+            return self.script(messages) or []
+        last = messages[-1]
+        if self.tool_calls and isinstance(last, HumanMessage):
+            return [(name, {arg: _text(last)}) for name, arg in self.tool_calls]
+        return []
+
+    def _reply(self, messages: list[BaseMessage], structured_schema: str | None = None) -> AIMessage:
+        calls = []
+        if structured_schema is not None:
+            values = self.structured.get(structured_schema, {})
+            content = json.dumps(values(messages) if callable(values) else values)
+        else:
+            calls = [
+                {"name": name, "args": args, "id": f"call_{uuid.uuid4().hex[:12]}", "type": "tool_call"}
+                for name, args in self._planned_calls(messages)
+            ]
+            content = ""
+            if not calls:
+                question = next((_text(m) for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+                results = [" ".join(_text(m).split()[:self.quote_words]) for m in messages if isinstance(m, ToolMessage)]
+                content = f"{self.answer_prefix}: {question}" + "".join(f" | {result}" for result in results)
+
+        input_tokens = _token_count(messages)
+        output_tokens = len(content.split()) + 8 * len(calls)
+        return AIMessage(
+            content=content,
+            tool_calls=calls,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs,
+    ) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages, kwargs.get("structured_schema")))])
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs,
+    ) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages, kwargs.get("structured_schema")))])
+
+    def _chunks(self, messages: list[BaseMessage], structured_schema: str | None = None) -> list[ChatGenerationChunk]:
+        reply = self._reply(messages, structured_schema)
+        if reply.tool_calls:
+            chunk = AIMessageChunk(
+                content="",
+                tool_call_chunks=[
+                    {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": i, "type": "tool_call_chunk"}
+                    for i, call in enumerate(reply.tool_calls)
+                ],
+                usage_metadata=reply.usage_metadata,
+            )
+            return [ChatGenerationChunk(message=chunk)]
+
+        words = reply.content.split(" ")
+        chunks = [ChatGenerationChunk(message=AIMessageChunk(content=(" " if i else "") + word)) for i, word in enumerate(words)]
+        chunks[-1].message.usage_metadata = reply.usage_metadata
+        return chunks
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs,
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency)
+        for i, chunk in enumerate(self._chunks(messages, kwargs.get("structured_schema"))):
+            if i and self.token_latency:
+                time.sleep(self.token_latency)
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.latency)
+        for i, chunk in enumerate(self._chunks(messages, kwargs.get("structured_schema"))):
+            if i and self.token_latency:
+                await asyncio.sleep(self.token_latency)
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
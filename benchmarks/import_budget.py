@@ -0,0 +1,107 @@
+"""
+Import-time budget check.
+
+Imports the brainstorming graph in a fresh interpreter and fails if it takes
+longer than the budget. The RAG index must not be built at import, so this
+runs with background warm-up disabled and no network.
+
+probe() imports it once more under -X importtime with network connections
+refused, and reports what the import did: the modules it loaded (cumulative
+seconds each), whether the index was built, which embedding clients were
+created and which connections were attempted. The test suite checks those
+rather than the wall-clock budget (tests/test_lazy_index.py).
+
+Usage (from the project root):
+    python benchmarks/import_budget.py [--budget SECONDS] [--runs N]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+DEFAULT_BUDGET = 5.0 # seconds, dominated by langchain/langgraph imports
+MODULE = "brainstorming_agent.agent"
+
+SNIPPET = (
+    "import time; start = time.perf_counter(); "
+    f"import {MODULE}; "
+    "print(time.perf_counter() - start)"
+)
+
+PROBE = f"""
+import json, socket, time
+connections = []
+def refuse(sock, address):
+    connections.append(str(address))
+    raise OSError("network access while importing")
+socket.socket.connect = refuse
+start = time.perf_counter()
+import {MODULE}
+seconds = time.perf_counter() - start
+from brainstorming_agent.utils.tools import index_manager
+from src.utils import embedding_cache
+print(json.dumps({{
+    "seconds": seconds,
+    "index_built": index_manager.stats()["builds"] > 0 or index_manager.stats()["built"],
+    "embedding_clients": sorted(str(model) for model in embedding_cache._shared),
+    "connections": connections,
+}}))
+"""
+
+def _env() -> dict:
+    return {
+        **os.environ,
+        "RAG_WARM_UP": "0",
+        # Clients only need a key to be constructed; nothing is called at import
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "sk-import-budget"),
+        "TAVILY_API_KEY": os.environ.get("TAVILY_API_KEY", "tvly-import-budget"),
+    }
+
+def measure(runs: int) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", SNIPPET],
+            capture_output=True, text=True, env=_env(), check=True
+        )
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return timings
+
+def probe() -> dict:
+    """What importing the graph did, from one -X importtime run with the network refused."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        capture_output=True, text=True, env=_env(), check=True
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    # Lines look like "import time:  self [us] | cumulative | imported package"
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or line.rstrip().endswith("imported package"):
+            continue
+        _, cumulative, name = line.split("|")
+        modules[name.strip()] = int(cumulative) / 1e6
+    return {**report, "modules": modules}
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    timings = measure(args.runs)
+    median = statistics.median(timings)
+    print(f"import {MODULE}: median {median:.2f}s over {args.runs} runs (budget {args.budget:.2f}s)")
+    if median > args.budget:
+        slowest = sorted(probe()["modules"].items(), key=lambda item: item[1], reverse=True)[:10]
+        for module, seconds in slowest:
+            print(f"  {seconds:6.2f}s  {module}", file=sys.stderr)
+        print("FAIL: import-time budget exceeded", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
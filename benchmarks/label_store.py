@@ -0,0 +1,109 @@
+"""
+Label store benchmark.
+
+Compares keeping label definitions in graph state (as feedback_agent used to)
+with keeping them in the LabelStore and only {identifier: version} references in
+state, for a growing number of labels:
+
+- checkpoint_bytes: serialized size of the labels channel, which is written into
+  every checkpoint of the conversation
+- miss_chars: length of get_label's reply for an unknown identifier (every key
+  joined into the error before; a handful of similar identifiers now)
+- exact/prefix/fuzzy lookup latency against the store's index, and the time to
+  reopen the store and rebuild the index from SQLite
+
+Usage (from the project root):
+    python benchmarks/label_store.py [--sizes 100 500 2000] [--queries 200]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, ".")
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from src.models.custom_schema import LabelValueDefinition, Locale
+from src.utils.label_store import LabelStore
+
+WORDS = ["spam", "scam", "gore", "nudity", "spider", "bot", "crypto", "hate", "rumor", "satire", "health", "election"]
+
+def make_labels(size: int) -> list[LabelValueDefinition]:
+    rng = random.Random(size)
+    labels = []
+    for i in range(size):
+        words = rng.sample(WORDS, 2)
+        labels.append(LabelValueDefinition(
+            identifier=f"{words[0]}_{words[1]}_{i}",
+            severity=rng.choice(["alert", "inform", "none"]),
+            blurs=rng.choice(["content", "media", "none"]),
+            default_setting=rng.choice(["hide", "warn", "ignore"]),
+            locales=[Locale(lang="en", name=f"{words[0].title()} {words[1]} {i}", description=f"Posts about {words[0]} and {words[1]}")],
+        ))
+    return labels
+
+def _ms(seconds: list[float]) -> float:
+    return round(statistics.median(seconds) * 1000, 4)
+
+def _timed(fn, queries) -> list[float]:
+    seconds = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        seconds.append(time.perf_counter() - start)
+    return seconds
+
+def run(size: int, directory: str, queries: int) -> dict:
+    labels = make_labels(size)
+    serde = JsonPlusSerializer()
+    path = os.path.join(directory, f"labels-{size}.sqlite")
+    store = LabelStore(path)
+    refs = {label.identifier: store.put(label) for label in labels}
+
+    state_bytes = len(serde.dumps_typed({label.identifier: label for label in labels})[1])
+    refs_bytes = len(serde.dumps_typed(refs)[1])
+    old_miss = f"Label 'spam_scm' not found. Available labels: {', '.join(refs)}"
+    new_miss = f"Label 'spam_scm' not found. Similar labels: {', '.join(store.suggest('spam_scm'))}"
+
+    rng = random.Random(0)
+    sample = rng.sample(labels, min(queries, size))
+    exact = _timed(lambda identifier: store.get(identifier), [label.identifier for label in sample])
+    prefix = _timed(lambda query: store.search(query), [label.identifier[:6] for label in sample])
+    # A dropped character, the kind of slip the model makes when recalling an identifier
+    fuzzy = _timed(lambda query: store.search(query), [label.identifier[:3] + label.identifier[4:] for label in sample])
+    store.close()
+
+    start = time.perf_counter()
+    LabelStore(path).close()
+    reopen = time.perf_counter() - start
+
+    return {
+        "labels": size,
+        "checkpoint_bytes_state": state_bytes,
+        "checkpoint_bytes_refs": refs_bytes,
+        "miss_chars_before": len(old_miss),
+        "miss_chars_after": len(new_miss),
+        "exact_ms_p50": _ms(exact),
+        "prefix_search_ms_p50": _ms(prefix),
+        "fuzzy_search_ms_p50": _ms(fuzzy),
+        "reopen_ms": round(reopen * 1000, 2),
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            print(json.dumps(run(size, directory, args.queries)))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
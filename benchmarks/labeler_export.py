@@ -0,0 +1,117 @@
+"""
+Labeler export benchmark.
+
+Exports app.bsky.labeler.service records for label stores of growing size and
+compares two ways of doing it:
+
+- per_label: each stored definition is parsed with model_validate_json, the record
+  is built from the models and written with json.dumps(model_dump(by_alias=True))
+- exporter: src/utils/labeler_export.py, one TypeAdapter call validates every
+  definition as a single JSON array and another dumps
+  the record to bytes
+
+Both outputs are parsed back and compared, so a speedup can't come from a
+different record. Store reads are timed separately from validation and encoding.
+
+Usage (from the project root):
+    python benchmarks/labeler_export.py [--sizes 1000 5000 20000] [--repeats 5]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+sys.path.insert(0, ".")
+from src.models.custom_schema import LabelValueDefinition, Labeler, Locale, Policies
+from src.utils.label_store import LabelStore
+from src.utils.labeler_export import LABELER_RECORD, build_declaration, export_declaration, load_definitions
+
+CREATED_AT = "2024-03-03T05:31:08.938Z"
+
+def _letters(i: int) -> str:
+    # Label values may only use [a-z-]
+    word = ""
+    while True:
+        word = chr(ord("a") + i % 26) + word
+        i = i // 26 - 1
+        if i < 0:
+            return word
+
+def make_store(size: int) -> LabelStore:
+    rng = random.Random(size)
+    store = LabelStore(":memory:")
+    store.put_many(
+        LabelValueDefinition(
+            identifier=f"label_{_letters(i)}",
+            severity=rng.choice(["alert", "inform", "none"]),
+            blurs=rng.choice(["content", "media", "none"]),
+            default_setting=rng.choice(["hide", "warn", "ignore"]),
+            locales=[
+                Locale(lang="en", name=f"Label {i}", description=f"Posts flagged by rule {i} of the labeler"),
+                Locale(lang="es", name=f"Etiqueta {i}", description=f"Publicaciones marcadas por la regla {i}"),
+            ],
+        )
+        for i in range(size)
+    )
+    return store
+
+def per_label(rows: list[str]) -> bytes:
+    definitions = [LabelValueDefinition.model_validate_json(row) for row in rows]
+    for definition in definitions:
+        definition.identifier = definition.identifier.replace("_", "-")
+    record = Labeler(
+        policies=Policies(labelValues=[d.identifier for d in definitions], labelValueDefinitions=definitions),
+        createdAt=CREATED_AT,
+    )
+    return json.dumps(record.model_dump(by_alias=True)).encode()
+
+class _Rows:
+    """Stands in for the store so both paths start from the same rows."""
+    def __init__(self, rows):
+        self.rows = rows
+    def raw_definitions(self, refs=None):
+        return self.rows
+
+def exporter(rows: list[str]) -> bytes:
+    definitions = load_definitions(_Rows(rows))
+    return LABELER_RECORD.dump_json(build_declaration(definitions, CREATED_AT), by_alias=True)
+
+def _best_ms(fn, *args, repeats: int) -> tuple[float, object]:
+    seconds, result = [], None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(*args)
+        seconds.append(time.perf_counter() - start)
+    return round(min(seconds) * 1000, 2), result
+
+def run(size: int, repeats: int) -> dict:
+    store = make_store(size)
+    read_ms, rows = _best_ms(store.raw_definitions, repeats=repeats)
+    per_label_ms, slow = _best_ms(per_label, rows, repeats=repeats)
+    exporter_ms, fast = _best_ms(exporter, rows, repeats=repeats)
+    assert json.loads(slow) == json.loads(fast)
+    end_to_end_ms, _ = _best_ms(lambda: export_declaration(store, created_at=CREATED_AT), repeats=repeats)
+    return {
+        "labels": size,
+        "store_read_ms": read_ms,
+        "per_label_ms": per_label_ms,
+        "exporter_ms": exporter_ms,
+        "speedup": round(per_label_ms / exporter_ms, 2),
+        "export_declaration_ms": end_to_end_ms,
+        "record_bytes": len(fast),
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        print(json.dumps(run(size, args.repeats)))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
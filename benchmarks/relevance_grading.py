@@ -0,0 +1,83 @@
+"""
+Local relevance pre-filter benchmark.
+
+Runs LocalRelevanceScorer over a labelled question/chunk set and reports, for
+each threshold pair, the fraction of grades settled locally and how accurate
+those local grades are. Everything left in the ambiguous band would go to the
+LLM grader.
+
+By default a deterministic bag-of-words hashing embedder keeps the run offline;
+pass --embeddings openai to score with the production embedding model.
+
+Usage (from the project root):
+    python benchmarks/relevance_grading.py [--pairs benchmarks/fixtures/relevance_pairs.json] [--embeddings hashing|openai]
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+sys.path.insert(0, ".")
+from brainstorming_agent.utils.grading import LocalRelevanceScorer
+from src.utils.keyword_index import tokenize
+
+DEFAULT_PAIRS = "benchmarks/fixtures/relevance_pairs.json"
+# (accept, reject); None never rejects locally, the default (see grading.py)
+THRESHOLDS = [(0.9, None), (0.9, 0.1), (0.75, 0.25), (0.6, 0.3), (0.5, 0.35)]
+
+class HashingEmbeddings(Embeddings):
+    """Deterministic offline embedder: hashed term counts, so shared words mean similar vectors."""
+
+    def __init__(self, size: int = 512):
+        self.size = size
+
+    def _embed(self, text: str) -> list[float]:
+        vector = np.zeros(self.size, dtype=np.float32)
+        for token in tokenize(text):
+            vector[int(hashlib.md5(token.encode()).hexdigest(), 16) % self.size] += 1.0
+        return vector.tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed(text)
+
+def run(pairs: list[dict], embeddings) -> list[dict]:
+    rows = []
+    for accept, reject in THRESHOLDS:
+        scorer = LocalRelevanceScorer(embeddings, accept_threshold=accept, reject_threshold=reject)
+        verdicts = [scorer.settle(pair["question"], [pair["chunk"]])[0] for pair in pairs]
+        settled = [(v, pair["label"]) for v, pair in zip(verdicts, pairs) if v is not None]
+        rows.append({
+            "accept": accept,
+            "reject": reject,
+            **scorer.stats.snapshot(),
+            "local_accuracy": sum(v == label for v, label in settled) / len(settled) if settled else None,
+        })
+    return rows
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pairs", default=DEFAULT_PAIRS)
+    parser.add_argument("--embeddings", choices=["hashing", "openai"], default="hashing")
+    args = parser.parse_args()
+
+    with open(args.pairs, encoding="utf-8") as pairs_file:
+        pairs = json.load(pairs_file)
+    if args.embeddings == "openai":
+        from src.utils.embedding_cache import get_embeddings
+        embeddings = get_embeddings()
+    else:
+        embeddings = HashingEmbeddings()
+
+    for row in run(pairs, embeddings):
+        print(json.dumps(row))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Labeler starter kit generator benchmark.
+
+Generates starter kit projects (src/utils/starter_kit.py) for label stores of
+growing size and reports:
+
+- cold_ms: first generation into an empty directory, template parsed and every
+  file written
+- uncached_ms / cached_ms: regenerating into the same directory with the parsed
+  template cache cleared before each run, and with it kept
+- unchanged_ms: regenerating with nothing changed; files_written should be 0
+- one_more_label_ms: regenerating after one more label is approved;
+  files_written should be 1 (src/constants.ts)
+
+Usage (from the project root):
+    python benchmarks/starter_kit.py [--sizes 100 1000 10000] [--repeats 5]
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, ".")
+from benchmarks.labeler_export import make_store
+from src.models.custom_schema import LabelValueDefinition, Locale
+from src.utils import starter_kit
+from src.utils.starter_kit import generate_project
+
+def _timed(fn) -> tuple[float, dict]:
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+def _best_ms(fn, repeats: int, before=None) -> float:
+    seconds = []
+    for _ in range(repeats):
+        if before:
+            before()
+        seconds.append(_timed(fn)[0])
+    return round(min(seconds), 2)
+
+def run(size: int, directory: str, repeats: int) -> dict:
+    store = make_store(size)
+    output = f"{directory}/labeler-{size}"
+    generate = lambda: generate_project(output, store)
+
+    starter_kit._parse_template.cache_clear()
+    cold_ms, cold = _timed(generate)
+    uncached_ms = _best_ms(generate, repeats, before=starter_kit._parse_template.cache_clear)
+    cached_ms = _best_ms(generate, repeats)
+    unchanged_ms, unchanged = _timed(generate)
+
+    store.put(LabelValueDefinition(identifier="approved_later", locales=[Locale(lang="en", name="Approved later")]))
+    one_more_ms, one_more = _timed(generate)
+
+    with open(f"{output}/src/constants.ts", encoding="utf-8") as file:
+        entries = file.read().count("    rkey: ")
+    assert entries == size + 1
+
+    return {
+        "labels": size,
+        "cold_ms": round(cold_ms, 2),
+        "cold_files_written": len(cold["written"]),
+        "uncached_ms": uncached_ms,
+        "cached_ms": cached_ms,
+        "unchanged_ms": round(unchanged_ms, 2),
+        "unchanged_files_written": len(unchanged["written"]),
+        "one_more_label_ms": round(one_more_ms, 2),
+        "one_more_label_files_written": len(one_more["written"]),
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            print(json.dumps(run(size, directory, args.repeats)))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
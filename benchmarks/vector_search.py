@@ -0,0 +1,89 @@
+"""
+Vector search benchmark.
+
+Compares query latency of langchain's InMemoryVectorStore with the NumPy-backed
+NumpyVectorStore at several corpus sizes. Vectors are random, so no embedding
+model or network is involved; both stores are searched by vector.
+
+Usage (from the project root):
+    python benchmarks/vector_search.py [--sizes 1000 10000 100000] [--dim 256] [--queries 20] [--k 4]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+
+import numpy as np
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.vectorstores import InMemoryVectorStore
+
+sys.path.insert(0, ".")
+from src.utils.vector_store import NumpyVectorStore
+
+def build_stores(vectors: np.ndarray):
+    embedding = DeterministicFakeEmbedding(size=vectors.shape[1])
+    texts = [f"chunk {i}" for i in range(len(vectors))]
+
+    in_memory = InMemoryVectorStore(embedding)
+    for i, (text, vector) in enumerate(zip(texts, vectors)):
+        in_memory.store[str(i)] = {"id": str(i), "vector": vector.tolist(), "text": text, "metadata": {}}
+
+    numpy_store = NumpyVectorStore.from_matrix(vectors, texts, [{} for _ in texts], embedding)
+    return in_memory, numpy_store
+
+def time_queries(search, queries) -> list[float]:
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def run(sizes: list[int], dim: int, n_queries: int, k: int) -> list[dict]:
+    rng = np.random.default_rng(0)
+    results = []
+    for size in sizes:
+        vectors = rng.standard_normal((size, dim), dtype=np.float32)
+        queries = rng.standard_normal((n_queries, dim), dtype=np.float32).tolist()
+        in_memory, numpy_store = build_stores(vectors)
+
+        in_memory_ms = time_queries(lambda q: in_memory.similarity_search_by_vector(q, k=k), queries)
+        numpy_ms = time_queries(lambda q: numpy_store.similarity_search_by_vector(q, k=k), queries)
+
+        start = time.perf_counter()
+        numpy_store.batch_similarity_search_by_vector(queries, k=k)
+        batch_ms = (time.perf_counter() - start) * 1000 / n_queries
+
+        # Both stores are exact, so their top-k must agree
+        same = all(
+            [d.page_content for d in in_memory.similarity_search_by_vector(q, k=k)]
+            == [d.page_content for d in numpy_store.similarity_search_by_vector(q, k=k)]
+            for q in queries[:3]
+        )
+        results.append({
+            "size": size,
+            "dim": dim,
+            "in_memory_p50_ms": statistics.median(in_memory_ms),
+            "numpy_p50_ms": statistics.median(numpy_ms),
+            "numpy_batched_per_query_ms": batch_ms,
+            "speedup": statistics.median(in_memory_ms) / statistics.median(numpy_ms),
+            "same_top_k": same,
+        })
+    return results
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--k", type=int, default=4)
+    args = parser.parse_args()
+
+    for row in run(args.sizes, args.dim, args.queries, args.k):
+        print(json.dumps(row))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
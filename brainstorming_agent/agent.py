@@ -6,12 +6,13 @@ Description: This script defines the graph for the brainstorming agent.
 """
 from typing import TypedDict, Literal
 
-from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import tools_condition
 
 from brainstorming_agent.utils.nodes import (
+    manage_memory,
     call_model,
+    route_agent,
+    grade_documents,
     evaluate_documents, 
     rewrite_question,
     generate_answer,
@@ -19,6 +20,8 @@ from brainstorming_agent.utils.nodes import (
     tool_node
 )
 from brainstorming_agent.utils.state import AgentState
+from src.utils.checkpointing import get_checkpointer
+from src.utils.instrumentation import instrument_graph
 
 # Config definition
 class GraphConfig(TypedDict):
@@ -28,26 +31,29 @@ class GraphConfig(TypedDict):
 # Defining the graph
 workflow = StateGraph(AgentState, config_schema=GraphConfig)
 
+workflow.add_node(manage_memory)
 workflow.add_node('agent', call_model)
 workflow.add_node('retrieve', tool_node)
+workflow.add_node('grade_documents', grade_documents)
 workflow.add_node(rewrite_question)
 workflow.add_node(generate_answer)
 workflow.add_node(give_feedback)
 
-workflow.set_entry_point('agent')
+# Each user turn starts by fitting the history into the token budget
+workflow.set_entry_point('manage_memory')
+workflow.add_edge('manage_memory', 'agent')
 
-# Decide to respond directly or use search/retrieval tools
+# Decide to respond directly or use search/retrieval tools; an answer served from
+# the cache still goes through feedback, like one from generate_answer
 workflow.add_conditional_edges(
     'agent',
-    tools_condition,
-    {
-        'tools': 'retrieve',
-        END: END
-    }
+    route_agent # conditional node mapping happens within the function
 )
-# Edges taken after a tool is a called
+# Edges taken after a tool is a called: grade each retrieved chunk, then
+# answer from the relevant ones or rewrite the question if none passed
+workflow.add_edge('retrieve', 'grade_documents')
 workflow.add_conditional_edges(
-    'retrieve',
+    'grade_documents',
     evaluate_documents # conditional node mapping happens within the function
 )
 
@@ -55,4 +61,7 @@ workflow.add_edge('generate_answer', 'give_feedback')
 workflow.add_edge('give_feedback', END)
 workflow.add_edge('rewrite_question', 'agent')
 
-graph = workflow.compile()
\ No newline at end of file
+# Checkpointer from the CHECKPOINTER env var (none, memory or sqlite); the LangGraph
+# server persists state itself, so the default is none. Model, tool and retriever calls
+# are timed into the in-process metrics registry (src/utils/instrumentation.py)
+graph = instrument_graph(workflow.compile(checkpointer=get_checkpointer()))
\ No newline at end of file
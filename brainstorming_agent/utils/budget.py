@@ -0,0 +1,48 @@
+"""
+Filename: brainstorming_agent/utils/budget.py
+Date: 2025-07-30
+Version: 1.0
+Description: This script defines the per-turn retrieval budget and its loop metrics.
+"""
+import threading
+import time
+from collections import Counter
+
+# Defaults, overridable per turn through the max_rewrites / max_turn_seconds state keys
+MAX_REWRITES = 2
+MAX_TURN_SECONDS = 60.0
+
+# State update that starts a new turn's budget
+def start_turn() -> dict:
+    return {'rewrites': 0, 'turn_started_at': time.time(), 'best_context': '', 'best_score': float('-inf')}
+
+def budget_exhausted(state) -> bool:
+    max_rewrites = state.get('max_rewrites', MAX_REWRITES)
+    max_seconds = state.get('max_turn_seconds', MAX_TURN_SECONDS)
+    elapsed = time.time() - state.get('turn_started_at', time.time())
+    return state.get('rewrites', 0) >= max_rewrites or elapsed >= max_seconds
+
+# Per-turn loop counts: how many rewrites each turn took and how often the budget ran out
+class TurnMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.turns = 0
+        self.exhausted = 0
+        self.rewrites = Counter()
+
+    def record(self, rewrites: int, exhausted: bool) -> None:
+        with self._lock:
+            self.turns += 1
+            self.exhausted += int(exhausted)
+            self.rewrites[rewrites] += 1
+
+    def snapshot(self) -> dict:
+        total_rewrites = sum(count * n for count, n in self.rewrites.items())
+        return {
+            'turns': self.turns,
+            'budget_exhausted': self.exhausted,
+            'rewrites_per_turn': dict(sorted(self.rewrites.items())),
+            'mean_rewrites': total_rewrites / self.turns if self.turns else 0.0,
+        }
+
+turn_metrics = TurnMetrics()
@@ -0,0 +1,104 @@
+"""
+Filename: brainstorming_agent/utils/grading.py
+Date: 2025-07-30
+Version: 1.0
+Description: This script defines the local relevance pre-filter used before the LLM grader.
+"""
+import os
+import threading
+
+import numpy as np
+
+from src.utils.keyword_index import tokenize
+from src.utils.vector_store import normalize_rows
+
+# Combined-score thresholds: at or above ACCEPT is relevant, below REJECT is not,
+# anything in between goes to the LLM grader.
+# Neither is calibrated for the production embedding model, whose cosine scores
+# bunch up around 0.7-0.85 for related and unrelated text alike. So by default only
+# near-verbatim matches are accepted locally and nothing is rejected locally (a wrong
+# rejection drops a relevant chunk and can trigger a rewrite). Calibrate with
+# benchmarks/relevance_grading.py --embeddings openai before setting
+# GRADING_ACCEPT_THRESHOLD / GRADING_REJECT_THRESHOLD.
+ACCEPT_THRESHOLD = float(os.getenv('GRADING_ACCEPT_THRESHOLD', '0.9'))
+REJECT_THRESHOLD = float(os.getenv('GRADING_REJECT_THRESHOLD')) if os.getenv('GRADING_REJECT_THRESHOLD') else None
+KEYWORD_WEIGHT = 0.3
+
+# Counts how grading decisions were made
+class GradingStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.local_yes = 0
+        self.local_no = 0
+        self.llm = 0
+
+    def record(self, verdicts: list, llm_count: int) -> None:
+        with self._lock:
+            self.local_yes += sum(1 for v in verdicts if v == 'yes')
+            self.local_no += sum(1 for v in verdicts if v == 'no')
+            self.llm += llm_count
+
+    def snapshot(self) -> dict:
+        local = self.local_yes + self.local_no
+        total = local + self.llm
+        return {
+            'local_yes': self.local_yes,
+            'local_no': self.local_no,
+            'llm': self.llm,
+            'settled_locally': local / total if total else 0.0,
+        }
+
+# Keyword overlap: fraction of the question's terms that appear in the chunk
+def keyword_overlap(question: str, chunk: str) -> float:
+    question_terms = set(tokenize(question))
+    if not question_terms:
+        return 0.0
+    return len(question_terms & set(tokenize(chunk))) / len(question_terms)
+
+# Settles clear-cut relevance grades locally from embedding cosine and keyword overlap
+class LocalRelevanceScorer:
+    def __init__(
+        self,
+        embeddings,
+        accept_threshold: float = ACCEPT_THRESHOLD,
+        reject_threshold: float | None = REJECT_THRESHOLD,
+        keyword_weight: float = KEYWORD_WEIGHT
+    ):
+        # A zero-arg factory defers creating the embeddings client until first use
+        self._embeddings = embeddings
+        self.accept_threshold = accept_threshold
+        self.reject_threshold = reject_threshold
+        self.keyword_weight = keyword_weight
+        self.stats = GradingStats()
+
+    @property
+    def embeddings(self):
+        if callable(self._embeddings) and not hasattr(self._embeddings, 'embed_query'):
+            self._embeddings = self._embeddings()
+        return self._embeddings
+
+    def scores(self, question: str, chunks: list[str]) -> np.ndarray:
+        if not chunks:
+            return np.zeros(0, dtype=np.float32)
+        # Chunk embeddings are usually embedding-cache hits from indexing
+        query = normalize_rows(self.embeddings.embed_query(question))
+        cosine = normalize_rows(self.embeddings.embed_documents(chunks)) @ query
+        overlap = np.array([keyword_overlap(question, chunk) for chunk in chunks], dtype=np.float32)
+        return (1 - self.keyword_weight) * cosine + self.keyword_weight * overlap
+
+    def settle(self, question: str, chunks: list[str]) -> list[str | None]:
+        """'yes'/'no' for chunks settled locally, None for the ambiguous ones left to the LLM."""
+        return self.settle_with_scores(question, chunks)[0]
+
+    def settle_with_scores(self, question: str, chunks: list[str]) -> tuple[list[str | None], np.ndarray]:
+        scores = self.scores(question, chunks)
+        verdicts = []
+        for score in scores:
+            if score >= self.accept_threshold:
+                verdicts.append('yes')
+            elif self.reject_threshold is not None and score < self.reject_threshold:
+                verdicts.append('no')
+            else:
+                verdicts.append(None)
+        self.stats.record(verdicts, llm_count=verdicts.count(None))
+        return verdicts, scores
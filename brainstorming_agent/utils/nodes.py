@@ -4,16 +4,23 @@ Date: 2025-07-30
 Version: 1.0
 Description: This script instantiates the available LLMs for the agent and defines wrapper node functions.
 """
-from functools import lru_cache # Last-Recently Used cache to reduce execution time
 from pydantic import BaseModel, Field
 from typing import Literal
 
-from langchain_ollama import ChatOllama
-from langchain_openai import ChatOpenAI
-from langgraph.prebuilt import ToolNode
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph import END
+from langgraph.prebuilt import ToolNode, tools_condition
 from langgraph.types import interrupt, Command
 
-from brainstorming_agent.utils.tools import tools
+from brainstorming_agent.utils.budget import budget_exhausted, start_turn, turn_metrics
+from brainstorming_agent.utils.grading import LocalRelevanceScorer
+from brainstorming_agent.utils.tools import tools, index_manager, retriever_tool
+from src.utils.embedding_cache import get_embeddings
+from src.utils.instrumentation import instrument_node
+from src.utils.memory import GENERATED, ConversationMemory, is_user_message, llm_summarizer, memory_update
+from src.utils.model_registry import get_model
+from src.utils.semantic_cache import SemanticCache
 from brainstorming_agent.constants.prompt_templates import (
     EVAL_PROMPT, REWRITE_PROMPT, GENERATE_PROMPT
 )
@@ -24,62 +31,151 @@ class EvaluateDocument(BaseModel):
         description="Relevance score: 'yes' if relevant, or 'no' if not relevant"
     )
 
-@lru_cache(maxsize=4)
+# Tool-bound model from the shared registry ('openai' or 'ollama'); the bound variant is cached there
 def _get_model(model_name: str):
-    if model_name == 'openai':
-        model = ChatOpenAI(temperature=0, model_name='gpt-4.1-mini')
-    elif model_name == 'ollama':
-        model = ChatOllama(temperature=0, model_name='mistral:7b', reasoning=False)
-    else:
-        raise ValueError(f'Unsupported model type: {model_name}')
-    
-    model = model.bind_tools(tools)
-    return model
+    return get_model(model_name, tools=tools)
 
-# Assigns a binary score to question-document pairs based on semantic relevance
-def evaluate_documents(state) -> Literal['generate_answer', 'rewrite_question']:
-    eval_model = _get_model('openai')
+# Final answers keyed by question embedding; dropped whenever the RAG index is rebuilt.
+# Only a thread's opening question is looked up and stored: later ones ("can you
+# elaborate?") depend on the conversation, and the same words mean something else elsewhere
+answer_cache = SemanticCache(get_embeddings, version_fn=lambda: index_manager.version)
 
-    question = state['messages'][0].content
-    context = state['messages'][-1].content
+# A user question, as opposed to a rewrite_question output or the memory summary
+def _is_user_question(messages, i) -> bool:
+    return is_user_message(messages[i])
 
-    prompt = EVAL_PROMPT.format(context=context, question=question)
+def _latest_question_index(messages):
+    for i in range(len(messages) - 1, -1, -1):
+        if _is_user_question(messages, i):
+            return i
+    return None
 
-    response = eval_model.with_structured_output(EvaluateDocument).invoke(
-        [{'role': 'user', 'content': prompt}]
-    )
-    score = response.binary_score
+def _latest_question(messages):
+    i = _latest_question_index(messages)
+    return messages[i].content if i is not None else None
+
+# The latest question if it opens the conversation, so its answer can't depend on earlier turns
+def _cacheable_question(messages):
+    return messages[0].content if _latest_question_index(messages) == 0 else None
+
+# Whether this turn's answer used web search results, which change over time and
+# aren't covered by the index version the answer cache tracks
+def _used_web_search(messages) -> bool:
+    start = _latest_question_index(messages) or 0
+    return any(isinstance(message, ToolMessage) and message.name != retriever_tool.name for message in messages[start:])
+
+# Max concurrent grading calls per retrieval
+MAX_GRADING_CONCURRENCY = 4
+
+# Retrieved chunks: the retriever tool's Document artifact, or the whole tool output otherwise
+def _retrieved_chunks(message) -> list[str]:
+    artifact = getattr(message, 'artifact', None)
+    if isinstance(artifact, list) and artifact and all(hasattr(doc, 'page_content') for doc in artifact):
+        return [doc.page_content for doc in artifact]
+    return [message.content] if message.content else []
+
+# Clear-cut chunks are graded locally; only the ambiguous ones cost an LLM call
+local_scorer = LocalRelevanceScorer(get_embeddings)
+
+def _grading_inputs(state):
+    question = _latest_question(state['messages'])
+    chunks = _retrieved_chunks(state['messages'][-1])
+    verdicts, scores = local_scorer.settle_with_scores(question, chunks)
+    pending = [i for i, verdict in enumerate(verdicts) if verdict is None]
+    prompts = [
+        [{'role': 'user', 'content': EVAL_PROMPT.format(context=chunks[i], question=question)}]
+        for i in pending
+    ]
+    grader = get_model('openai', structured_output=EvaluateDocument)
+    return chunks, verdicts, scores, pending, prompts, grader
+
+# Keeps only the relevant chunks in the tool message, so generate_answer gets a shorter prompt.
+# Also remembers the best-scoring retrieval of the turn as a fallback context.
+def _grading_update(state, chunks, verdicts, scores, pending, responses):
+    for i, response in zip(pending, responses):
+        verdicts[i] = response.binary_score
+    message = state['messages'][-1]
+    relevant = [chunk for chunk, verdict in zip(chunks, verdicts) if verdict == 'yes']
+    filtered = message.model_copy(update={'content': '\n\n'.join(relevant)})
+    update = {'messages': [filtered], 'relevant_docs': len(relevant)}
+
+    score = float(scores.max()) if len(scores) else float('-inf')
+    if chunks and score > state.get('best_score', float('-inf')):
+        update['best_context'] = '\n\n'.join(chunks)
+        update['best_score'] = score
+    return update
 
-    if score == 'yes':
+# Grades each retrieved chunk separately and concurrently
+@instrument_node(name='grade_documents')
+def _grade_documents(state, config):
+    chunks, verdicts, scores, pending, prompts, grader = _grading_inputs(state)
+    responses = grader.batch(prompts, config={**config, 'max_concurrency': MAX_GRADING_CONCURRENCY}) if prompts else []
+    return _grading_update(state, chunks, verdicts, scores, pending, responses)
+
+@instrument_node(name='grade_documents')
+async def _agrade_documents(state, config):
+    chunks, verdicts, scores, pending, prompts, grader = _grading_inputs(state)
+    responses = await grader.abatch(prompts, config={**config, 'max_concurrency': MAX_GRADING_CONCURRENCY}) if prompts else []
+    return _grading_update(state, chunks, verdicts, scores, pending, responses)
+
+# Sync and async variants, so the node works with both invoke and ainvoke
+grade_documents = RunnableLambda(_grade_documents, _agrade_documents, name='grade_documents')
+
+# Rewrites the question only when no retrieved chunk passed grading and the turn's
+# retrieval budget is not spent; otherwise answers with the best context so far
+@instrument_node
+def evaluate_documents(state) -> Literal['generate_answer', 'rewrite_question']:
+    if state.get('relevant_docs') or budget_exhausted(state):
         return 'generate_answer'
     else:
         return 'rewrite_question'
 
 # Rewrite the original user question
+@instrument_node
 def rewrite_question(state):
     model = _get_model('openai')
-    messages = state['messages']
-    question = messages[0].content
+    question = _latest_question(state['messages'])
     prompt = REWRITE_PROMPT.format(question=question)
     response = model.invoke(
         [{'role': 'user', 'content': prompt}]
     )
-    return {'messages': [{'role': 'user', 'content': response.content}]}
+    return {
+        'messages': [HumanMessage(content=response.content, name=GENERATED)],
+        'rewrites': state.get('rewrites', 0) + 1
+    }
 
 # Generates an answer following retrieval or search
+@instrument_node
 def generate_answer(state):
     model = _get_model('openai')
-    question = state['messages'][0].content
-    context = state['messages'][-1].content
+    question = _latest_question(state['messages'])
+    # Empty when nothing passed grading and the budget ran out
+    context = state['messages'][-1].content or state.get('best_context', '')
     prompt = GENERATE_PROMPT.format(question=question, context=context)
     response = model.invoke([{'role': 'user', 'content': prompt}])
+    cacheable = _cacheable_question(state['messages'])
+    if cacheable and not _used_web_search(state['messages']):
+        answer_cache.store(cacheable, response.content)
+    turn_metrics.record(state.get('rewrites', 0), exhausted=not state.get('relevant_docs'))
     return {'messages': [response]}
 
 # TODO: Convert to proposal approval node
+@instrument_node
 def give_feedback(state):
     feedback = interrupt('Please share feedback:')
     return {'messages': [feedback]}
 
+# Name of the AIMessage call_model replies with on an answer cache hit
+CACHED = 'answer_cache'
+
+# Routes the agent's reply: tool calls go to retrieval, a cached answer goes on to
+# feedback like a generated one, and any other direct reply ends the turn
+@instrument_node
+def route_agent(state) -> Literal['retrieve', 'give_feedback', '__end__']:
+    if state['messages'][-1].name == CACHED:
+        return 'give_feedback'
+    return 'retrieve' if tools_condition(state) == 'tools' else END
+
 # Defines the function that has a termination condition dependent on tool call
 def should_continue(state):
     messages = state['messages']
@@ -94,15 +190,36 @@ def should_continue(state):
 # TODO: Improve prompt and import from separate file
 system_prompt = """Be a helpful assistant"""
 
+# Keeps the history within the token budget: old retrieved context is trimmed first,
+# then older turns are rolled into a running summary (see src/utils/memory.py)
+memory = ConversationMemory(llm_summarizer(get_model('openai')))
+
+@instrument_node
+def manage_memory(state):
+    return {'messages': memory_update(memory, state['messages'])}
+
 # Calls the main agent model
+@instrument_node
 def call_model(state, config):
     messages = state['messages']
+
+    # A new user question starts a new retrieval budget. If a similar opening question
+    # was answered before, reply from the cache; route_agent then skips straight to feedback
+    turn = {}
+    if _is_user_question(messages, len(messages) - 1):
+        question = _cacheable_question(messages)
+        cached = answer_cache.lookup(question) if question else None
+        if cached is not None:
+            return {'messages': [AIMessage(content=cached, name=CACHED)]}
+        turn = start_turn()
+
     messages = [{'role': 'system', 'content': system_prompt}] + messages
     model_name = config.get('configurable', {}).get('model_name', 'openai')
     model = _get_model(model_name)
     response = model.invoke(messages)
     # Returning a list, which will get appended to existing list
-    return {'messages': [response]}
+    return {'messages': [response], **turn}
 
-# Defines the function to execute tools
+# Defines the function to execute tools. It is a runnable rather than a function, so its
+# time is recorded per tool (tool_seconds) by the instrumentation callback handler
 tool_node = ToolNode(tools)
\ No newline at end of file
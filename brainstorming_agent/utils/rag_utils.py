@@ -5,39 +5,139 @@ Version: 1.0
 Description: This script defines utility functions for Retrieval Augmented Generation (RAG).
 """
 import json
+import logging
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 from langchain_community.document_loaders import WebBaseLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_core.vectorstores import InMemoryVectorStore
-from langchain_openai import OpenAIEmbeddings
+
+from src.utils.embedding_cache import get_embeddings
+from src.utils.local_corpus import ParsedTextCache, is_local_source, load_local_documents
+from src.utils.persistent_index import PersistentIndex
 
 RETRIEVAL_SOURCES_PATH = 'brainstorming_agent/constants/retrieval_sources.json'
+INDEX_DIR = os.getenv('BRAINSTORMING_INDEX_DIR', '.rag_index/brainstorming')
+
+# Ingestion settings: bounded fetch pool, per-source timeout (seconds) and retries
+MAX_FETCH_WORKERS = 6
+FETCH_TIMEOUT = 10
+FETCH_RETRIES = 2
+RETRY_BACKOFF = 0.5
+
+# Chunk sizes are in approximate tokens, about 4 characters each for English text.
+# An offline estimate: a tiktoken encoder would be downloaded on first use
+CHARS_PER_TOKEN = 4
+CHUNK_SIZE = 100
+CHUNK_OVERLAP = 50
 
-def _get_src_urls(src_path: str = RETRIEVAL_SOURCES_PATH):
+logger = logging.getLogger(__name__)
+
+# Returns every source listed in the file; entries are urls or local files, directories or globs
+def _get_sources(src_path: str = RETRIEVAL_SOURCES_PATH):
     with open(src_path) as retrieval_src_file:
         retrieval_srcs = json.load(retrieval_src_file)
-        urls = retrieval_srcs['bsky'] + retrieval_srcs['skyware']
-        return urls
-    
-# TODO needs optimization
-def preprocess_docs():
-    # Load documents
-    urls = _get_src_urls()
-    docs = [WebBaseLoader(url).load() for url in urls]
-
-    # Split documents
-    docs_list = [item for sublist in docs for item in sublist]
-    text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
-        chunk_size=100,
-        chunk_overlap=50
+        sources = [source for group in retrieval_srcs.values() for source in group]
+        return sources
+
+
+# Loads a single url, retrying with exponential backoff on failure
+def _load_url(url: str, timeout: float = FETCH_TIMEOUT, retries: int = FETCH_RETRIES):
+    for attempt in range(retries + 1):
+        try:
+            loader = WebBaseLoader(url, requests_kwargs={'timeout': timeout}, raise_for_status=True)
+            return loader.load()
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(RETRY_BACKOFF * 2 ** attempt)
+
+# Local sources are parsed from disk (cached by file mtime/hash); everything else is fetched
+def _load_source(source: str, timeout: float, retries: int, cache: ParsedTextCache):
+    if is_local_source(source):
+        return load_local_documents(source, cache)
+    return _load_url(source, timeout, retries)
+
+# Loads sources concurrently and yields (source, docs) as each one arrives.
+# Sources that still fail after retries are logged and skipped.
+def iter_loaded_docs(
+    sources: list[str],
+    max_workers: int = MAX_FETCH_WORKERS,
+    timeout: float = FETCH_TIMEOUT,
+    retries: int = FETCH_RETRIES
+):
+    cache = ParsedTextCache()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(_load_source, source, timeout, retries, cache): source
+            for source in sources
+        }
+        for future in as_completed(futures):
+            source = futures[future]
+            try:
+                yield source, future.result()
+            except Exception as e:
+                logger.warning('Skipping retrieval source %s: %s', source, e)
+
+def _approximate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+# Splits each source as soon as it arrives, so total time tracks the slowest fetch.
+# If a PersistentIndex is given, the splits of each new or changed source are embedded
+# while the remaining fetches are still in flight (its cached embedder then serves
+# index.update); sources whose content hash is unchanged are never embedded.
+def preprocess_docs(sources: list[str] | None = None, index=None, **fetch_kwargs):
+    sources = sources if sources is not None else _get_sources()
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP,
+        length_function=_approximate_tokens
     )
-    doc_splits = text_splitter.split_documents(docs_list)
+
+    doc_splits = []
+    for source, docs in iter_loaded_docs(sources, **fetch_kwargs):
+        splits = text_splitter.split_documents(docs)
+        stale = index.stale(splits) if index is not None else []
+        if stale:
+            index.embeddings.embed_documents([split.page_content for split in stale])
+        doc_splits.extend(splits)
     return doc_splits
 
 # TODO: use other embeddings
-def initialize_retriever(doc_splits):
-    vectorstore = InMemoryVectorStore.from_documents(
-        documents=doc_splits,
-        embedding=OpenAIEmbeddings()
-    )
+# Embeddings are cached by (model, text hash) and shared with src/utils/indexing.py
+# Loads the persisted index unless refresh is set or none exists yet; otherwise re-fetches
+# the sources and re-embeds only the ones whose content changed.
+# search_config picks exact or ANN search, e.g. {'mode': 'ivf', 'n_lists': 256, 'n_probe': 8}
+def build_vector_store(
+    refresh: bool = False,
+    index_dir: str = INDEX_DIR,
+    embeddings=None,
+    search_config: dict | None = None
+):
+    embeddings = embeddings or get_embeddings()
+    index = PersistentIndex(index_dir, embeddings)
+    if refresh or not index.load():
+        # Urls that failed to fetch keep their previously indexed chunks
+        sources = _get_sources()
+        urls = [source for source in sources if not is_local_source(source)]
+        index.update(preprocess_docs(sources, index=index), keep_sources=urls)
+    return index.to_vector_store(search_config)
+
+# Syncs the index with doc_splits when given, otherwise behaves like build_vector_store
+def initialize_retriever(
+    doc_splits=None,
+    index_dir: str = INDEX_DIR,
+    embeddings=None,
+    search_config: dict | None = None
+):
+    if doc_splits is None:
+        return build_vector_store(
+            index_dir=index_dir, embeddings=embeddings, search_config=search_config
+        ).as_retriever()
+    index = PersistentIndex(index_dir, embeddings or get_embeddings())
+    index.update(doc_splits)
+    vectorstore = index.to_vector_store(search_config)
     retriever = vectorstore.as_retriever()
     return retriever
\ No newline at end of file
@@ -9,4 +9,13 @@ from langchain_core.messages import BaseMessage
 from typing import TypedDict, Annotated, Sequence
 
 class AgentState(TypedDict):
-    messages: Annotated[Sequence[BaseMessage], add_messages]
\ No newline at end of file
+    messages: Annotated[Sequence[BaseMessage], add_messages]
+    relevant_docs: int # chunks that passed grading in the last retrieval
+    # Retrieval budget for the current turn (see utils/budget.py)
+    rewrites: int
+    turn_started_at: float
+    max_rewrites: int
+    max_turn_seconds: float
+    # Best retrieved context so far, used if the budget runs out before a chunk passes grading
+    best_context: str
+    best_score: float
\ No newline at end of file
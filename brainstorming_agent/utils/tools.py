@@ -4,23 +4,35 @@ Date: 2025-07-30
 Version: 1.0
 Description: This script defines the tools available to the brainstorming agent.
 """
+import os
+
 from langchain_community.tools.tavily_search import TavilySearchResults
-from langchain.tools.retriever import create_retriever_tool
+from langchain_core.tools import create_retriever_tool
+
+from brainstorming_agent.utils.rag_utils import build_vector_store
+from src.utils.indexing import IndexManager, IndexRetriever
 
-from brainstorming_agent.utils.rag_utils import preprocess_docs, initialize_retriever
+# The RAG index is built lazily instead of at import, so the graph compiles immediately.
+# Loads the persisted index, or processes the sources (urls and local files) defined in
+# ../constants/retrieval_sources.json when no index exists yet
+index_manager = IndexManager(builder=build_vector_store)
 
-# Is processing docs from urls defined in ../data/retrieval_sources.json 
-doc_splits = preprocess_docs()
+# The server starts building in the background from its startup hook (src/webapp.py);
+# RAG_WARM_UP=1 does it at import instead, for scripts that want a warm index
+if os.getenv('RAG_WARM_UP', '0') == '1':
+    index_manager.warm_up()
 
-# Retriever tool for RAG
+# Retriever tool for RAG. The retrieved Documents are kept as the tool message
+# artifact so grade_documents can grade each chunk separately
 retriever_tool = create_retriever_tool(
-    retriever=initialize_retriever(doc_splits),
+    retriever=IndexRetriever(manager=index_manager),
     name="retrieve_bsky_docs",
     description="Search and return information about the Bluesky social app and Bluesky labelers.",
+    response_format="content_and_artifact",
 )
 
 # Agent has access to web search and RAG tools
 tools = [
     TavilySearchResults(max_results=2), 
     retriever_tool
-]
\ No newline at end of file
+]
@@ -1,8 +1,4 @@
-from langchain.chat_models import init_chat_model
+from src.utils.model_registry import get_model
 
-model = init_chat_model(
-    "claude-sonnet-4-5-20250929",
-    temperature=0.5,
-    timeout=10,
-    max_tokens=1000
-)
\ No newline at end of file
+# Claude model shared by the feedback and researcher agents; built by the model registry
+model = get_model("claude")
@@ -0,0 +1,344 @@
+"""
+Batch Proposal Agent
+
+Turns a file of label ideas (CSV or JSONL) into LabelValueDefinition proposals in
+one run, for moderation teams that submit dozens or hundreds of labels at once.
+
+- propose: reads the requests one at a time and drafts a proposal for each with a
+  structured-output model call. At most BATCH_MAX_CONCURRENCY calls are in flight
+  and BATCH_REQUESTS_PER_SECOND caps their rate. Every proposal is validated
+  against models.custom_schema and written to the output JSONL as soon as it is
+  ready, so memory stays bounded by the concurrency, not the batch size.
+- review: a single interrupt for the whole batch (instead of one approval per
+  create_label as in the feedback agent). The reviewer resumes with one decision
+  per identifier and a default for the rest:
+
+      {"default": "approve", "decisions": {"spam_link": {"type": "reject"},
+                                           "gore": {"type": "edit", "edited_label": {...}}}}
+
+  or with just "approve"/"reject" (True/False) for the whole batch. Any other
+  resume value is rejected with a ValueError before anything is saved.
+  The interrupt lists the identifiers that already exist in the label store, so
+  the reviewer sees which approvals replace a label with a new version.
+- Every approved label (edits included) is validated before any is saved, then
+  all are saved in one label store transaction and written to the approved JSONL;
+  state keeps only their {identifier: version} references.
+
+The source, output and approved_output inputs are paths inside the batch
+directory the workflow is built for (BATCH_DIR for the served graph; relative
+ones are resolved against it), so graph clients can't read or overwrite other
+files on the server. The CLI builds its workflow for the directory of its own
+arguments.
+
+Input: a CSV with a "request" column (the first column otherwise), or JSONL with
+a "request" key. Each output line is
+{"index", "request", "status": "proposed" | "invalid" | "failed", "label" | "error"}.
+
+Usage (from the project root):
+    python -m src.batch_proposal_agent requests.csv --output proposals.jsonl [--approve-all] [--project labeler]
+"""
+
+import asyncio
+import csv
+import json
+import os
+from functools import partial
+from typing import Annotated, Iterator, Literal, TypedDict
+
+from langchain_core.rate_limiters import InMemoryRateLimiter
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph import END, START, StateGraph
+from langgraph.types import interrupt
+from pydantic import BaseModel, ValidationError
+
+from src.models.custom_schema import LabelValueDefinition
+from src.utils.context import LABEL_FIELDS, LABELER_DEFINITION
+from src.utils.prompts import assemble_prompt
+from src.utils.streaming import stream_writer
+from src.utils.checkpointing import get_checkpointer
+from src.utils.instrumentation import instrument_graph, instrument_node
+from src.utils.label_store import get_label_store, merge_label_refs
+from src.utils.labeler_export import check_identifier
+from src.utils.model_registry import get_model
+
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+BATCH_REQUESTS_PER_SECOND = float(os.getenv("BATCH_REQUESTS_PER_SECOND", "2"))
+BATCH_DIR = os.getenv("BATCH_DIR", "data/batches")
+
+# ---- SYSTEM PROMPT AND STATE ----
+
+BATCH_PROPOSAL_PROMPT = assemble_prompt(
+    "You draft label definitions for a Bluesky labeler. For context, here is information about labelers:",
+    LABELER_DEFINITION,
+    f"For the label request in the user message, infer:\n{LABEL_FIELDS}\n\n"
+    "Descriptions are clear, accurate and non-judgmental."
+)
+
+class BatchState(TypedDict, total=False):
+    source: str # CSV or JSONL of label requests
+    output: str # JSONL the proposals are streamed to
+    approved_output: str # JSONL the approved labels are streamed to
+    max_concurrency: int # overrides BATCH_MAX_CONCURRENCY for this run
+    requests_per_second: float # overrides BATCH_REQUESTS_PER_SECOND for this run
+    proposed: int
+    invalid: int
+    failed: int
+    approved: int
+    rejected: int
+    new_versions: list[str] # approved identifiers that already had a version in the label store
+    labels: Annotated[dict[str, int], merge_label_refs] # approved labels in the label store, by version
+
+# ---- INPUT AND OUTPUT ----
+
+def batch_path(path: str, directory: str) -> str:
+    """path resolved inside directory; anything that leads outside it is refused."""
+    root = os.path.realpath(directory)
+    resolved = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, resolved]) != root:
+        raise ValueError(f"'{path}' is outside the batch directory")
+    return resolved
+
+def read_requests(path: str) -> Iterator[str]:
+    """Yields the label requests in a CSV or JSONL file, one at a time."""
+    with open(path, newline="", encoding="utf-8") as file:
+        if path.endswith(".jsonl"):
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)["request"]
+            return
+        reader = csv.DictReader(file)
+        column = "request" if "request" in (reader.fieldnames or []) else (reader.fieldnames or [None])[0]
+        for row in reader:
+            request = (row.get(column) or "").strip()
+            if request:
+                yield request
+
+def read_results(path: str) -> Iterator[dict]:
+    """Yields the result lines of a proposals JSONL file."""
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+def _approved_path(output: str) -> str:
+    root, _ = os.path.splitext(output)
+    return f"{root}.approved.jsonl"
+
+# ---- PROPOSALS ----
+
+def validate_label(label: LabelValueDefinition | dict) -> LabelValueDefinition:
+    """Re-validates a proposal against the schema and checks what the schema leaves open."""
+    data = label.model_dump() if isinstance(label, LabelValueDefinition) else label
+    label = LabelValueDefinition.model_validate(data)
+    # The same rule export applies, so every approved label can be published
+    check_identifier(label.identifier)
+    if not label.locales or not all(locale.name for locale in label.locales):
+        raise ValueError("every label needs at least one locale with a name")
+    return label
+
+async def _draft(index: int, request: str, limiter: InMemoryRateLimiter) -> dict:
+    model = get_model("claude", structured_output=LabelValueDefinition)
+    await limiter.aacquire()
+    try:
+        label = validate_label(await model.ainvoke([
+            {"role": "system", "content": BATCH_PROPOSAL_PROMPT},
+            {"role": "user", "content": request}
+        ]))
+    except (ValidationError, ValueError) as e:
+        return {"index": index, "request": request, "status": "invalid", "error": str(e)}
+    except Exception as e:
+        return {"index": index, "request": request, "status": "failed", "error": f"{type(e).__name__}: {e}"}
+    return {"index": index, "request": request, "status": "proposed", "label": label.model_dump(mode="json")}
+
+async def propose_labels(
+    requests: Iterator[str],
+    output: str,
+    max_concurrency: int = BATCH_MAX_CONCURRENCY,
+    requests_per_second: float = BATCH_REQUESTS_PER_SECOND
+) -> dict[str, int]:
+    """Drafts a proposal per request and streams them to `output` as they finish; returns counts by status."""
+    limiter = InMemoryRateLimiter(
+        requests_per_second=requests_per_second,
+        check_every_n_seconds=min(0.1, 1 / requests_per_second),
+        max_bucket_size=max(1, max_concurrency)
+    )
+    write = stream_writer()
+    counts = {"proposed": 0, "invalid": 0, "failed": 0}
+    identifiers = set() # a later duplicate is invalid; the strings are all that's kept per label
+
+    def emit(result: dict) -> None:
+        if result["status"] == "proposed":
+            identifier = result["label"]["identifier"]
+            if identifier in identifiers:
+                result = {**result, "status": "invalid", "error": f"duplicate identifier '{identifier}'"}
+                del result["label"]
+            identifiers.add(identifier)
+        counts[result["status"]] += 1
+        file.write(json.dumps(result) + "\n")
+        file.flush()
+        write({"agent": "batch", "type": "proposal", **result})
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as file:
+        # Tasks are only created as slots free up, so the input is never read ahead
+        pending = set()
+        for index, request in enumerate(requests):
+            if len(pending) >= max_concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    emit(task.result())
+            pending.add(asyncio.create_task(_draft(index, request, limiter)))
+        for task in asyncio.as_completed(pending):
+            emit(await task)
+    return counts
+
+# ---- NODES ----
+
+@instrument_node(name="propose")
+async def _apropose(state: BatchState, directory: str) -> dict:
+    output = batch_path(state["output"], directory)
+    counts = await propose_labels(
+        read_requests(batch_path(state["source"], directory)),
+        output,
+        max_concurrency=state.get("max_concurrency", BATCH_MAX_CONCURRENCY),
+        requests_per_second=state.get("requests_per_second", BATCH_REQUESTS_PER_SECOND)
+    )
+    approved_output = batch_path(state.get("approved_output") or _approved_path(output), directory)
+    return {**counts, "approved_output": approved_output}
+
+def _propose(state: BatchState, directory: str) -> dict:
+    # Graph nodes run on worker threads without an event loop
+    return asyncio.run(_apropose(state, directory))
+
+class ReviewDecision(BaseModel):
+    type: Literal["approve", "edit", "reject"]
+    edited_label: dict | None = None
+
+class ReviewResponse(BaseModel):
+    default: Literal["approve", "reject"] = "reject"
+    decisions: dict[str, ReviewDecision] = {}
+
+def parse_review(response) -> ReviewResponse:
+    """The reviewer's resume value; True/False or "approve"/"reject" stand for that default with no decisions."""
+    if isinstance(response, bool):
+        response = "approve" if response else "reject"
+    if isinstance(response, str):
+        response = {"default": response}
+    try:
+        review = ReviewResponse.model_validate(response)
+    except ValidationError as e:
+        raise ValueError(
+            'Resume the review with "approve", "reject", True/False or '
+            f'{{"default": ..., "decisions": {{identifier: {{"type": ...}}}}}}: {e}'
+        ) from e
+    for identifier, decision in review.decisions.items():
+        if decision.type == "edit" and decision.edited_label is None:
+            raise ValueError(f"Decision for '{identifier}' is an edit without an edited_label")
+    return review
+
+@instrument_node
+def review(state: BatchState, directory: str) -> dict:
+    """One approval step for every proposal in the batch."""
+    output = batch_path(state["output"], directory)
+    pending = [result["label"]["identifier"] for result in read_results(output) if result["status"] == "proposed"]
+    if not pending:
+        return {"approved": 0, "rejected": 0, "new_versions": [], "labels": {}}
+
+    store = get_label_store()
+    # Approving one of these saves a new version over the label already in use
+    existing = {identifier: version for identifier in pending if (version := store.version(identifier))}
+    response = interrupt({
+        "description": f"{len(pending)} label proposals pending approval, {len(existing)} of them replacing an existing label",
+        "proposals": state["output"],
+        "identifiers": pending,
+        "existing_versions": existing,
+        "allowed_decisions": ["approve", "edit", "reject"]
+    })
+    response = parse_review(response)
+    default = ReviewDecision(type=response.default)
+
+    # Validate every approval before saving any, so a bad edit doesn't leave half the batch saved
+    labels = {}
+    rejected = 0
+    for result in read_results(output):
+        if result["status"] != "proposed":
+            continue
+        identifier = result["label"]["identifier"]
+        decision = response.decisions.get(identifier, default)
+        if decision.type == "reject":
+            rejected += 1
+            continue
+        try:
+            label = validate_label(decision.edited_label if decision.type == "edit" else result["label"])
+        except (ValidationError, ValueError) as e:
+            raise ValueError(f"Decision for '{identifier}' is not a valid label: {e}") from e
+        if label.identifier in labels:
+            raise ValueError(f"Decision for '{identifier}' approves '{label.identifier}' a second time")
+        labels[label.identifier] = label
+
+    refs = store.put_many(labels.values()) if labels else {}
+    with open(batch_path(state["approved_output"], directory), "w", encoding="utf-8") as file:
+        for label in labels.values():
+            file.write(label.model_dump_json() + "\n")
+    new_versions = [identifier for identifier, version in refs.items() if version > 1]
+    return {"approved": len(refs), "rejected": rejected, "new_versions": new_versions, "labels": refs}
+
+# ---- AGENT DEFINITION ----
+
+def build_workflow(directory: str = BATCH_DIR) -> StateGraph:
+    """The batch workflow with every input and output path confined to directory."""
+    workflow = StateGraph(BatchState)
+    workflow.add_node(
+        "propose",
+        RunnableLambda(partial(_propose, directory=directory), partial(_apropose, directory=directory), name="propose")
+    )
+    workflow.add_node("review", partial(review, directory=directory))
+    workflow.add_edge(START, "propose")
+    workflow.add_edge("propose", "review")
+    workflow.add_edge("review", END)
+    return workflow
+
+workflow = build_workflow()
+
+# The review step interrupts, which needs a checkpointer; the LangGraph server supplies one
+batch_proposal_agent = instrument_graph(workflow.compile(checkpointer=get_checkpointer()))
+
+
+def main() -> int:
+    import argparse
+    from langgraph.checkpoint.memory import InMemorySaver
+    from langgraph.types import Command
+
+    parser = argparse.ArgumentParser(description="Draft label proposals for a file of label requests.")
+    parser.add_argument("source", help="CSV with a 'request' column, or JSONL with a 'request' key")
+    parser.add_argument("--output", default="proposals.jsonl")
+    parser.add_argument("--approve-all", action="store_true", help="approve every valid proposal without asking")
+    parser.add_argument("--project", help="directory to generate a labeler starter kit for the approved labels in")
+    args = parser.parse_args()
+
+    # Command-line paths come from whoever runs the script; only graph clients are confined to BATCH_DIR
+    directory = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in (args.source, args.output)])
+
+    graph = build_workflow(directory).compile(checkpointer=get_checkpointer() or InMemorySaver())
+    config = {"configurable": {"thread_id": f"batch-{os.path.abspath(args.source)}"}}
+    state = graph.invoke({"source": os.path.abspath(args.source), "output": os.path.abspath(args.output)}, config)
+    print(json.dumps({key: state.get(key) for key in ("proposed", "invalid", "failed")}))
+
+    if "__interrupt__" in state:
+        if args.approve_all:
+            default = "approve"
+        else:
+            request = state["__interrupt__"][0].value
+            answer = input(f"{request['description']} (see {request['proposals']}). Approve all? [y/N] ")
+            default = "approve" if answer.strip().lower() in ("y", "yes") else "reject"
+        state = graph.invoke(Command(resume=default), config)
+    print(json.dumps({key: state.get(key) for key in ("approved", "rejected", "new_versions", "approved_output")}))
+
+    if args.project and state.get("labels"):
+        from src.utils.starter_kit import generate_project
+        result = generate_project(args.project, refs=state["labels"])
+        print(json.dumps({"project": args.project, "written": len(result["written"]), "unchanged": len(result["unchanged"])}))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
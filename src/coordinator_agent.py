@@ -4,90 +4,57 @@ Coordinator
 This agent uses the hierarchical/supervisor design pattern, implemented via tool calling.
 """
 
-from typing import Literal
+from typing import Annotated, Literal
 from pydantic import BaseModel, Field
 from langchain.tools import tool, ToolRuntime
+from langchain_core.tools import StructuredTool
 from langchain.agents import create_agent, AgentState
-from langchain.chat_models import init_chat_model
 
-from models.custom_schema import LabelValueDefinition, Locale
-from feedback_agent import feedback_agent
-from researcher_agent import researcher_agent
+from src.models.custom_schema import LabelValueDefinition, Locale
+from src.feedback_agent import feedback_agent
+from src.researcher_agent import research, aresearch
+from src.utils.streaming import astream_agent, stream_agent
+from src.utils.context import COMMUNITY_GUIDELINES, LABELER_DEFINITION
+from src.utils.memory import ConversationMemory, MemoryBudgetMiddleware, llm_summarizer
+from src.utils.prompts import assemble_prompt
+from src.utils.checkpointing import get_checkpointer
+from src.utils.instrumentation import instrument_graph
+from src.utils.label_store import merge_label_refs
+from src.utils.model_registry import get_model
 
-model = init_chat_model("gpt-4o-mini") # Different from model in init
+model = get_model("coordinator") # Different from model in init
 
 # ---- SYSTEM PROMPT ----
 
-labeler_definition = """Labelers are third-party moderation services on the Bluesky social media app. They work by assigning a set of labels/tags (manually or automatically) to accounts and posts.
-
-All users on the platform can “subscribe” to one or more of these services and configure how they want these labels to affect their experience: for any label type, they can choose if the user/post 
-marked with such label should be hidden from their view, just marked with a label, or if this kind of label should be ignored.
-
-Labelers will usually be specialized in some area: they could be protecting their users from things such as racism, antisemitism, or homophobia; they could be automatically detecting some unwanted 
-behaviors like following a huge number of people quickly; marking some specific types of accounts like new accounts without an avatar, or accounts from a different network; fighting disinformation 
-or political extremism; or they could be serving a community using a specific language or from a specific country.
-
-Labelers publish an /app.bsky.labeler.service/self record to declare that they are a labeler and publish their policies. 
-As an example, a record for a labeler that warns users blurs media about spiders on feeds and profiles looks like this:
-
-{
-  "$type": "app.bsky.labeler.service",
-  "policies": {
-    "labelValues": ["porn", "spider"],
-    "labelValueDefinitions": [
-      {
-        "identifier": "spider",
-        "severity": "alert",
-        "blurs": "media",
-        "defaultSetting": "warn",
-        "locales": [
-          {"lang": "en", "name": "Spider Warning", "description": "Spider!!!"}
-        ]
-      }
-    ]
-  },
-  "subjectTypes": ["record"],
-  "subjectCollections": ["app.bsky.feed.post", "app.bsky.actor.profile"],
-  "reasonTypes": ["com.atproto.moderation.defs#reasonOther"],
-  "createdAt": "2024-03-03T05:31:08.938Z"
-}
-
-The "labelValues" declares what to expect from the Labeler. It may include global and custom label values.
-
-The "labelValueDefinitions" defines the custom labels. It includes the locales field for specifying human-readable copy in various languages. If the user\'s language is not found, it will use the first set of strings in the array.
-
-"subjectTypes", "subjectCollections", and "reasonTypes" declare what type of moderation reports are reviewed by the Labeler. subjectTypes can include record for individual pieces of content, and account for overall accounts. subjectCollections is a list of NSIDs of record types; if not defined, any record type is allowed. reasonTypes is a list of report reason codes (Lexicon references).
-"""
-
-community_guidelines = """
-# Community guidelines \
-- Respectful communication \
-- No hate speech, bigotry, or discrimination \
-- No sensitive information (e.g., address, social security number) \
-- No explicit content, spam, or content that is not related to decentralized social media, bluesky, or labelers \
-"""
-
-COORDINATOR_AGENT_PROMPT = """ You are an expert assistant, who assists the user in brainstorming ideas for a labeler for the Bluesky social media app.
-For context, here is information about the Bluesky labeler: {labeler_definition}.
-
-Before you reply to a user message, ensure that the message follows these community guidelines {community_guidelines}.
-If the message does not follow the community guidelines, respond by listing the community guidelines and asking the user to try again.
+# Built once from static sections so the prefix is byte-identical on every turn and
+# OpenAI's automatic prefix caching applies; per-turn content stays in the messages
+COORDINATOR_AGENT_PROMPT = assemble_prompt(
+    """You are an expert assistant, who assists the user in brainstorming ideas for a labeler for the Bluesky social media app.
+For context, here is information about the Bluesky labeler:""",
+    LABELER_DEFINITION,
+    "Before you reply to a user message, ensure that the message follows these community guidelines:",
+    COMMUNITY_GUIDELINES,
+    """If the message does not follow the community guidelines, respond by listing the community guidelines and asking the user to try again.
 
 If a user asks for the conversation summary, return a brief chronological summary of the current conversation between you and the user.
 
 You can retrieve additional context from a knowledge base to help answer user queries and provide feedback on newly created or existing labels.
 Break down user requests into appropriate tool calls and coordinate the results.
 When a request involves multiple actions, use multiple tools in sequence.
-"""
+When the actions are independent of each other, request those tool calls together in one step so they can run concurrently."""
+)
 
-# Custom state for agent
+# Custom state for agent; label definitions live in the label store, state holds {identifier: version}
 class CustomState(AgentState):
-    labels: dict[str, LabelValueDefinition]
+    labels: Annotated[dict[str, int], merge_label_refs]
 
 # ---- TOOLS ----
+# Each tool has a sync and an async implementation. Under ainvoke/astream the
+# coordinator awaits sub-agents instead of blocking a worker thread, and independent
+# tool calls from one model turn run concurrently on the event loop. Sub-agents are
+# streamed, so their tokens and tool results show up in the coordinator's custom stream.
 
-@tool
-def retrieve_additional_context(query: str) -> str:
+def _retrieve_additional_context(query: str) -> str:
     """Retrieve additional context about labelers from user query.
     
     Use this when the user asks for information about Bluesky that you don't have immediate context for.
@@ -96,14 +63,13 @@ def retrieve_additional_context(query: str) -> str:
     Input: Natural language query (e.g., 'what are Bluesky labelers?')
     """
 
-    result = researcher_agent.invoke({
-        "messages": [{"role": "user", "content": query}]
-    })
+    # Similar questions are answered from the researcher's semantic cache
+    return research(query)
 
-    return result['messages'][-1].content
+async def _aretrieve_additional_context(query: str) -> str:
+    return await aresearch(query)
 
-@tool
-def provide_feedback_on_label(request: str) -> str:
+def _provide_feedback_on_label(request: str) -> str:
     """Interpret user intent when the user wants to create a label, then provide feedback on 
     the proposed label configuration before saving it.
 
@@ -113,16 +79,33 @@ def provide_feedback_on_label(request: str) -> str:
     (e.g., 'i want to make a label to tag posts that show misinformation')
     """
 
-    result = feedback_agent.invoke({
-        "messages": [{"role": "user", "content": request}]
-    })
+    return stream_agent(feedback_agent, "feedback", request)
+
+async def _aprovide_feedback_on_label(request: str) -> str:
+    return await astream_agent(feedback_agent, "feedback", request)
+
+retrieve_additional_context = StructuredTool.from_function(
+    func=_retrieve_additional_context,
+    coroutine=_aretrieve_additional_context,
+    name="retrieve_additional_context"
+)
 
-    return result['messages'][-1].content
+provide_feedback_on_label = StructuredTool.from_function(
+    func=_provide_feedback_on_label,
+    coroutine=_aprovide_feedback_on_label,
+    name="provide_feedback_on_label"
+)
 
 # ---- AGENT DEFINITION ----
 
-coordinator_agent = create_agent(
+# Model and tool calls, sub-agents included, are timed into the in-process metrics registry
+coordinator_agent = instrument_graph(create_agent(
     model=model,
     tools=[retrieve_additional_context, provide_feedback_on_label],
-    system_prompt=COORDINATOR_AGENT_PROMPT
-)
\ No newline at end of file
+    system_prompt=COORDINATOR_AGENT_PROMPT,
+    middleware=[
+        # Feedback outputs carry the label proposals, so they are never trimmed
+        MemoryBudgetMiddleware(ConversationMemory(llm_summarizer(model), pinned_tools=["provide_feedback_on_label"]))
+    ],
+    checkpointer=get_checkpointer() # set by CHECKPOINTER; none when served by the LangGraph server
+))
\ No newline at end of file
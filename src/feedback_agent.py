@@ -4,19 +4,25 @@ Feedback Agent
 This agent infers user intent, gives feedback, asks for user permission before saving feedback.
 """
 
-from typing import Literal
+from typing import Annotated, Literal
 from langchain.tools import tool, ToolRuntime
 from langchain.messages import ToolMessage
 from langchain.agents import create_agent, AgentState
 from langgraph.types import Command
 from langchain.agents.middleware import HumanInTheLoopMiddleware
 
-from models.custom_schema import LabelValueDefinition, Locale
+from src.models.custom_schema import LabelValueDefinition, Locale
 from src import model # Claude model defined in package __init__
+from src.utils.context import LABEL_FIELDS
+from src.utils.memory import ConversationMemory, MemoryBudgetMiddleware, llm_summarizer
+from src.utils.prompts import prompt_cache_middleware
+from src.utils.instrumentation import instrument_graph
+from src.utils.label_store import get_label_store, merge_label_refs
+from src.utils.labeler_export import check_identifier
 
 # ---- SYSTEM PROMPT AND STATE ----
 
-FEEDBACK_AGENT_PROMPT = """
+FEEDBACK_AGENT_PROMPT = f"""
 When the user wants to create a label, first interpret their intent and provide feedback 
 on the proposed label configuration before saving it.
 
@@ -29,21 +35,19 @@ then analyze and provide suggestions on:
 - Potential edge cases or unintended consequences
 
 Extract and infer for new labels:
-- identifier: a snake_case identifier derived from the label's purpose
-- severity: 'alert' (harmful content), 'inform' (informational), or 'none' (neutral)
-- blurs: 'content' (blur entire post), 'media' (blur images/videos), or 'none'
-- default_setting: 'hide' (hidden by default), 'warn' (shown with warning), or 'ignore' (shown normally)
-- locales: name and description in the user's language
+{LABEL_FIELDS}
 
 After interpreting a new label request, explain your reasoning for each choice and ask 
 if they'd like to adjust anything before saving.
 
 Only use create_label once the user confirms or if they explicitly ask to save it.
 Use get_label to check if an identifier already exists before creating.
+Use search_labels to find existing labels by partial identifier or name; results are paginated.
 """
 
+# Definitions live in the label store; state only references them as {identifier: version}
 class CustomState(AgentState):
-    labels: dict[str, LabelValueDefinition]
+    labels: Annotated[dict[str, int], merge_label_refs]
 
 
 # ---- TOOLS ----
@@ -52,17 +56,30 @@ class CustomState(AgentState):
 def get_label(
     identifier: str,
     runtime: ToolRuntime
-) -> LabelValueDefinition | Exception:
+) -> str:
     """Retrieves an existing label value definition. Returns label or error if not found."""
     try:
-        labels = runtime.state.get('labels', {})
-        label = labels.get(identifier)
+        store = get_label_store()
+        # The version this conversation saved, or the latest one
+        version = (runtime.state.get('labels') or {}).get(identifier)
+        label = store.get(identifier, version)
 
         if label is None:
-            return f"Label '{identifier}' not found. Available labels: {', '.join(labels.keys()) if labels else 'none'}"
-        return label
+            similar = store.suggest(identifier)
+            return f"Label '{identifier}' not found. Similar labels: {', '.join(similar) if similar else 'none'}"
+        return label.model_dump_json()
     except Exception as e:
         return f"Error retrieving label '{identifier}': {str(e)}"
+
+@tool
+def search_labels(query: str = '', page: int = 1) -> str:
+    """Finds existing labels whose identifier or name matches query (exact, prefix or similar spelling).
+    An empty query lists every label. Returns one page of one-line summaries; use get_label for details."""
+    result = get_label_store().search(query, page=page)
+    if not result['total']:
+        return f"No labels match '{query}'."
+    header = f"{result['total']} labels, page {result['page']} of {result['pages']}:"
+    return '\n'.join([header, *result['results']])
     
 @tool
 def create_label(
@@ -73,7 +90,12 @@ def create_label(
     default_setting: Literal['hide', 'warn', 'ignore'] = 'ignore',
     locales: list[Locale] = None
 ) -> Command:
-    """Creates a new label definition and stores it in state."""
+    """Creates a new label definition and saves it to the label store."""
+    try:
+        # Only labels that can be exported to the labeler record are saved
+        check_identifier(identifier)
+    except ValueError as e:
+        return Command(update={'messages': [ToolMessage(str(e), tool_call_id=runtime.tool_call_id)]})
 
     locale_objects = [
         Locale(lang=loc.lang, name=loc.name, description=loc.description)
@@ -87,13 +109,14 @@ def create_label(
         default_setting=default_setting,
         locales=locale_objects
     )
+    version = get_label_store().put(label)
 
     return Command(
         update={
-            'labels': {identifier: label},
+            'labels': {identifier: version},
             'messages': [
                 ToolMessage(
-                    f"Successfully created label '{identifier}'",
+                    f"Successfully created label '{identifier}' (version {version})",
                     tool_call_id=runtime.tool_call_id
                 )
             ]
@@ -102,14 +125,19 @@ def create_label(
 
 # ---- AGENT DEFINITION ----
 
-feedback_agent = create_agent(
+feedback_agent = instrument_graph(create_agent(
     model=model,
-    tools=[get_label, create_label],
+    tools=[get_label, search_labels, create_label],
+    system_prompt=FEEDBACK_AGENT_PROMPT,
     state_schema=CustomState,
     middleware=[
+        # Label references in state and label tool outputs stay pinned when the history is compacted
+        MemoryBudgetMiddleware(ConversationMemory(llm_summarizer(model), pinned_tools=["get_label", "create_label"])),
+        # Caches tools + system prompt on Anthropic; both are static across calls
+        *prompt_cache_middleware("anthropic"),
         HumanInTheLoopMiddleware(
             interrupt_on={"create_label": True}, # all decisions allowed (approve, edit, reject)
             description_prefix="Label definition pending approval"
         )
     ]
-)
\ No newline at end of file
+))
\ No newline at end of file
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Literal, List
 from pydantic import BaseModel
 
@@ -9,6 +9,9 @@ class Locale(BaseModel):
     description: str | None = Field(default=None, description='The description for the label')
 
 class LabelValueDefinition(BaseModel):
+    # Python code uses default_setting; records use the lexicon's defaultSetting (dump with by_alias=True)
+    model_config = ConfigDict(populate_by_name=True)
+
     identifier: str = Field(..., description='Snake_case identifier for the label')
     blurs: Literal['content', 'media', 'none'] = Field(
         default='none',
@@ -20,6 +23,7 @@ class LabelValueDefinition(BaseModel):
     )
     default_setting: Literal['hide', 'warn', 'ignore'] = Field(
         default='ignore',
+        alias='defaultSetting',
         description='Default visibility: hide (hidden), warn (shown with warning), or ignore (shown normally)'
     )
     locales: list[Locale] = Field(..., description='Label text in different languages')
@@ -36,6 +40,8 @@ class Policies(BaseModel):
     )
 
 class Labeler(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
     type: str = Field(
         default="app.bsky.labeler.service",
         description="Announces account as labeller.", 
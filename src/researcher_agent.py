@@ -7,8 +7,13 @@ This agent retrieves context from a knowledge base to help answer user queries.
 from langchain.tools import tool
 from langchain.agents import create_agent
 
-from utils.indexing import build_index
+from src.utils.embedding_cache import get_embeddings
+from src.utils.indexing import get_index, index_manager, search_index
+from src.utils.semantic_cache import SemanticCache
+from src.utils.streaming import astream_agent, stream_agent
 from src import model # Claude model defined in package __init__
+from src.utils.prompts import prompt_cache_middleware
+from src.utils.instrumentation import instrument_graph
 
 # ---- SYSTEM PROMPT AND STATE ----
 
@@ -23,8 +28,8 @@ Use the tool to help answer user queries.
 @tool(response_format="content_and_artifact")
 def retrieve_context(query:str):
     """Retrieve information to help answer a query."""
-    vector_store = build_index()
-    retrieved_docs = vector_store.similarity_search(query, k=2)
+    vector_store = get_index() # built once, then shared across calls
+    retrieved_docs = search_index(vector_store, query, k=2) # hybrid BM25 + vector search
     serialized = "\n\n".join(
         (f"Source: {doc.metadata}\nContent: {doc.page_content}")
         for doc in retrieved_docs
@@ -33,8 +38,38 @@ def retrieve_context(query:str):
 
 # ---- AGENT DEFINITION ----
 
-researcher_agent = create_agent(
+researcher_agent = instrument_graph(create_agent(
     model=model,
     tools=[retrieve_context],
-    system_prompt=RESEARCHER_AGENT_PROMPT
-)
\ No newline at end of file
+    system_prompt=RESEARCHER_AGENT_PROMPT,
+    middleware=prompt_cache_middleware("anthropic")
+))
+
+# ---- ANSWER CACHE ----
+
+# Answers keyed by question embedding; dropped whenever the index is rebuilt
+answer_cache = SemanticCache(
+    lambda: get_embeddings("text-embedding-3-large"),
+    version_fn=lambda: index_manager.version
+)
+
+def research(query: str) -> str:
+    """Answers a query with the researcher agent, reusing the answer to a similar earlier query."""
+    cached = answer_cache.lookup(query)
+    if cached is not None:
+        return cached
+
+    # Streamed so tokens reach a coordinator streaming with stream_mode="custom"
+    answer = stream_agent(researcher_agent, "researcher", query)
+    answer_cache.store(query, answer)
+    return answer
+
+async def aresearch(query: str) -> str:
+    """Async variant of research(), so callers can run it alongside other sub-agent calls."""
+    cached = await answer_cache.alookup(query)
+    if cached is not None:
+        return cached
+
+    answer = await astream_agent(researcher_agent, "researcher", query)
+    await answer_cache.astore(query, answer)
+    return answer
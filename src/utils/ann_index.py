@@ -0,0 +1,176 @@
+"""
+Approximate nearest-neighbour indexes for NumpyVectorStore.
+
+Exact search scans every row; for large corpora these indexes narrow each query
+down to a candidate set first. All of them work on the store's L2-normalized
+float32 matrix, so inner product equals cosine similarity.
+
+- IVFIndex: inverted-file index in pure NumPy. Spherical k-means splits the
+  rows into n_lists clusters; a query scans only the n_probe closest clusters.
+  Raise n_probe for recall, lower it for speed.
+- HNSWIndex: optional hnswlib graph index (pip install hnswlib). Tune recall
+  with ef_search, build quality with ef_construction and M.
+
+Both accept incremental inserts. Select one with a search config dict, e.g.
+{"mode": "ivf", "n_lists": 256, "n_probe": 8}; {"mode": "exact"} disables ANN.
+A config without "mode" uses RAG_SEARCH_MODE.
+"""
+
+import math
+import os
+
+import numpy as np
+
+from .vector_store import top_k
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+# Default mode for the RAG retrievers; overridable per call with a search config
+SEARCH_MODE = os.getenv("RAG_SEARCH_MODE", "exact")
+
+
+class IVFIndex:
+    """Inverted-file index over normalized vectors, trained with spherical k-means."""
+
+    def __init__(
+        self,
+        n_lists: int | None = None,
+        n_probe: int = 8,
+        train_iterations: int = 10,
+        max_train_points: int = 50_000,
+        seed: int = 0
+    ):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.train_iterations = train_iterations
+        self.max_train_points = max_train_points
+        self.seed = seed
+        self.centroids: np.ndarray | None = None
+        self.lists: list[np.ndarray] = []
+        self.size = 0
+
+    def reset(self) -> None:
+        """Forgets the trained clusters and every row."""
+        self.centroids = None
+        self.lists = []
+        self.size = 0
+
+    def _assign(self, vectors: np.ndarray, batch: int = 8192) -> np.ndarray:
+        # Batched so the (rows x lists) score matrix stays small
+        return np.concatenate([
+            np.argmax(vectors[i:i + batch] @ self.centroids.T, axis=1)
+            for i in range(0, len(vectors), batch)
+        ]) if len(vectors) else np.empty(0, dtype=np.int64)
+
+    def build(self, matrix: np.ndarray) -> "IVFIndex":
+        n = len(matrix)
+        n_lists = self.n_lists or max(1, int(math.sqrt(n)))
+        n_lists = min(n_lists, max(n, 1))
+        rng = np.random.default_rng(self.seed)
+
+        sample = matrix[rng.choice(n, size=min(n, self.max_train_points), replace=False)] if n else matrix
+        centroids = np.array(sample[rng.choice(len(sample), size=n_lists, replace=False)]) if n else np.zeros((1, matrix.shape[1]), np.float32)
+        self.centroids = centroids
+        for _ in range(self.train_iterations if n else 0):
+            labels = self._assign(sample)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Empty clusters keep their previous centroid
+            empty = norms[:, 0] == 0
+            sums[empty] = centroids[empty]
+            norms[empty] = 1.0
+            centroids = sums / norms
+            self.centroids = centroids
+
+        self.lists = [np.empty(0, dtype=np.int64) for _ in range(len(self.centroids))]
+        self.size = 0
+        self.add(matrix, start=0)
+        return self
+
+    def add(self, vectors: np.ndarray, start: int) -> None:
+        """Appends rows start..start+len(vectors) to their nearest lists without retraining."""
+        labels = self._assign(vectors)
+        order = np.argsort(labels, kind="stable")
+        bounds = np.searchsorted(labels[order], np.arange(len(self.lists) + 1))
+        for list_id in range(len(self.lists)):
+            members = order[bounds[list_id]:bounds[list_id + 1]]
+            if len(members):
+                self.lists[list_id] = np.concatenate([self.lists[list_id], members + start])
+        self.size += len(vectors)
+
+    def search(self, matrix: np.ndarray, queries: np.ndarray, k: int) -> tuple[list[np.ndarray], list[np.ndarray]]:
+        """Returns per-query (row indices, scores), best first."""
+        n_probe = min(self.n_probe, len(self.lists))
+        probes = top_k(queries @ self.centroids.T, n_probe)
+        indices, scores = [], []
+        for query, lists in zip(queries, probes):
+            candidates = np.concatenate([self.lists[list_id] for list_id in lists])
+            candidate_scores = matrix[candidates] @ query
+            best = top_k(candidate_scores, k)
+            indices.append(candidates[best])
+            scores.append(candidate_scores[best])
+        return indices, scores
+
+
+class HNSWIndex:
+    """hnswlib graph index; requires the optional hnswlib package."""
+
+    def __init__(self, M: int = 16, ef_construction: int = 200, ef_search: int = 64, seed: int = 0):
+        if hnswlib is None:
+            raise ImportError("The 'hnsw' search mode requires hnswlib: pip install hnswlib")
+        self.M = M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.seed = seed
+        self.index = None
+        self.size = 0
+
+    def reset(self) -> None:
+        """Drops the graph and every row."""
+        self.index = None
+        self.size = 0
+
+    def build(self, matrix: np.ndarray) -> "HNSWIndex":
+        self.index = hnswlib.Index(space="ip", dim=matrix.shape[1])
+        self.index.init_index(
+            max_elements=max(len(matrix), 16), ef_construction=self.ef_construction, M=self.M, random_seed=self.seed
+        )
+        self.index.set_ef(self.ef_search)
+        self.size = 0
+        self.add(matrix, start=0)
+        return self
+
+    def add(self, vectors: np.ndarray, start: int) -> None:
+        if not len(vectors):
+            return
+        needed = start + len(vectors)
+        if needed > self.index.get_max_elements():
+            self.index.resize_index(max(needed, 2 * self.index.get_max_elements()))
+        self.index.add_items(vectors, np.arange(start, needed))
+        self.size = needed
+
+    def search(self, matrix: np.ndarray, queries: np.ndarray, k: int) -> tuple[list[np.ndarray], list[np.ndarray]]:
+        k = min(k, self.size)
+        self.index.set_ef(max(self.ef_search, k))
+        labels, distances = self.index.knn_query(queries, k=k)
+        # hnswlib's ip space returns 1 - inner product
+        return [row.astype(np.int64) for row in labels], [1.0 - row for row in distances]
+
+
+def make_ann_index(search_config: dict | None = None):
+    """Builds an unfitted ANN index from a search config, or None for exact search."""
+    config = dict(search_config or {})
+    mode = config.pop("mode", SEARCH_MODE)
+    if mode == "exact":
+        if config:
+            raise ValueError(f"Options {sorted(config)} need an approximate search mode (ivf or hnsw), not exact")
+        return None
+    if mode == "ivf":
+        return IVFIndex(**config)
+    if mode == "hnsw":
+        return HNSWIndex(**config)
+    raise ValueError(f"Unsupported search mode: {mode}")
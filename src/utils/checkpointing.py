@@ -0,0 +1,290 @@
+"""
+Checkpointers
+
+Pluggable persistence for graph state (conversations, labels, pending approvals),
+selected with the CHECKPOINTER environment variable:
+
+    none    no checkpointer; the LangGraph server supplies its own persistence (default)
+    memory  InMemorySaver; state lives as long as the process
+    sqlite  BatchedSqliteSaver at CHECKPOINT_PATH; survives restarts and is shared by
+            every worker process on the host
+
+BatchedSqliteSaver is langgraph's SqliteSaver tuned for many small writes:
+- WAL journal with synchronous=NORMAL, so readers never block the writer and a
+  commit doesn't wait on fsync.
+- Writes are committed once per superstep instead of once per write: the pending
+  writes of a step's tasks are committed together with the checkpoint that ends
+  the step. Writes that end a run without a further checkpoint (interrupts,
+  errors) commit right away, and anything else left pending is committed by a
+  timer after commit_interval seconds, so no transaction outlives a run and other
+  processes never wait on one. A step with more than commit_every writes commits
+  early; commit_every=1 commits every write.
+- Each thread keeps only its keep_last newest checkpoints. Older ones and their
+  pending writes are pruned every prune_every saves to the thread. compact()
+  truncates the WAL and vacuums the file.
+- The async methods run the sync ones in a worker thread, so ainvoke/astream work
+  without a second connection.
+"""
+
+import asyncio
+import atexit
+import os
+import sqlite3
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Iterator, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+CHECKPOINTER = os.getenv("CHECKPOINTER", "none")
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", ".checkpoints/checkpoints.sqlite")
+
+
+class BatchedSqliteSaver(SqliteSaver):
+    """SqliteSaver with WAL tuning, batched commits, per-thread pruning and compaction."""
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        *,
+        commit_every: int = 16,
+        commit_interval: float = 0.5,
+        keep_last: int | None = 20,
+        prune_every: int = 25,
+        serde=None
+    ):
+        super().__init__(conn, serde=serde)
+        self.commit_every = max(commit_every, 1)
+        self.commit_interval = commit_interval
+        self.keep_last = keep_last
+        self.prune_every = prune_every
+        self._pending = 0
+        self._timer: threading.Timer | None = None
+        self._saves: dict[str, int] = defaultdict(int)
+        self.commits = 0
+        self.pruned = 0
+
+    @classmethod
+    def from_path(cls, path: str, **kwargs) -> "BatchedSqliteSaver":
+        """Opens (or creates) a checkpoint database that stays open for the process lifetime."""
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        saver = cls(conn, **kwargs)
+        atexit.register(saver.close)
+        return saver
+
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+        super().setup()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+
+    @contextmanager
+    def cursor(self, transaction: bool = True) -> Iterator[sqlite3.Cursor]:
+        # Same as SqliteSaver.cursor, but a write is left pending until the step ends,
+        # the batch is full or the flush timer fires
+        with self.lock:
+            self.setup()
+            cur = self.conn.cursor()
+            try:
+                yield cur
+            finally:
+                if transaction:
+                    self._pending += 1
+                    if self._pending >= self.commit_every:
+                        self._commit()
+                    elif self._timer is None:
+                        self._timer = threading.Timer(self.commit_interval, self.flush)
+                        self._timer.daemon = True
+                        self._timer.start()
+                cur.close()
+
+    def _commit(self) -> None:
+        # Callers hold self.lock
+        self.conn.commit()
+        self._pending = 0
+        self.commits += 1
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def flush(self) -> None:
+        """Commits any batched writes."""
+        with self.lock:
+            if self._pending:
+                self._commit()
+
+    def close(self) -> None:
+        try:
+            self.flush()
+            self.conn.close()
+        except sqlite3.ProgrammingError:
+            pass # already closed
+
+    # ---- Writes ----
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        saved = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = str(config["configurable"]["thread_id"])
+        self._saves[thread_id] += 1
+        if self.keep_last and self.prune_every and self._saves[thread_id] % self.prune_every == 0:
+            self.prune_threads([thread_id])
+        # A checkpoint ends the superstep: commit it with the step's pending writes
+        self.flush()
+        return saved
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        super().put_writes(config, writes, task_id, task_path)
+        # Interrupts and errors end the run without another checkpoint to commit them
+        if any(channel in WRITES_IDX_MAP for channel, _ in writes):
+            self.flush()
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        self.flush()
+
+    # ---- Pruning and compaction ----
+
+    def prune_threads(self, thread_ids: Sequence[str] | None = None, keep_last: int | None = None) -> int:
+        """Deletes all but the keep_last newest checkpoints (and their writes) per thread and namespace."""
+        keep_last = keep_last or self.keep_last
+        if not keep_last:
+            return 0
+        with self.cursor() as cur:
+            if thread_ids is None:
+                groups = cur.execute("SELECT DISTINCT thread_id, checkpoint_ns FROM checkpoints").fetchall()
+            else:
+                groups = cur.execute(
+                    f"SELECT DISTINCT thread_id, checkpoint_ns FROM checkpoints WHERE thread_id IN ({','.join('?' * len(thread_ids))})",
+                    [str(thread_id) for thread_id in thread_ids]
+                ).fetchall()
+
+            deleted = 0
+            for thread_id, namespace in groups:
+                # Checkpoint ids are time-ordered (uuid6), so the cutoff is the oldest id kept
+                row = cur.execute(
+                    "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1 OFFSET ?",
+                    (thread_id, namespace, keep_last - 1)
+                ).fetchone()
+                if row is None:
+                    continue
+                for table in ("checkpoints", "writes"):
+                    cur.execute(
+                        f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?",
+                        (thread_id, namespace, row[0])
+                    )
+                    if table == "checkpoints":
+                        deleted += cur.rowcount
+        self.pruned += deleted
+        return deleted
+
+    def compact(self) -> None:
+        """Commits, folds the WAL back into the database file and reclaims free pages."""
+        with self.lock:
+            self.setup()
+            self._commit()
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self.conn.execute("VACUUM")
+
+    def stats(self) -> dict:
+        with self.lock:
+            self.setup()
+            checkpoints = self.conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+            writes = self.conn.execute("SELECT COUNT(*) FROM writes").fetchone()[0]
+            page_count = self.conn.execute("PRAGMA page_count").fetchone()[0]
+            page_size = self.conn.execute("PRAGMA page_size").fetchone()[0]
+        return {
+            "checkpoints": checkpoints,
+            "writes": writes,
+            "database_bytes": page_count * page_size,
+            "commits": self.commits,
+            "pending_writes": self._pending,
+            "pruned_checkpoints": self.pruned,
+        }
+
+    # ---- Async interface ----
+    # SqliteSaver is sync only; the connection is guarded by self.lock, so the sync
+    # methods are safe to run from worker threads.
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+_savers: dict[str, BatchedSqliteSaver] = {}
+_savers_lock = threading.Lock()
+
+
+def get_checkpointer(kind: str | None = None, path: str | None = None) -> BaseCheckpointSaver | None:
+    """The checkpointer to compile graphs with; SQLite savers are shared per database path."""
+    kind = (kind or CHECKPOINTER).lower()
+    if kind == "none":
+        return None
+    if kind == "memory":
+        return InMemorySaver()
+    if kind == "sqlite":
+        path = path or CHECKPOINT_PATH
+        with _savers_lock:
+            if path not in _savers:
+                _savers[path] = BatchedSqliteSaver.from_path(path)
+            return _savers[path]
+    raise ValueError(f"Unsupported checkpointer: {kind}")
@@ -39,6 +39,13 @@ The "labelValueDefinitions" defines the custom labels. It includes the locales f
 "subjectTypes", "subjectCollections", and "reasonTypes" declare what type of moderation reports are reviewed by the Labeler. subjectTypes can include record for individual pieces of content, and account for overall accounts. subjectCollections is a list of NSIDs of record types; if not defined, any record type is allowed. reasonTypes is a list of report reason codes (Lexicon references).
 """
 
+# The fields to infer for a new label, shared by every agent that drafts one
+LABEL_FIELDS = """- identifier: a snake_case identifier derived from the label's purpose
+- severity: 'alert' (harmful content), 'inform' (informational), or 'none' (neutral)
+- blurs: 'content' (blur entire post), 'media' (blur images/videos), or 'none'
+- default_setting: 'hide' (hidden by default), 'warn' (shown with warning), or 'ignore' (shown normally)
+- locales: name and description in the user's language"""
+
 COMMUNITY_GUIDELINES = """
 # Community guidelines \
 - Respectful communication \
@@ -0,0 +1,192 @@
+"""
+Embedding cache.
+
+Wraps any langchain Embeddings so identical text is only embedded once per model.
+Vectors are keyed by (model name, sha256 of the text) and kept in a bounded
+in-memory LRU tier, optionally backed by a SQLite tier that survives restarts.
+Misses within a call are de-duplicated and sent to the model in batches.
+Document and query embeddings are cached separately, since some providers
+embed them differently.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_openai import OpenAIEmbeddings
+
+from .persistent_index import embedding_model_name
+from .instrumentation import span
+
+CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", ".rag_index/embeddings.sqlite")
+
+
+class SQLiteEmbeddingStore:
+    """Disk tier: float32 vectors stored as blobs keyed by cache key."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self._conn.commit()
+
+    def mget(self, keys: list[str]) -> dict[str, list[float]]:
+        found = {}
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def mset(self, items: dict[str, list[float]]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items.items()],
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper with an LRU memory tier, an optional disk tier and hit-rate metrics."""
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        max_memory_items: int = 10_000,
+        store: SQLiteEmbeddingStore | None = None,
+        batch_size: int = 256,
+    ):
+        self.underlying = underlying
+        # Same name as the wrapped model so persisted indexes stay compatible
+        self.model = embedding_model_name(underlying)
+        self.max_memory_items = max_memory_items
+        self.store = store
+        self.batch_size = batch_size
+        self._memory: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.model_calls = 0
+
+    def _key(self, kind: str, text: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{self.model}:{kind}:{digest}"
+
+    def _remember(self, key: str, vector: list[float]) -> None:
+        # Caller holds self._lock
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, keys: list[str]) -> dict[str, list[float]]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+            self.memory_hits += len(found)
+
+        remaining = [key for key in keys if key not in found]
+        if remaining and self.store is not None:
+            from_disk = self.store.mget(remaining)
+            with self._lock:
+                for key, vector in from_disk.items():
+                    self._remember(key, vector)
+                self.disk_hits += len(from_disk)
+            found.update(from_disk)
+        return found
+
+    def _save(self, computed: dict[str, list[float]]) -> None:
+        # Round to float32 up front so memory and disk hits return identical vectors
+        for key, vector in computed.items():
+            computed[key] = np.asarray(vector, dtype=np.float32).tolist()
+        with self._lock:
+            for key, vector in computed.items():
+                self._remember(key, vector)
+        if self.store is not None:
+            self.store.mset(computed)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys = [self._key("doc", text) for text in texts]
+        # dict.fromkeys de-duplicates while keeping order
+        unique = dict.fromkeys(keys)
+        found = self._lookup(list(unique))
+
+        pending = {key: text for key, text in zip(keys, texts) if key not in found}
+        if pending:
+            items = list(pending.items())
+            computed, calls = {}, 0
+            for i in range(0, len(items), self.batch_size):
+                batch = items[i:i + self.batch_size]
+                with span("embedding_seconds", kind="documents"):
+                    vectors = self.underlying.embed_documents([text for _, text in batch])
+                calls += 1
+                computed.update({key: vector for (key, _), vector in zip(batch, vectors)})
+            with self._lock:
+                self.model_calls += calls
+                self.misses += len(computed)
+            self._save(computed)
+            found.update(computed)
+
+        return [found[key] for key in keys]
+
+    def embed_query(self, text: str) -> list[float]:
+        key = self._key("query", text)
+        found = self._lookup([key])
+        if key in found:
+            return found[key]
+
+        with span("embedding_seconds", kind="query"):
+            computed = {key: self.underlying.embed_query(text)}
+        with self._lock:
+            self.model_calls += 1
+            self.misses += 1
+        self._save(computed)
+        return computed[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "model_calls": self.model_calls,
+                "memory_items": len(self._memory),
+            }
+        hits = counts["memory_hits"] + counts["disk_hits"]
+        lookups = hits + counts["misses"]
+        return {"model": self.model, **counts, "hit_rate": hits / lookups if lookups else 0.0}
+
+
+_shared: dict[str | None, CachedEmbeddings] = {}
+_shared_lock = threading.Lock()
+
+def get_embeddings(model: str | None = None, cache_path: str | None = CACHE_PATH) -> CachedEmbeddings:
+    """Returns the process-wide cached OpenAI embeddings for `model` (None means the client default)."""
+    with _shared_lock:
+        if model not in _shared:
+            underlying = OpenAIEmbeddings(model=model) if model else OpenAIEmbeddings()
+            store = SQLiteEmbeddingStore(cache_path) if cache_path else None
+            _shared[model] = CachedEmbeddings(underlying, store=store)
+        return _shared[model]
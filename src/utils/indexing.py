@@ -2,15 +2,32 @@
 Indexer for RAG.
 
 The code below will load, split, and store documents in a vector store.
+The store is built lazily by a process-wide IndexManager and shared across
+threads and requests, so retrieval no longer re-fetches and re-embeds per call.
+Chunks and embeddings are persisted under INDEX_DIR, so a restart loads files
+instead of re-fetching, and a refresh only re-embeds sources that changed.
 """
 
+import os
+import threading
+import time
+
 import bs4
 from langchain_community.document_loaders import WebBaseLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_core.vectorstores import InMemoryVectorStore
-from langchain_openai import OpenAIEmbeddings
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from .embedding_cache import get_embeddings
+from .keyword_index import hybrid_search
+from .persistent_index import PersistentIndex
+from .vector_store import NumpyVectorStore
+from .instrumentation import span
 
-def build_index():
+INDEX_DIR = os.getenv("RESEARCHER_INDEX_DIR", ".rag_index/researcher")
+
+def load_splits():
     # Load docs from blog. Only keep post title, headers, and content from the full HTML
     bs4_strainer = bs4.SoupStrainer(class_=("post-title", "post-header", "post-content"))
     loader = WebBaseLoader(
@@ -26,12 +43,143 @@ def build_index():
         add_start_index=True, # track index in original document
     )
     all_splits = text_splitter.split_documents(docs)
+    return all_splits
+
+# search_config picks exact or ANN search, e.g. {"mode": "ivf", "n_lists": 256, "n_probe": 8}
+def build_index(
+    refresh: bool = False,
+    index_dir: str = INDEX_DIR,
+    embeddings=None,
+    search_config: dict | None = None
+) -> NumpyVectorStore:
+    # Cached by (model, text hash), so rebuilds and repeated queries skip the API
+    embeddings = embeddings or get_embeddings("text-embedding-3-large")
+    index = PersistentIndex(index_dir, embeddings)
+
+    # Cold start: load the persisted index without touching the network
+    if not refresh and index.load():
+        return index.to_vector_store(search_config)
+
+    # Store docs, re-embedding only the sources whose content changed
+    index.update(load_splits())
+    return index.to_vector_store(search_config)
+
+
+class IndexManager:
+    """Builds a vector store on first use and shares it until refreshed or invalidated.
+
+    `builder()` is called for a lazy build and `builder(refresh=True)` for an explicit refresh.
+    """
+
+    def __init__(self, builder=build_index):
+        self._builder = builder
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._store = None
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.builds = 0
+        self.last_build_seconds = 0.0
+        self.total_build_seconds = 0.0
+
+    def get(self):
+        # Fast path: no lock needed once the store exists
+        store = self._store
+        if store is not None:
+            self._record_hit()
+            return store
+
+        with self._lock:
+            # Another thread may have finished building while we waited
+            if self._store is not None:
+                self._record_hit()
+                return self._store
+            self.misses += 1
+            return self._build()
+
+    def refresh(self):
+        """Rebuilds the store now and swaps it in atomically."""
+        with self._lock:
+            return self._build(refresh=True)
+
+    def warm_up(self) -> threading.Thread:
+        """Starts building the store in a background thread; get() blocks only if it is not done yet."""
+        thread = threading.Thread(target=self._warm_up, name="index-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def _warm_up(self):
+        try:
+            self.get()
+        except Exception:
+            # The next get() retries the build and surfaces the error to the caller
+            pass
+
+    def invalidate(self):
+        """Drops the current store; the next get() rebuilds it."""
+        with self._lock:
+            self._store = None
+
+    def set_builder(self, builder):
+        """Replaces the builder (e.g. with a fixture index) and drops the current store."""
+        with self._lock:
+            self._builder = builder
+            self._store = None
+
+    def stats(self) -> dict:
+        return {
+            "built": self._store is not None,
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "builds": self.builds,
+            "last_build_seconds": self.last_build_seconds,
+            "total_build_seconds": self.total_build_seconds,
+        }
+
+    def _record_hit(self):
+        with self._stats_lock:
+            self.hits += 1
+
+    def _build(self, **kwargs):
+        start = time.perf_counter()
+        store = self._builder(**kwargs)
+        elapsed = time.perf_counter() - start
+
+        self._store = store
+        self.version += 1
+        self.builds += 1
+        self.last_build_seconds = elapsed
+        self.total_build_seconds += elapsed
+        return store
+
+
+def search_index(store, query: str, k: int = 4, hybrid: bool = True) -> list[Document]:
+    # Hybrid BM25 + vector search when the store carries a keyword index
+    with span("vector_search_seconds", mode="hybrid" if hybrid else "vector"):
+        if hybrid:
+            return hybrid_search(store, query, k=k)
+        return store.similarity_search(query, k=k)
+
+
+class IndexRetriever(BaseRetriever):
+    """Retriever that resolves its vector store through an IndexManager at query time."""
+
+    manager: IndexManager
+    k: int = 4
+    hybrid: bool = True
+
+    model_config = {"arbitrary_types_allowed": True}
 
-    # Store docs
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-large")
-    vector_store = InMemoryVectorStore(embeddings)
-    ids = vector_store.add_documents(documents=all_splits)
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        return search_index(self.manager.get(), query, k=self.k, hybrid=self.hybrid)
 
-    return vector_store
 
+# Shared by every researcher_agent retrieval in this process
+index_manager = IndexManager()
 
+def get_index():
+    return index_manager.get()
@@ -0,0 +1,296 @@
+"""
+Instrumentation
+
+In-process latency and token metrics for every graph, with no external tracing
+service. Spans are recorded into histograms in a process-wide MetricsRegistry:
+
+    node_seconds{node}              StateGraph node functions wrapped with @instrument_node
+    llm_seconds{model, node}        chat model calls; node is the graph node path the call ran
+                                    in, e.g. "tools/model" for a sub-agent's model inside the
+                                    coordinator's tools node
+    tool_seconds{tool, node}        tool calls, including the coordinator's sub-agent tools
+    retriever_seconds{retriever}    retriever calls
+    subagent_seconds{agent}         sub-agent runs started from a tool
+    embedding_seconds{kind}         embedding model calls (cache misses only)
+    vector_search_seconds{mode}     vector and hybrid searches
+
+Counters: llm_tokens_total{model, direction} and errors_total{kind, name}.
+
+Node functions are timed by the decorator; model, tool and retriever calls by
+InstrumentationHandler, a callback handler attached to a compiled graph with
+instrument_graph(). Everything else uses the span() context manager.
+
+metrics.snapshot() returns the registry as JSON-ready data and metrics.prometheus()
+in the Prometheus text format. Set INSTRUMENTATION=0 to turn recording off.
+"""
+
+import bisect
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langgraph.errors import GraphBubbleUp
+
+INSTRUMENTATION = os.getenv("INSTRUMENTATION", "1") == "1"
+
+# Seconds; covers cache hits (sub-millisecond) up to slow model calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    """Fixed-bucket histogram with a running sum and count."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1) # the last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        # Callers hold the registry lock
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimated quantile, interpolated within its bucket like Prometheus' histogram_quantile."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+def _labels(labels: dict[str, Any]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{key}="{value}"' for key, value in labels] + ([extra] if extra else [])
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class MetricsRegistry:
+    """Thread-safe histograms and counters keyed by metric name and labels."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms: dict[str, dict[Labels, Histogram]] = defaultdict(dict)
+        self._counters: dict[str, dict[Labels, float]] = defaultdict(lambda: defaultdict(float))
+
+    def observe(self, name: str, value: float, /, **labels) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms[name]
+            if key not in series:
+                series[key] = Histogram(self.buckets)
+            series[key].observe(value)
+
+    def inc(self, name: str, value: float = 1, /, **labels) -> None:
+        with self._lock:
+            self._counters[name][_labels(labels)] += value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> dict:
+        """All series as plain data: count, sum, mean and p50/p95/p99 per histogram series."""
+        with self._lock:
+            histograms = {
+                name: [
+                    {
+                        "labels": dict(labels),
+                        "count": histogram.count,
+                        "sum": histogram.sum,
+                        "mean": histogram.sum / histogram.count if histogram.count else 0.0,
+                        "p50": histogram.quantile(0.5),
+                        "p95": histogram.quantile(0.95),
+                        "p99": histogram.quantile(0.99),
+                    }
+                    for labels, histogram in sorted(series.items())
+                ]
+                for name, series in sorted(self._histograms.items())
+            }
+            counters = {
+                name: [{"labels": dict(labels), "value": value} for labels, value in sorted(series.items())]
+                for name, series in sorted(self._counters.items())
+            }
+        return {"histograms": histograms, "counters": counters}
+
+    def prometheus(self) -> str:
+        """All series in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip((*histogram.buckets, "+Inf"), histogram.counts):
+                        cumulative += count
+                        le = f'le="{bound}"'
+                        lines.append(f"{name}_bucket{_format_labels(labels, le)} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+# Shared by every graph in this process
+metrics = MetricsRegistry()
+
+
+@contextmanager
+def span(name: str, /, **labels) -> Iterator[None]:
+    """Records the wall time of the block into the `name` histogram; errors are counted too."""
+    if not INSTRUMENTATION:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    except GraphBubbleUp:
+        raise # interrupts and commands, not failures
+    except Exception:
+        metrics.inc("errors_total", kind=name, name=next(iter(labels.values()), ""))
+        raise
+    finally:
+        metrics.observe(name, time.perf_counter() - start, **labels)
+
+
+def instrument_node(func: Callable | None = None, *, name: str | None = None) -> Callable:
+    """Decorator that records a node function's wall time as node_seconds{node}.
+
+    Works on sync and async functions and keeps the signature, so LangGraph still
+    passes config/runtime to nodes that ask for them. Interrupts are timed like
+    any other exit.
+    """
+    if func is None:
+        return functools.partial(instrument_node, name=name)
+    if not INSTRUMENTATION:
+        return func
+    node = name or func.__name__
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with span("node_seconds", node=node):
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with span("node_seconds", node=node):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def _node_path(metadata: dict | None) -> str:
+    # checkpoint_ns is "outer:<task id>|inner:<task id>" for nested graphs
+    metadata = metadata or {}
+    namespace = metadata.get("langgraph_checkpoint_ns") or metadata.get("langgraph_node") or ""
+    return "/".join(part.split(":")[0] for part in namespace.split("|") if part)
+
+
+class InstrumentationHandler(BaseCallbackHandler):
+    """Records model, tool and retriever spans and token counts into a MetricsRegistry."""
+
+    # Bookkeeping only, so run it inline rather than on an executor under async
+    run_inline = True
+
+    def __init__(self, registry: MetricsRegistry = metrics):
+        self.registry = registry
+        self._lock = threading.Lock()
+        self._started: dict[UUID, tuple[str, dict[str, str], float]] = {}
+
+    def _start(self, run_id: UUID, metric: str, labels: dict[str, str]) -> None:
+        with self._lock:
+            # A handler inherited from a parent graph and bound again on a sub-agent
+            # sees each event twice; only the first start counts
+            self._started.setdefault(run_id, (metric, labels, time.perf_counter()))
+
+    def _finish(self, run_id: UUID, error: BaseException | None = None) -> tuple[str, dict[str, str]] | None:
+        with self._lock:
+            started = self._started.pop(run_id, None)
+        if started is None:
+            return None
+        metric, labels, start = started
+        self.registry.observe(metric, time.perf_counter() - start, **labels)
+        if error is not None:
+            self.registry.inc("errors_total", kind=metric, name=next(iter(labels.values()), ""))
+        return metric, labels
+
+    # ---- Models ----
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata=None, **kwargs) -> None:
+        metadata = metadata or {}
+        model = metadata.get("model_profile") or metadata.get("ls_model_name") or (serialized or {}).get("name", "unknown")
+        self._start(run_id, "llm_seconds", {"model": model, "node": _node_path(metadata)})
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs) -> None:
+        finished = self._finish(run_id)
+        if finished is None:
+            return
+        model = finished[1]["model"]
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                self.registry.inc("llm_tokens_total", usage.get("input_tokens", 0), model=model, direction="input")
+                self.registry.inc("llm_tokens_total", usage.get("output_tokens", 0), model=model, direction="output")
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        self._finish(run_id, error)
+
+    # ---- Tools and retrievers ----
+
+    def on_tool_start(self, serialized, input_str, *, run_id: UUID, metadata=None, **kwargs) -> None:
+        tool = kwargs.get("name") or (serialized or {}).get("name") or "unknown"
+        self._start(run_id, "tool_seconds", {"tool": tool, "node": _node_path(metadata)})
+
+    def on_tool_end(self, output, *, run_id: UUID, **kwargs) -> None:
+        self._finish(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        self._finish(run_id, error)
+
+    def on_retriever_start(self, serialized, query, *, run_id: UUID, **kwargs) -> None:
+        retriever = kwargs.get("name") or (serialized or {}).get("name") or "unknown"
+        self._start(run_id, "retriever_seconds", {"retriever": retriever})
+
+    def on_retriever_end(self, documents, *, run_id: UUID, **kwargs) -> None:
+        self._finish(run_id)
+
+    def on_retriever_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        self._finish(run_id, error)
+
+
+handler = InstrumentationHandler()
+
+
+def instrument_graph(graph):
+    """The compiled graph with the shared InstrumentationHandler bound to every run."""
+    if not INSTRUMENTATION:
+        return graph
+    return graph.with_config(callbacks=[handler])
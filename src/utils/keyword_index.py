@@ -0,0 +1,216 @@
+"""
+BM25 keyword index and hybrid retrieval.
+
+Dense embeddings rank exact identifiers such as `app.bsky.labeler.service`,
+`defaultSetting` or `com.atproto.moderation.defs#reasonOther` poorly. The
+KeywordIndex keeps a compact inverted index (term -> postings arrays) whose
+per-posting BM25 weights are precomputed when the corpus is ingested, so a
+query is a handful of array slices and one scatter-add.
+
+hybrid_search() fuses the BM25 and vector rankings with reciprocal rank fusion.
+When a query names AT Protocol identifiers (NSIDs, #refs, DIDs, lowerCamel
+lexicon fields) and all of them occur in the corpus, the BM25 ranking is
+returned on its own and the query is never embedded. Ordinary compound words
+such as "set-up" or "JavaScript" don't count, so those queries still get the
+vector ranking.
+"""
+
+import re
+import threading
+from pathlib import Path
+
+import numpy as np
+from langchain_core.documents import Document
+
+from .vector_store import top_k
+
+# Identifiers may contain dots, hashes, slashes, colons and dashes (NSIDs, lexicon refs, DIDs)
+TOKEN_RE = re.compile(r"[A-Za-z0-9_$]+(?:[.#:/-][A-Za-z0-9_$]+)*")
+PART_SPLIT_RE = re.compile(r"[.#:/_$-]+")
+CAMEL_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+")
+# Whole tokens that name something exactly: DIDs, NSIDs (three or more segments), refs
+# with '#', and lowerCamel lexicon fields such as defaultSetting
+IDENTIFIER_RE = re.compile(
+    r"did:[a-z]+:[A-Za-z0-9._:-]+"
+    r"|[A-Za-z][A-Za-z0-9-]*(?:\.[A-Za-z][A-Za-z0-9-]*){2,}(?:#[A-Za-z0-9]+)?"
+    r"|[A-Za-z0-9.-]*#[A-Za-z][A-Za-z0-9]*"
+    r"|[a-z][a-z0-9]*(?:[A-Z][a-z0-9]*)+"
+)
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i in is it its of on or so that the "
+    "this to was what when where which who why will with you your".split()
+)
+
+
+def _split_word(word: str) -> list[str]:
+    return [
+        part.lower()
+        for piece in PART_SPLIT_RE.split(word) if piece
+        for part in CAMEL_RE.findall(piece)
+    ]
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased terms; compound identifiers are kept whole and also split into their parts."""
+    tokens = []
+    for match in TOKEN_RE.finditer(text):
+        word = match.group()
+        parts = _split_word(word)
+        if len(parts) > 1:
+            tokens.append(word.lower())
+        tokens.extend(part for part in parts if part not in STOPWORDS)
+    return tokens
+
+
+def identifier_terms(text: str) -> list[str]:
+    """Identifiers in a query as index terms, e.g. 'defaultsetting' or 'app.bsky.labeler.service'."""
+    return [match.group().lower() for match in TOKEN_RE.finditer(text) if IDENTIFIER_RE.fullmatch(match.group())]
+
+
+class KeywordIndex:
+    """BM25 inverted index stored as CSR-style arrays: offsets, doc_ids and precomputed weights."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.vocab: dict[str, int] = {}
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.doc_ids = np.empty(0, dtype=np.int32)
+        self.weights = np.empty(0, dtype=np.float32)
+        self.n_docs = 0
+
+    def build(self, texts: list[str]) -> "KeywordIndex":
+        term_ids: dict[str, int] = {}
+        rows, cols, counts = [], [], []
+        doc_lengths = np.zeros(len(texts), dtype=np.float32)
+        for doc_id, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths[doc_id] = len(tokens)
+            tf: dict[int, int] = {}
+            for token in tokens:
+                term = term_ids.setdefault(token, len(term_ids))
+                tf[term] = tf.get(term, 0) + 1
+            rows.extend(tf.keys())
+            cols.extend([doc_id] * len(tf))
+            counts.extend(tf.values())
+
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int32)
+        tfs = np.asarray(counts, dtype=np.float32)
+        order = np.argsort(rows, kind="stable")
+        rows, cols, tfs = rows[order], cols[order], tfs[order]
+
+        n_terms = len(term_ids)
+        df = np.bincount(rows, minlength=n_terms).astype(np.float32)
+        idf = np.log1p((len(texts) - df + 0.5) / (df + 0.5))
+        avg_length = float(doc_lengths.mean()) if len(texts) else 0.0
+        norm = self.k1 * (1 - self.b + self.b * doc_lengths[cols] / (avg_length or 1.0))
+
+        self.vocab = term_ids
+        self.offsets = np.concatenate([[0], np.cumsum(df.astype(np.int64))])
+        self.doc_ids = cols
+        self.weights = (idf[rows] * tfs * (self.k1 + 1) / (tfs + norm)).astype(np.float32)
+        self.n_docs = len(texts)
+        return self
+
+    def scores(self, query: str) -> np.ndarray:
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        for token in tokenize(query):
+            term = self.vocab.get(token)
+            if term is not None:
+                start, stop = self.offsets[term], self.offsets[term + 1]
+                np.add.at(scores, self.doc_ids[start:stop], self.weights[start:stop])
+        return scores
+
+    def search(self, query: str, k: int) -> list[tuple[int, float]]:
+        """Top k (row, score) pairs with a positive score."""
+        scores = self.scores(query)
+        return [(int(i), float(scores[i])) for i in top_k(scores, k) if scores[i] > 0]
+
+    def save(self, path: str | Path) -> None:
+        terms = np.array(sorted(self.vocab, key=self.vocab.get), dtype=np.str_)
+        np.savez(
+            path,
+            terms=terms,
+            offsets=self.offsets,
+            doc_ids=self.doc_ids,
+            weights=self.weights,
+            params=np.array([self.k1, self.b, self.n_docs], dtype=np.float64),
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "KeywordIndex":
+        with np.load(path, allow_pickle=False) as data:
+            k1, b, n_docs = data["params"]
+            index = cls(k1=float(k1), b=float(b))
+            index.vocab = {term: i for i, term in enumerate(data["terms"].tolist())}
+            index.offsets = data["offsets"]
+            index.doc_ids = data["doc_ids"]
+            index.weights = data["weights"]
+            index.n_docs = int(n_docs)
+        return index
+
+
+class HybridStats:
+    """Counts how often hybrid_search skipped the embedding call."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.keyword_only = 0
+        self.fused = 0
+
+    def record(self, keyword_only: bool) -> None:
+        with self._lock:
+            if keyword_only:
+                self.keyword_only += 1
+            else:
+                self.fused += 1
+
+    def snapshot(self) -> dict:
+        total = self.keyword_only + self.fused
+        return {
+            "keyword_only": self.keyword_only,
+            "fused": self.fused,
+            "keyword_only_rate": self.keyword_only / total if total else 0.0,
+        }
+
+
+hybrid_stats = HybridStats()
+
+
+def hybrid_search(
+    store,
+    query: str,
+    k: int = 4,
+    rrf_k: int = 60,
+    fetch_k: int | None = None,
+    keyword_shortcut: bool = True
+) -> list[Document]:
+    """Reciprocal rank fusion of BM25 and vector search over a NumpyVectorStore with a keyword_index."""
+    keyword_index = getattr(store, "keyword_index", None)
+    if keyword_index is None:
+        return store.similarity_search(query, k=k)
+
+    fetch_k = fetch_k or max(4 * k, 20)
+    keyword_hits = keyword_index.search(query, fetch_k)
+
+    # Exact-token queries: trust BM25 and skip the embedding call entirely
+    identifiers = identifier_terms(query)
+    if (
+        keyword_shortcut
+        and identifiers
+        and all(term in keyword_index.vocab for term in identifiers)
+        and len(keyword_hits) >= k
+    ):
+        hybrid_stats.record(keyword_only=True)
+        return store.documents([row for row, _ in keyword_hits[:k]])
+
+    hybrid_stats.record(keyword_only=False)
+    vector_hits = store.search_rows_by_vector(store.embedding.embed_query(query), k=fetch_k)
+    fused: dict[int, float] = {}
+    for ranking in ([row for row, _ in keyword_hits], [row for row, _ in vector_hits]):
+        for rank, row in enumerate(ranking):
+            fused[row] = fused.get(row, 0.0) + 1.0 / (rrf_k + rank + 1)
+    best = sorted(fused, key=fused.get, reverse=True)[:k]
+    return store.documents(best)
@@ -0,0 +1,338 @@
+"""
+Label store
+
+Label definitions live here instead of in graph state. State keeps only
+{identifier: version} references, so checkpoints and prompts stay small no matter
+how many labels a labeler defines. Every save of an identifier adds a new version;
+older versions stay readable by reference.
+
+Definitions are kept in SQLite at LABEL_STORE_PATH (":memory:" keeps them in the
+process only). Several processes can share the file: a save numbers its versions
+inside a write transaction, and each store catches up on rows other processes
+added (by rowid) before answering a lookup. The latest version of each label is
+indexed in memory:
+
+- exact lookup by identifier
+- prefix lookup over identifiers and locale names, by bisecting a sorted term list
+- fuzzy lookup through a character trigram index; the FUZZY_CANDIDATES best
+  trigram matches are re-ranked by difflib similarity
+
+search() and page() return compact summaries a page at a time.
+"""
+
+import bisect
+import difflib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Iterable
+
+from src.models.custom_schema import LabelValueDefinition
+
+LABEL_STORE_PATH = os.getenv("LABEL_STORE_PATH", ".labels/labels.sqlite")
+PAGE_SIZE = 10
+MIN_FUZZY_SCORE = 0.3
+FUZZY_CANDIDATES = 50
+# Saves retried when another process takes the same version first
+SAVE_ATTEMPTS = 3
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_")
+
+
+def _trigrams(term: str) -> set[str]:
+    padded = f"__{term}__"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _locale_names(data: str) -> list[str]:
+    return [locale.get("name") for locale in json.loads(data).get("locales", [])]
+
+
+def summarize(label: LabelValueDefinition, version: int) -> str:
+    """One line per label: identifier, version, settings and the first locale's name."""
+    name = next((locale.name for locale in label.locales if locale.name), "")
+    return f"{label.identifier} v{version} ({label.severity}, blurs {label.blurs}, default {label.default_setting}): {name}"
+
+
+class LabelIndex:
+    """Prefix and trigram index over identifiers and their locale names."""
+
+    def __init__(self):
+        self._terms: dict[str, set[str]] = {}
+        self._sorted: list[tuple[str, str]] = [] # (term, identifier)
+        self._grams: dict[str, set[str]] = defaultdict(set)
+
+    def __contains__(self, identifier: str) -> bool:
+        return identifier in self._terms
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def identifiers(self) -> list[str]:
+        return sorted(self._terms)
+
+    def add(self, identifier: str, names: Iterable[str] = ()) -> None:
+        self.remove(identifier)
+        terms = {identifier} | {_normalize(name) for name in names if name and _normalize(name)}
+        self._terms[identifier] = terms
+        for term in terms:
+            bisect.insort(self._sorted, (term, identifier))
+            for gram in _trigrams(term):
+                self._grams[gram].add(identifier)
+
+    def remove(self, identifier: str) -> None:
+        for term in self._terms.pop(identifier, ()):
+            i = bisect.bisect_left(self._sorted, (term, identifier))
+            if i < len(self._sorted) and self._sorted[i] == (term, identifier):
+                del self._sorted[i]
+            for gram in _trigrams(term):
+                self._grams[gram].discard(identifier)
+
+    def prefix(self, prefix: str) -> list[str]:
+        """Identifiers with a term starting with prefix, in term order."""
+        prefix = _normalize(prefix)
+        found = {}
+        for term, identifier in self._sorted[bisect.bisect_left(self._sorted, (prefix, "")):]:
+            if not term.startswith(prefix):
+                break
+            found.setdefault(identifier, None)
+        return list(found)
+
+    def fuzzy(self, query: str, min_score: float = MIN_FUZZY_SCORE) -> list[str]:
+        """Identifiers with a term similar to query, best first."""
+        query = _normalize(query)
+        grams = _trigrams(query)
+        shared = defaultdict(int)
+        for gram in grams:
+            for identifier in self._grams.get(gram, ()):
+                shared[identifier] += 1
+        # Only the best trigram matches are worth the slower difflib comparison
+        candidates = sorted(shared.items(), key=lambda item: -item[1])[:FUZZY_CANDIDATES]
+        scored = []
+        for identifier, count in candidates:
+            if count / len(grams) < min_score / 2:
+                continue
+            similarity = max(difflib.SequenceMatcher(None, query, term).ratio() for term in self._terms[identifier])
+            score = (count / len(grams) + similarity) / 2
+            if score >= min_score:
+                scored.append((-score, identifier))
+        return [identifier for _, identifier in sorted(scored)]
+
+    def search(self, query: str) -> list[str]:
+        """Exact match first, then prefix matches, then fuzzy matches; all identifiers for an empty query."""
+        if not _normalize(query):
+            return self.identifiers()
+        results = {}
+        if query in self._terms:
+            results[query] = None
+        for identifier in self.prefix(query) + self.fuzzy(query):
+            results.setdefault(identifier, None)
+        return list(results)
+
+
+class LabelStore:
+    """Versioned label definitions in SQLite with an in-memory lookup index; thread-safe."""
+
+    def __init__(self, path: str = LABEL_STORE_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS labels ("
+            "identifier TEXT NOT NULL, version INTEGER NOT NULL, data TEXT NOT NULL, created_at REAL NOT NULL, "
+            "PRIMARY KEY (identifier, version))"
+        )
+        self._conn.commit()
+        self._latest: dict[str, int] = {}
+        self._index = LabelIndex()
+        # Rows up to this rowid are reflected in _latest and the index
+        self._seen = self._conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM labels").fetchone()[0]
+        rows = self._conn.execute(
+            "SELECT identifier, MAX(version), data FROM labels WHERE rowid <= ? GROUP BY identifier", (self._seen,)
+        ).fetchall()
+        for identifier, version, data in rows:
+            self._latest[identifier] = version
+            self._index.add(identifier, _locale_names(data))
+
+    def _refresh(self) -> None:
+        # Caller holds self._lock. Picks up versions saved since the last look, including
+        # those from other processes; rows already reflected are skipped without parsing
+        rows = self._conn.execute(
+            "SELECT rowid, identifier, version, data FROM labels WHERE rowid > ? ORDER BY rowid", (self._seen,)
+        ).fetchall()
+        for rowid, identifier, version, data in rows:
+            self._seen = rowid
+            if version > self._latest.get(identifier, 0):
+                self._latest[identifier] = version
+                self._index.add(identifier, _locale_names(data))
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._latest)
+
+    def __contains__(self, identifier: str) -> bool:
+        return self.version(identifier) is not None
+
+    def version(self, identifier: str) -> int | None:
+        """The latest version of identifier, or None if it was never saved."""
+        with self._lock:
+            self._refresh()
+            return self._latest.get(identifier)
+
+    def put(self, label: LabelValueDefinition) -> int:
+        """Saves label as the next version of its identifier and returns that version."""
+        return self.put_many([label])[label.identifier]
+
+    def _next_versions(self, identifiers: list[str]) -> dict[str, int]:
+        # Caller holds the write transaction, so no other process can take these versions
+        versions = dict.fromkeys(identifiers, 0)
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(identifiers), 500):
+            batch = identifiers[i:i + 500]
+            versions.update(self._conn.execute(
+                f"SELECT identifier, MAX(version) FROM labels WHERE identifier IN ({','.join('?' * len(batch))}) GROUP BY identifier",
+                batch
+            ).fetchall())
+        return versions
+
+    def put_many(self, labels: Iterable[LabelValueDefinition]) -> dict[str, int]:
+        """Saves labels in one transaction; returns the new {identifier: version} references."""
+        labels = list(labels)
+        with self._lock:
+            for attempt in range(SAVE_ATTEMPTS):
+                try:
+                    # Take the write lock before reading the current versions
+                    self._conn.execute("BEGIN IMMEDIATE")
+                    versions = self._next_versions(list(dict.fromkeys(label.identifier for label in labels)))
+                    refs, rows, names = {}, [], {}
+                    now = time.time()
+                    for label in labels:
+                        refs[label.identifier] = refs.get(label.identifier, versions[label.identifier]) + 1
+                        names[label.identifier] = [locale.name for locale in label.locales]
+                        rows.append((label.identifier, refs[label.identifier], label.model_dump_json(), now))
+                    self._conn.executemany("INSERT INTO labels (identifier, version, data, created_at) VALUES (?, ?, ?, ?)", rows)
+                    self._conn.commit()
+                    break
+                except sqlite3.IntegrityError:
+                    # Another writer took one of the versions; number them again
+                    self._conn.rollback()
+                    if attempt == SAVE_ATTEMPTS - 1:
+                        raise
+                except BaseException:
+                    self._conn.rollback()
+                    raise
+            for identifier, version in refs.items():
+                if version > self._latest.get(identifier, 0):
+                    self._latest[identifier] = version
+                    self._index.add(identifier, names[identifier])
+            self._refresh()
+        return refs
+
+    def get(self, identifier: str, version: int | None = None) -> LabelValueDefinition | None:
+        """A label by identifier; the latest version unless one is given."""
+        with self._lock:
+            if version is None:
+                self._refresh()
+            version = version or self._latest.get(identifier)
+            if version is None:
+                return None
+            row = self._conn.execute(
+                "SELECT data FROM labels WHERE identifier = ? AND version = ?", (identifier, version)
+            ).fetchone()
+        return LabelValueDefinition.model_validate_json(row[0]) if row else None
+
+    def get_many(self, refs: dict[str, int]) -> dict[str, LabelValueDefinition]:
+        """Resolves {identifier: version} references, e.g. from graph state."""
+        labels = {}
+        for identifier, version in refs.items():
+            label = self.get(identifier, version)
+            if label is not None:
+                labels[identifier] = label
+        return labels
+
+    def raw_definitions(self, refs: dict[str, int] | None = None) -> list[str]:
+        """Stored JSON of the referenced versions (the latest of every label if refs is None), by identifier.
+
+        Unparsed, so callers can validate thousands of definitions in one call.
+        """
+        with self._lock:
+            if refs is None:
+                # SQLite returns the row holding the MAX() for the bare columns
+                rows = self._conn.execute(
+                    "SELECT identifier, data, MAX(version) FROM labels GROUP BY identifier ORDER BY identifier"
+                ).fetchall()
+                return [data for _, data, _ in rows]
+            rows = []
+            items = sorted(refs.items())
+            # Stay under SQLite's bound-parameter limit
+            for i in range(0, len(items), 400):
+                batch = items[i:i + 400]
+                rows += self._conn.execute(
+                    f"SELECT identifier, data FROM labels WHERE (identifier, version) IN (VALUES {','.join(['(?, ?)'] * len(batch))})",
+                    [value for item in batch for value in item]
+                ).fetchall()
+        return [data for _, data in sorted(rows)]
+
+    def _page(self, identifiers: list[str], page: int, page_size: int) -> dict:
+        pages = max(1, -(-len(identifiers) // page_size))
+        page = min(max(page, 1), pages)
+        chunk = identifiers[(page - 1) * page_size:page * page_size]
+        with self._lock:
+            versions = {identifier: self._latest[identifier] for identifier in chunk}
+        return {
+            "results": [summarize(self.get(identifier, version), version) for identifier, version in versions.items()],
+            "page": page,
+            "pages": pages,
+            "total": len(identifiers),
+        }
+
+    def search(self, query: str, page: int = 1, page_size: int = PAGE_SIZE) -> dict:
+        """One page of compact summaries for labels matching query by identifier or name."""
+        with self._lock:
+            self._refresh()
+            identifiers = self._index.search(query)
+        return self._page(identifiers, page, page_size)
+
+    def page(self, page: int = 1, page_size: int = PAGE_SIZE) -> dict:
+        """One page of compact summaries of every label, by identifier."""
+        with self._lock:
+            self._refresh()
+            identifiers = self._index.identifiers()
+        return self._page(identifiers, page, page_size)
+
+    def suggest(self, identifier: str, limit: int = 5) -> list[str]:
+        """Close identifiers for a miss, instead of listing every label."""
+        with self._lock:
+            self._refresh()
+            return self._index.search(identifier)[:limit]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_stores: dict[str, LabelStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_label_store(path: str | None = None) -> LabelStore:
+    """The process-wide store for a database path (LABEL_STORE_PATH by default)."""
+    path = path or LABEL_STORE_PATH
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = LabelStore(path)
+        return _stores[path]
+
+
+def merge_label_refs(current: dict[str, int] | None, update: dict[str, int] | None) -> dict[str, int]:
+    """State reducer: label references from an update replace those with the same identifier."""
+    return {**(current or {}), **(update or {})}
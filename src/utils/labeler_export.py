@@ -0,0 +1,105 @@
+"""
+Labeler declaration export
+
+Builds the app.bsky.labeler.service record a labeler publishes at
+/app.bsky.labeler.service/self (see brainstorming_agent/constants/output_samples.py)
+from the definitions in the label store.
+
+Validation and serialization go through TypeAdapters built once at import, so
+pydantic-core's compiled validator and JSON encoder handle the whole record:
+the stored definitions are validated as one JSON array in a single call, and the
+record is written straight to JSON bytes by the same Rust serializer. Records
+use the lexicon's field names (defaultSetting, $type); models.custom_schema maps
+them to default_setting and type for Python code.
+
+The lexicon only allows lowercase ASCII letters and '-' in label values, so the
+snake_case identifiers used while designing labels are exported with '-' in
+place of '_'. check_identifier applies that rule; the agents call it when a label
+is proposed, so every label they save can be exported.
+"""
+
+import re
+from datetime import datetime, timezone
+
+from pydantic import TypeAdapter
+
+from src.models.custom_schema import LabelValueDefinition, Labeler, Policies
+from src.utils.label_store import LabelStore, get_label_store
+
+# Compiled once; each validate/dump call runs entirely in pydantic-core
+LABEL_DEFINITIONS = TypeAdapter(list[LabelValueDefinition])
+LABELER_RECORD = TypeAdapter(Labeler)
+
+RECORD_IDENTIFIER_PATTERN = re.compile(r"^[a-z-]{1,100}$")
+
+
+def record_identifier(identifier: str) -> str:
+    """The lexicon form of a label identifier, e.g. spam_links -> spam-links."""
+    return identifier.replace("_", "-")
+
+
+def check_identifier(identifier: str) -> str:
+    """The lexicon form of identifier; ValueError if it isn't a valid label value even with '_' as '-'."""
+    record = record_identifier(identifier)
+    if not RECORD_IDENTIFIER_PATTERN.match(record):
+        raise ValueError(
+            f"Label '{identifier}' can't be exported: label values are lowercase letters "
+            "and '-' ('_' is exported as '-'), at most 100 characters"
+        )
+    return record
+
+
+def _timestamp() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def to_record_identifiers(definitions: list[LabelValueDefinition]) -> list[LabelValueDefinition]:
+    """Copies of definitions with lexicon identifiers, rejecting invalid or colliding ones; the originals are left as is."""
+    seen = set()
+    records = []
+    for definition in definitions:
+        identifier = check_identifier(definition.identifier)
+        if identifier in seen:
+            raise ValueError(f"Label '{definition.identifier}' is declared twice once '_' becomes '-'")
+        seen.add(identifier)
+        records.append(definition.model_copy(update={"identifier": identifier}))
+    return records
+
+
+def build_declaration(definitions: list[LabelValueDefinition], created_at: str | None = None, **fields) -> Labeler:
+    """The labeler record for already-validated definitions; other record fields keep the schema defaults."""
+    definitions = to_record_identifiers(definitions)
+    return Labeler(
+        policies=Policies(labelValues=[definition.identifier for definition in definitions], labelValueDefinitions=definitions),
+        createdAt=created_at or _timestamp(),
+        **fields
+    )
+
+
+def load_definitions(store: LabelStore | None = None, refs: dict[str, int] | None = None) -> list[LabelValueDefinition]:
+    """Validates the stored definitions (the referenced versions, or the latest of each) in one pass."""
+    store = get_label_store() if store is None else store
+    payload = "[" + ",".join(store.raw_definitions(refs)) + "]"
+    return LABEL_DEFINITIONS.validate_json(payload)
+
+
+def export_declaration(
+    store: LabelStore | None = None,
+    refs: dict[str, int] | None = None,
+    created_at: str | None = None,
+    indent: int | None = None,
+    **fields
+) -> bytes:
+    """The labeler record for the store's labels (or the referenced versions) as JSON bytes."""
+    record = build_declaration(load_definitions(store, refs), created_at, **fields)
+    return LABELER_RECORD.dump_json(record, by_alias=True, indent=indent)
+
+
+def validate_declaration(data: bytes | str) -> Labeler:
+    """Parses and validates a labeler record, e.g. one read back from a repo or a file."""
+    record = LABELER_RECORD.validate_json(data)
+    declared = set(record.policies.labelValues)
+    for definition in record.policies.labelValueDefinitions:
+        if definition.identifier not in declared:
+            raise ValueError(f"Label '{definition.identifier}' is defined but missing from labelValues")
+    return record
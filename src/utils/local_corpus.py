@@ -0,0 +1,121 @@
+"""
+Local corpus loader.
+
+Loads documents from files shipped with the repo (e.g. data/bsky-docs/*.pdf and
+data/labeler-starter-kit-bsky-main/src/*.ts) so ingestion needs no network.
+Parsed text is cached per file under CACHE_DIR and reused while the file's
+mtime and size are unchanged; if those change but the content hash does not,
+the cache entry is refreshed without re-parsing.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from langchain_core.documents import Document
+from pypdf import PdfReader
+
+CACHE_DIR = os.getenv("LOCAL_CORPUS_CACHE_DIR", ".rag_index/parsed")
+
+# Extensions read as plain text, mapped to the language recorded in metadata
+TEXT_EXTENSIONS = {
+    ".ts": "ts",
+    ".tsx": "ts",
+    ".js": "js",
+    ".mjs": "js",
+    ".json": "json",
+    ".md": "markdown",
+    ".txt": "text",
+}
+SUPPORTED_EXTENSIONS = {".pdf", *TEXT_EXTENSIONS}
+
+
+def is_local_source(source: str) -> bool:
+    return not source.startswith(("http://", "https://"))
+
+
+def expand_local_source(source: str) -> list[Path]:
+    """Returns the supported files for a file, directory (recursive) or glob pattern."""
+    path = Path(source)
+    if path.is_dir():
+        candidates = path.rglob("*")
+    elif any(char in source for char in "*?["):
+        candidates = Path().glob(source)
+    else:
+        candidates = [path]
+    return sorted(p for p in candidates if p.is_file() and p.suffix.lower() in SUPPORTED_EXTENSIONS)
+
+
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _parse(path: Path) -> list[dict]:
+    # One entry per PDF page, or a single entry for a text file
+    if path.suffix.lower() == ".pdf":
+        reader = PdfReader(path)
+        return [
+            {"text": page.extract_text() or "", "metadata": {"page": number}}
+            for number, page in enumerate(reader.pages)
+        ]
+    text = path.read_text(encoding="utf-8", errors="replace")
+    return [{"text": text, "metadata": {"language": TEXT_EXTENSIONS[path.suffix.lower()]}}]
+
+
+class ParsedTextCache:
+    """Per-file cache of parsed text, validated by mtime/size and then content hash."""
+
+    def __init__(self, cache_dir: str | os.PathLike = CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.hits = 0
+        self.parses = 0
+
+    def _entry_path(self, path: Path) -> Path:
+        key = hashlib.sha256(str(path.resolve()).encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{key}.json"
+
+    def load(self, path: Path) -> list[dict]:
+        stat = path.stat()
+        entry_path = self._entry_path(path)
+        entry = None
+        if entry_path.exists():
+            with open(entry_path, encoding="utf-8") as entry_file:
+                entry = json.load(entry_file)
+            if entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                self.hits += 1
+                return entry["parts"]
+
+        # mtime/size changed (or no entry): only re-parse if the content really changed
+        digest = _file_hash(path)
+        if entry is not None and entry["sha256"] == digest:
+            self.hits += 1
+            parts = entry["parts"]
+        else:
+            self.parses += 1
+            parts = _parse(path)
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = entry_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as entry_file:
+            json.dump(
+                {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": digest, "parts": parts},
+                entry_file
+            )
+        os.replace(tmp_path, entry_path)
+        return parts
+
+
+def load_local_documents(source: str, cache: ParsedTextCache | None = None) -> list[Document]:
+    """Loads every supported file under `source`; each file becomes its own document source."""
+    cache = cache or ParsedTextCache()
+    docs = []
+    for path in expand_local_source(source):
+        for part in cache.load(path):
+            metadata = {"source": path.as_posix(), "title": path.stem, **part["metadata"]}
+            docs.append(Document(page_content=part["text"], metadata=metadata))
+    return docs
@@ -0,0 +1,188 @@
+"""
+Conversation memory
+
+Keeps a conversation's message history inside a token budget so long sessions
+don't get slower, costlier and eventually overflow the context window. When the
+history goes over budget it is compacted in two stages, cheapest first:
+
+1. Old tool outputs (retrieved context, search results) are cut down to a short
+   stub. The latest turns are left alone, and so are outputs of pinned tools such
+   as the label tools.
+2. If that is not enough, every turn except the latest keep_turns is rolled into a
+   running summary, which replaces them as the first message.
+
+Pinned text (the conversation's label references) is carried verbatim in the summary
+message instead of being summarized, so it survives any number of compactions.
+Turns are cut at user messages, so a tool call is never separated from its result.
+HumanMessages the application writes itself (the summary, a rewritten question) are
+named GENERATED; is_user_message() leaves them out, so they never start a turn.
+
+MemoryBudgetMiddleware applies this before each model call of a create_agent agent;
+StateGraph nodes can call memory_update() directly. Both return the rewritten
+history as a state update, so the compaction is also what gets checkpointed.
+"""
+
+import asyncio
+import json
+import os
+import threading
+from typing import Any, Callable, Sequence
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.messages import BaseMessage, HumanMessage, RemoveMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langgraph.constants import TAG_NOSTREAM
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+
+MEMORY_TOKEN_BUDGET = int(os.getenv("MEMORY_TOKEN_BUDGET", "8000"))
+KEEP_TURNS = 2
+TOOL_STUB_CHARS = 200
+SUMMARY_ID = "conversation-summary"
+GENERATED = "generated"
+
+_SUMMARY_HEADER = "Summary of the earlier conversation:\n"
+_PINNED_HEADER = "\n\nPinned (kept verbatim):\n"
+
+SUMMARY_PROMPT = """Update the running summary of a conversation about designing Bluesky labelers.
+Keep decisions, open questions, user preferences and any label details discussed. Be concise and factual.
+
+Current summary:
+{summary}
+
+New messages to fold in:
+{messages}
+
+Return only the updated summary."""
+
+Summarizer = Callable[[str, Sequence[BaseMessage]], str]
+
+
+def is_user_message(message: BaseMessage) -> bool:
+    """Whether message was written by the user, not generated by the application as a HumanMessage."""
+    # Summaries checkpointed before they were named are still recognised by their id
+    return isinstance(message, HumanMessage) and message.name != GENERATED and message.id != SUMMARY_ID
+
+
+def llm_summarizer(model) -> Summarizer:
+    """Summarizer that asks a chat model to fold messages into the previous summary."""
+    def summarize(summary: str, messages: Sequence[BaseMessage]) -> str:
+        transcript = "\n".join(f"{message.type}: {message.text}" for message in messages)
+        prompt = SUMMARY_PROMPT.format(summary=summary or "(none)", messages=transcript)
+        # Tagged so the summary's tokens stay out of "messages" streams shown to the user
+        return model.invoke([{"role": "user", "content": prompt}], config={"tags": [TAG_NOSTREAM]}).text
+    return summarize
+
+
+def pinned_labels(state) -> str:
+    """The state's labels as JSON, for pinning in the summary.
+
+    Agents that keep definitions in the label store hold {identifier: version} references here.
+    """
+    labels = state.get("labels") or {}
+    if not labels:
+        return ""
+    dumped = {
+        identifier: label.model_dump(mode="json") if hasattr(label, "model_dump") else label
+        for identifier, label in labels.items()
+    }
+    return "Label definitions: " + json.dumps(dumped, sort_keys=True)
+
+
+class ConversationMemory:
+    """Compacts message histories to a token budget; thread-safe counters for monitoring."""
+
+    def __init__(
+        self,
+        summarizer: Summarizer,
+        token_budget: int = MEMORY_TOKEN_BUDGET,
+        keep_turns: int = KEEP_TURNS,
+        pinned_tools: Sequence[str] = (),
+        tool_stub_chars: int = TOOL_STUB_CHARS
+    ):
+        self.summarizer = summarizer
+        self.token_budget = token_budget
+        self.keep_turns = keep_turns
+        self.pinned_tools = set(pinned_tools)
+        self.tool_stub_chars = tool_stub_chars
+        self._lock = threading.Lock()
+        self.compactions = 0
+        self.trimmed_tool_outputs = 0
+        self.summaries = 0
+
+    def _recent_start(self, messages: list[BaseMessage]) -> int:
+        # Index of the first message of the keep_turns latest turns (0 if there are fewer)
+        turn_starts = [i for i, message in enumerate(messages) if is_user_message(message)]
+        return turn_starts[-self.keep_turns] if len(turn_starts) >= self.keep_turns else 0
+
+    def _trim(self, message: BaseMessage) -> BaseMessage:
+        if not isinstance(message, ToolMessage) or message.name in self.pinned_tools:
+            return message
+        text = message.text
+        if len(text) <= self.tool_stub_chars:
+            return message
+        stub = f"{text[:self.tool_stub_chars]}... [tool output trimmed, {len(text)} chars]"
+        with self._lock:
+            self.trimmed_tool_outputs += 1
+        return message.model_copy(update={"content": stub, "artifact": None})
+
+    def compact(self, messages: Sequence[BaseMessage], pinned: str = "") -> list[BaseMessage] | None:
+        """The compacted history, or None if it already fits the budget."""
+        messages = list(messages)
+        if count_tokens_approximately(messages) <= self.token_budget:
+            return None
+
+        recent = self._recent_start(messages)
+        if recent == 0:
+            # Everything is part of the latest turns; nothing may be trimmed or summarized
+            return None
+        older = [self._trim(message) for message in messages[:recent]]
+        compacted = older + messages[recent:]
+        if count_tokens_approximately(compacted) > self.token_budget:
+            summary = ""
+            if older[0].id == SUMMARY_ID:
+                summary = older[0].text.split(_PINNED_HEADER)[0].removeprefix(_SUMMARY_HEADER)
+                older = older[1:]
+            if older:
+                summary = self.summarizer(summary, older)
+                content = _SUMMARY_HEADER + summary + (_PINNED_HEADER + pinned if pinned else "")
+                compacted = [HumanMessage(content=content, id=SUMMARY_ID, name=GENERATED)] + messages[recent:]
+                with self._lock:
+                    self.summaries += 1
+
+        if all(a is b for a, b in zip(compacted, messages)) and len(compacted) == len(messages):
+            return None
+        with self._lock:
+            self.compactions += 1
+        return compacted
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "compactions": self.compactions,
+                "trimmed_tool_outputs": self.trimmed_tool_outputs,
+                "summaries": self.summaries,
+            }
+
+
+def memory_update(memory: ConversationMemory, messages: Sequence[BaseMessage], pinned: str = "") -> list:
+    """A messages update that replaces the history with its compacted form (empty if within budget)."""
+    compacted = memory.compact(messages, pinned=pinned)
+    if compacted is None:
+        return []
+    return [RemoveMessage(id=REMOVE_ALL_MESSAGES), *compacted]
+
+
+class MemoryBudgetMiddleware(AgentMiddleware):
+    """Compacts the agent's history before each model call; labels in state stay pinned."""
+
+    def __init__(self, memory: ConversationMemory):
+        super().__init__()
+        self.memory = memory
+
+    def before_model(self, state, runtime) -> dict[str, Any] | None:
+        update = memory_update(self.memory, state["messages"], pinned=pinned_labels(state))
+        return {"messages": update} if update else None
+
+    async def abefore_model(self, state, runtime) -> dict[str, Any] | None:
+        # The summarizer is a blocking model call; keep it off the event loop
+        return await asyncio.to_thread(self.before_model, state, runtime)
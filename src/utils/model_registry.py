@@ -0,0 +1,354 @@
+"""
+Model registry
+
+One place to create chat models for every agent. Models are named profiles
+(MODEL_PROFILES), built once per process and shared. All models of a provider
+share one pooled, keep-alive HTTP client per sync/async mode. The pool's connection
+limit is the provider's concurrency limit: calls beyond it wait for a free
+connection instead of opening new ones. Tool-bound and structured-output variants
+are cached too, so nodes can ask for them on every call without rebuilding.
+
+Timeouts, retries and pool sizes come from environment variables, optionally per
+provider (the provider-specific variable wins):
+
+    MODEL_TIMEOUT / MODEL_TIMEOUT_OPENAI                   seconds per request (default 10)
+    MODEL_MAX_RETRIES / MODEL_MAX_RETRIES_ANTHROPIC        SDK retries (default 2)
+    MODEL_MAX_CONNECTIONS / MODEL_MAX_CONNECTIONS_OLLAMA   concurrent requests (default 10)
+    MODEL_POOL_TIMEOUT                                     seconds to wait for a free connection (default 60)
+
+ModelMetrics records calls, latency, tokens (input tokens split into cached and
+uncached by provider prompt caching), errors and HTTP requests per profile and
+provider; each call's token split is also logged at DEBUG. Retries are the HTTP
+requests a provider received beyond one per call.
+"""
+
+import importlib
+import inspect
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from functools import cached_property, lru_cache
+from typing import Any
+from uuid import UUID
+
+import httpx
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+logger = logging.getLogger(__name__)
+
+MODEL_PROFILES: dict[str, dict[str, Any]] = {
+    # Feedback and researcher agents
+    "claude": {"provider": "anthropic", "model": "claude-sonnet-4-5-20250929", "temperature": 0.5, "max_tokens": 1000},
+    "coordinator": {"provider": "openai", "model": "gpt-4o-mini"},
+    # Brainstorming graph
+    "openai": {"provider": "openai", "model": "gpt-4.1-mini", "temperature": 0},
+    "ollama": {"provider": "ollama", "model": "mistral:7b", "temperature": 0, "reasoning": False},
+}
+
+_SETTINGS = {
+    "timeout": ("MODEL_TIMEOUT", float, 10.0),
+    "max_retries": ("MODEL_MAX_RETRIES", int, 2),
+    "max_connections": ("MODEL_MAX_CONNECTIONS", int, 10),
+    "pool_timeout": ("MODEL_POOL_TIMEOUT", float, 60.0),
+}
+
+
+def provider_settings(provider: str) -> dict[str, Any]:
+    """Timeout, retry and pool settings for a provider, read from the environment."""
+    settings = {}
+    for key, (variable, cast, default) in _SETTINGS.items():
+        value = os.getenv(f"{variable}_{provider.upper()}", os.getenv(variable))
+        settings[key] = cast(value) if value is not None else default
+    return settings
+
+
+@lru_cache(maxsize=None)
+def pooled_chat_anthropic() -> type:
+    """ChatAnthropic with http_client / http_async_client arguments, like ChatOpenAI's.
+
+    The SDK clients are built with the public anthropic.Client constructor from the
+    model's public fields and the given httpx clients.
+    """
+    import anthropic
+    from langchain_anthropic import ChatAnthropic
+    from pydantic import Field
+
+    # ChatAnthropic builds its SDK clients in these cached properties; if a release moves
+    # them, overriding would silently stop sharing the pool, so refuse to build instead
+    for name in ("_client", "_async_client"):
+        if not isinstance(inspect.getattr_static(ChatAnthropic, name, None), cached_property):
+            raise ImportError(f"ChatAnthropic.{name} is no longer a cached property; update pooled_chat_anthropic()")
+
+    class PooledChatAnthropic(ChatAnthropic):
+        http_client: Any = Field(default=None, exclude=True)
+        http_async_client: Any = Field(default=None, exclude=True)
+
+        def _sdk_kwargs(self) -> dict[str, Any]:
+            kwargs = {
+                "api_key": self.anthropic_api_key.get_secret_value(),
+                "base_url": self.anthropic_api_url,
+                "max_retries": self.max_retries,
+                "default_headers": self.default_headers,
+            }
+            if self.default_request_timeout is not None:
+                kwargs["timeout"] = self.default_request_timeout
+            return kwargs
+
+        @cached_property
+        def _client(self) -> anthropic.Client:
+            return anthropic.Client(**self._sdk_kwargs(), http_client=self.http_client)
+
+        @cached_property
+        def _async_client(self) -> anthropic.AsyncClient:
+            return anthropic.AsyncClient(**self._sdk_kwargs(), http_client=self.http_async_client)
+
+    return PooledChatAnthropic
+
+
+class ModelMetrics(BaseCallbackHandler):
+    """Thread-safe per-profile call metrics, fed by model callbacks and HTTP event hooks."""
+
+    # Bookkeeping only, so run it inline rather than on an executor under async
+    run_inline = True
+
+    def __init__(self, profiles: dict[str, dict[str, Any]] | None = None):
+        self.profiles = MODEL_PROFILES if profiles is None else profiles
+        self._lock = threading.Lock()
+        self._started: dict[UUID, tuple[str, float]] = {}
+        self.models: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self.providers: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def _profile(self, metadata: dict | None) -> str:
+        return (metadata or {}).get("model_profile", "unknown")
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata=None, **kwargs) -> None:
+        with self._lock:
+            self._started[run_id] = (self._profile(metadata), time.perf_counter())
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs) -> None:
+        with self._lock:
+            profile, started = self._started.pop(run_id, ("unknown", None))
+            stats = self.models[profile]
+            stats["calls"] += 1
+            if started is not None:
+                stats["seconds"] += time.perf_counter() - started
+            for generations in response.generations:
+                for generation in generations:
+                    usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                    details = usage.get("input_token_details") or {}
+                    cached = details.get("cache_read") or 0
+                    written = details.get("cache_creation") or 0
+                    stats["input_tokens"] += usage.get("input_tokens", 0)
+                    stats["cache_read_tokens"] += cached
+                    stats["cache_creation_tokens"] += written
+                    stats["output_tokens"] += usage.get("output_tokens", 0)
+                    logger.debug(
+                        "%s call: %d input tokens (%d cached, %d written to cache), %d output tokens",
+                        profile, usage.get("input_tokens", 0), cached, written, usage.get("output_tokens", 0)
+                    )
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        with self._lock:
+            profile, _ = self._started.pop(run_id, ("unknown", None))
+            self.models[profile]["errors"] += 1
+
+    def record_request(self, provider: str) -> None:
+        with self._lock:
+            self.providers[provider]["requests"] += 1
+
+    def record_response(self, provider: str, status_code: int) -> None:
+        if status_code == 429 or status_code >= 500:
+            with self._lock:
+                self.providers[provider]["retryable_responses"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            models = {}
+            calls_by_provider = defaultdict(int)
+            for profile, stats in self.models.items():
+                calls = int(stats["calls"])
+                provider = self.profiles.get(profile, {}).get("provider")
+                if provider:
+                    calls_by_provider[provider] += calls + int(stats["errors"])
+                input_tokens = int(stats["input_tokens"])
+                cached = int(stats["cache_read_tokens"])
+                models[profile] = {
+                    "calls": calls,
+                    "errors": int(stats["errors"]),
+                    "mean_latency": stats["seconds"] / calls if calls else 0.0,
+                    "input_tokens": input_tokens,
+                    "cached_input_tokens": cached,
+                    "cache_creation_tokens": int(stats["cache_creation_tokens"]),
+                    "uncached_input_tokens": input_tokens - cached,
+                    "cache_hit_ratio": cached / input_tokens if input_tokens else 0.0,
+                    "output_tokens": int(stats["output_tokens"]),
+                }
+            providers = {
+                provider: {
+                    "requests": stats["requests"],
+                    "retryable_responses": stats["retryable_responses"],
+                    "retries": max(stats["requests"] - calls_by_provider[provider], 0),
+                }
+                for provider, stats in self.providers.items()
+            }
+        return {"models": models, "providers": providers}
+
+
+class ModelRegistry:
+    """Builds and caches chat models by profile name, sharing HTTP pools per provider."""
+
+    def __init__(self, profiles: dict[str, dict[str, Any]] | None = None):
+        self.profiles = dict(MODEL_PROFILES if profiles is None else profiles)
+        self.metrics = ModelMetrics(self.profiles)
+        self._lock = threading.RLock()
+        self._clients: dict[tuple[str, bool], Any] = {}
+        self._models: dict[str, Any] = {}
+        self._variants: dict[tuple, Any] = {}
+
+    # ---- HTTP pools ----
+
+    def _hooks(self, provider: str, is_async: bool) -> dict:
+        def on_request(request):
+            self.metrics.record_request(provider)
+
+        def on_response(response):
+            self.metrics.record_response(provider, response.status_code)
+
+        if not is_async:
+            return {"request": [on_request], "response": [on_response]}
+
+        async def aon_request(request):
+            on_request(request)
+
+        async def aon_response(response):
+            on_response(response)
+
+        return {"request": [aon_request], "response": [aon_response]}
+
+    def _http_classes(self, provider: str) -> tuple:
+        # The OpenAI and Anthropic SDKs only accept clients from the httpx build they ship
+        # with, so take the client, Timeout and Limits classes from the SDK itself
+        if provider in ("openai", "anthropic"):
+            sdk = importlib.import_module(provider)
+            return sdk.DefaultHttpxClient, sdk.DefaultAsyncHttpxClient, sdk.Timeout, type(sdk.DEFAULT_CONNECTION_LIMITS)
+        return httpx.Client, httpx.AsyncClient, httpx.Timeout, httpx.Limits
+
+    def _client_kwargs(self, provider: str, is_async: bool) -> dict:
+        settings = provider_settings(provider)
+        connections = settings["max_connections"]
+        _, _, timeout_cls, limits_cls = self._http_classes(provider)
+        return {
+            "limits": limits_cls(
+                max_connections=connections,
+                max_keepalive_connections=connections,
+                keepalive_expiry=30.0
+            ),
+            "timeout": timeout_cls(settings["timeout"], pool=settings["pool_timeout"]),
+            "event_hooks": self._hooks(provider, is_async),
+        }
+
+    def http_client(self, provider: str, is_async: bool = False):
+        """The shared pooled client for a provider, created on first use."""
+        with self._lock:
+            key = (provider, is_async)
+            if key not in self._clients:
+                sync_cls, async_cls, _, _ = self._http_classes(provider)
+                client_cls = async_cls if is_async else sync_cls
+                self._clients[key] = client_cls(**self._client_kwargs(provider, is_async))
+            return self._clients[key]
+
+    # ---- Models ----
+
+    def _build(self, name: str):
+        profile = dict(self.profiles[name])
+        provider = profile.pop("provider")
+        settings = provider_settings(provider)
+        common = {"callbacks": [self.metrics], "metadata": {"model_profile": name}}
+
+        if provider == "openai":
+            from langchain_openai import ChatOpenAI
+            return ChatOpenAI(
+                **profile,
+                **common,
+                timeout=settings["timeout"],
+                max_retries=settings["max_retries"],
+                http_client=self.http_client(provider),
+                http_async_client=self.http_client(provider, is_async=True),
+            )
+
+        if provider == "anthropic":
+            return pooled_chat_anthropic()(
+                **profile,
+                **common,
+                default_request_timeout=settings["timeout"],
+                max_retries=settings["max_retries"],
+                http_client=self.http_client(provider),
+                http_async_client=self.http_client(provider, is_async=True),
+            )
+
+        if provider == "ollama":
+            from langchain_ollama import ChatOllama
+            # The ollama SDK builds its own httpx clients; pass it the same pool settings
+            return ChatOllama(
+                **profile,
+                **common,
+                sync_client_kwargs=self._client_kwargs(provider, is_async=False),
+                async_client_kwargs=self._client_kwargs(provider, is_async=True),
+            )
+
+        raise ValueError(f"Unsupported model provider: {provider}")
+
+    def get(self, name: str, tools: list | None = None, structured_output: type | None = None, **bind_kwargs):
+        """The shared model for a profile, optionally bound to tools or a structured output schema."""
+        if name not in self.profiles:
+            raise ValueError(f"Unsupported model type: {name}")
+
+        with self._lock:
+            if name not in self._models:
+                self._models[name] = self._build(name)
+            model = self._models[name]
+            if tools is None and structured_output is None:
+                return model
+
+            key = (
+                name,
+                tuple(getattr(tool, "name", None) or getattr(tool, "__name__", repr(tool)) for tool in tools or ()),
+                structured_output,
+                tuple(sorted((k, repr(v)) for k, v in bind_kwargs.items())),
+            )
+            if key not in self._variants:
+                if structured_output is not None:
+                    self._variants[key] = model.with_structured_output(structured_output, **bind_kwargs)
+                else:
+                    self._variants[key] = model.bind_tools(tools, **bind_kwargs)
+            return self._variants[key]
+
+    def register(self, name: str, model, provider: str = "custom") -> None:
+        """Installs a prebuilt model under a profile name, e.g. a fake model for offline benchmarks."""
+        with self._lock:
+            self.profiles.setdefault(name, {"provider": provider})
+            # Same profile tag the built models carry, so metrics attribute its calls
+            model.metadata = {**(model.metadata or {}), "model_profile": name}
+            self._models[name] = model
+            self._variants = {key: variant for key, variant in self._variants.items() if key[0] != name}
+
+    def close(self) -> None:
+        """Closes the sync pools and forgets every model; async pools are left to the GC."""
+        with self._lock:
+            for (_, is_async), client in self._clients.items():
+                if not is_async:
+                    client.close()
+            self._clients.clear()
+            self._models.clear()
+            self._variants.clear()
+
+
+registry = ModelRegistry()
+
+
+def get_model(name: str, tools: list | None = None, structured_output: type | None = None, **bind_kwargs):
+    """Shortcut for registry.get()."""
+    return registry.get(name, tools=tools, structured_output=structured_output, **bind_kwargs)
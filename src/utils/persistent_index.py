@@ -0,0 +1,270 @@
+"""
+Persistent vector index.
+
+Chunk text, metadata and embeddings are stored on disk so a restart only has to
+load files instead of re-fetching and re-embedding the corpus:
+
+    <index_dir>/embeddings.f32   L2-normalized float32 matrix (rows x dim), memory-mapped on load
+    <index_dir>/manifest.json    embedding model, per-source content hashes and row ranges, chunks
+    <index_dir>/keywords.npz     BM25 inverted index over the chunks, built at ingestion time
+
+Chunks are grouped by their `source` metadata and each source is keyed by a hash
+of its content, so an update only re-embeds the sources that changed.
+Any langchain Embeddings works, e.g. DeterministicFakeEmbedding for offline runs.
+Because rows are stored normalized, the search store wraps the memmap without copying.
+
+Updates hold an exclusive lock on <index_dir>/.lock (flock, plus a thread lock) and
+write unique temporary files, so two builders on one directory (server workers, a
+warm-up racing a refresh) run one after the other. The embeddings file is replaced
+before the manifest, which is the commit point.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: only builders in the same process are serialized
+    fcntl = None
+
+import numpy as np
+from langchain_core.documents import Document
+
+from .ann_index import make_ann_index
+from .keyword_index import KeywordIndex
+from .vector_store import NumpyVectorStore, normalize_rows
+
+FORMAT_VERSION = 2
+MATRIX_FILE = "embeddings.f32"
+MANIFEST_FILE = "manifest.json"
+KEYWORDS_FILE = "keywords.npz"
+LOCK_FILE = ".lock"
+
+_thread_locks: dict[Path, threading.Lock] = {}
+_thread_locks_guard = threading.Lock()
+
+
+@contextmanager
+def _exclusive(directory: Path):
+    directory.mkdir(parents=True, exist_ok=True)
+    with _thread_locks_guard:
+        thread_lock = _thread_locks.setdefault(directory.resolve(), threading.Lock())
+    with thread_lock, open(directory / LOCK_FILE, "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+
+def _temp_file(directory: Path, name: str) -> Path:
+    # Unique per writer, so concurrent writers never share a temporary file
+    fd, path = tempfile.mkstemp(dir=directory, prefix=f"{name}.", suffix=".tmp" + Path(name).suffix)
+    os.close(fd)
+    return Path(path)
+
+
+def embedding_model_name(embeddings) -> str:
+    # OpenAIEmbeddings/OllamaEmbeddings expose `model`; fall back to the class name
+    return getattr(embeddings, "model", None) or type(embeddings).__name__
+
+
+def content_hash(chunks: list[Document]) -> str:
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk.page_content.encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(json.dumps(chunk.metadata, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(b"\x01")
+    return digest.hexdigest()
+
+
+def _group_by_source(documents: list[Document]) -> dict[str, list[Document]]:
+    groups: dict[str, list[Document]] = {}
+    for doc in documents:
+        groups.setdefault(str(doc.metadata.get("source", "")), []).append(doc)
+    return groups
+
+
+class PersistentIndex:
+    """On-disk chunk/embedding store with per-source change detection."""
+
+    def __init__(self, path: str | os.PathLike, embeddings):
+        self.path = Path(path)
+        self.embeddings = embeddings
+        self.model = embedding_model_name(embeddings)
+        self.matrix: np.ndarray | None = None
+        self.chunks: list[dict] = []
+        self.sources: dict[str, dict] = {}
+        self.keyword_index: KeywordIndex | None = None
+
+    @property
+    def matrix_path(self) -> Path:
+        return self.path / MATRIX_FILE
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.path / MANIFEST_FILE
+
+    @property
+    def keywords_path(self) -> Path:
+        return self.path / KEYWORDS_FILE
+
+    def exists(self) -> bool:
+        return self.manifest_path.exists() and self.matrix_path.exists()
+
+    def load(self) -> bool:
+        """Loads the index from disk. Returns False if missing or built with another model."""
+        if not self.exists():
+            return False
+        with open(self.manifest_path, encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+        if manifest.get("format") != FORMAT_VERSION or manifest.get("model") != self.model:
+            return False
+
+        count, dim = manifest["count"], manifest["dim"]
+        if count:
+            self.matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r", shape=(count, dim))
+        else:
+            self.matrix = np.zeros((0, dim), dtype=np.float32)
+        self.chunks = manifest["chunks"]
+        self.sources = manifest["sources"]
+        self.keyword_index = None
+        return True
+
+    def get_keyword_index(self) -> KeywordIndex:
+        """Loads the persisted keyword index, building and saving it if it is missing."""
+        if self.keyword_index is None:
+            if self.keywords_path.exists():
+                self.keyword_index = KeywordIndex.load(self.keywords_path)
+            else:
+                self._save_keyword_index()
+        return self.keyword_index
+
+    def _save_keyword_index(self) -> None:
+        self.keyword_index = KeywordIndex().build([chunk["text"] for chunk in self.chunks])
+        tmp_keywords = _temp_file(self.path, KEYWORDS_FILE)
+        try:
+            self.keyword_index.save(tmp_keywords)
+            os.replace(tmp_keywords, self.keywords_path)
+        finally:
+            tmp_keywords.unlink(missing_ok=True)
+
+    def stale(self, documents: list[Document]) -> list[Document]:
+        """The chunks of sources that are new or changed since the last update, i.e. those update() would embed."""
+        if self.matrix is None:
+            self.load()
+        return [
+            chunk
+            for source, chunks in _group_by_source(documents).items()
+            if self.sources.get(source, {}).get("hash") != content_hash(chunks)
+            for chunk in chunks
+        ]
+
+    def update(self, documents: list[Document], keep_sources=()) -> dict:
+        """Syncs the index with `documents`, embedding only new or changed sources.
+
+        Sources listed in `keep_sources` but absent from `documents` (e.g. a failed
+        fetch) keep their previously indexed chunks instead of being dropped.
+        """
+        with _exclusive(self.path):
+            # Start from what is on disk now; another builder may have updated it
+            self.load()
+            return self._update(documents, keep_sources)
+
+    def _update(self, documents: list[Document], keep_sources) -> dict:
+        groups = _group_by_source(documents)
+        hashes = {source: content_hash(chunks) for source, chunks in groups.items()}
+        for source in keep_sources:
+            if source not in groups and source in self.sources:
+                old = self.sources[source]
+                groups[source] = [None] * (old["stop"] - old["start"])
+                hashes[source] = old["hash"]
+        reused = {
+            source for source, digest in hashes.items()
+            if self.sources.get(source, {}).get("hash") == digest
+        }
+        changed = [source for source in groups if source not in reused]
+        removed = set(self.sources) - set(groups)
+
+        # Embed every changed chunk in one batch
+        changed_chunks = [chunk for source in changed for chunk in groups[source]]
+        new_vectors = (
+            normalize_rows(self.embeddings.embed_documents([c.page_content for c in changed_chunks]))
+            if changed_chunks else None
+        )
+
+        dim = (
+            new_vectors.shape[1] if new_vectors is not None
+            else self.matrix.shape[1] if self.matrix is not None
+            else 0
+        )
+        rows = [(source, len(groups[source])) for source in groups]
+        count = sum(n for _, n in rows)
+
+        tmp_matrix = _temp_file(self.path, MATRIX_FILE)
+        tmp_manifest = _temp_file(self.path, MANIFEST_FILE)
+        try:
+            out = np.memmap(tmp_matrix, dtype=np.float32, mode="w+", shape=(max(count, 1), max(dim, 1)))
+
+            chunks, sources, cursor, new_cursor = [], {}, 0, 0
+            for source, n in rows:
+                if source in reused:
+                    old = self.sources[source]
+                    out[cursor:cursor + n] = self.matrix[old["start"]:old["stop"]]
+                    chunks.extend(self.chunks[old["start"]:old["stop"]])
+                else:
+                    out[cursor:cursor + n] = new_vectors[new_cursor:new_cursor + n]
+                    new_cursor += n
+                    chunks.extend(
+                        {"text": c.page_content, "metadata": c.metadata} for c in groups[source]
+                    )
+                sources[source] = {"hash": hashes[source], "start": cursor, "stop": cursor + n}
+                cursor += n
+            out.flush()
+            del out
+
+            manifest = {
+                "format": FORMAT_VERSION,
+                "model": self.model,
+                "dim": dim,
+                "count": count,
+                "sources": sources,
+                "chunks": chunks,
+            }
+            with open(tmp_manifest, "w", encoding="utf-8") as manifest_file:
+                json.dump(manifest, manifest_file, default=str)
+
+            # Swap the matrix first; the manifest is the commit point
+            os.replace(tmp_matrix, self.matrix_path)
+            os.replace(tmp_manifest, self.manifest_path)
+        finally:
+            tmp_matrix.unlink(missing_ok=True)
+            tmp_manifest.unlink(missing_ok=True)
+        self.load()
+        self._save_keyword_index()
+
+        return {
+            "reused": sum(len(groups[s]) for s in reused),
+            "embedded": len(changed_chunks),
+            "removed_sources": len(removed),
+        }
+
+    def to_vector_store(self, search_config: dict | None = None) -> NumpyVectorStore:
+        """Wraps the stored chunks and vectors in a search store without re-embedding.
+
+        `search_config` selects exact or ANN search, see ann_index.make_ann_index.
+        """
+        store = NumpyVectorStore.from_matrix(
+            self.matrix,
+            texts=[chunk["text"] for chunk in self.chunks],
+            metadatas=[chunk["metadata"] for chunk in self.chunks],
+            embedding=self.embeddings,
+            normalized=True,
+            ann_index=make_ann_index(search_config)
+        )
+        store.keyword_index = self.get_keyword_index()
+        return store
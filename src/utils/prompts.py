@@ -0,0 +1,31 @@
+"""
+Prompt assembly
+
+System prompts are built once, at import, from static sections, so every turn and
+every sub-agent call sends byte-identical prefixes that providers can cache:
+
+- OpenAI caches repeated prefixes of 1024+ tokens automatically; it only needs the
+  prefix (tools, then system prompt) to be identical from call to call.
+- Anthropic caches up to explicit cache_control breakpoints, which
+  prompt_cache_middleware() adds after the tools and the system prompt.
+
+Anything that changes per turn (labels, retrieved context, the user's request)
+belongs in messages after the system prompt, never interpolated into it. Cached
+and uncached input tokens per call are reported by the model registry's metrics.
+"""
+
+from langchain.agents.middleware import AgentMiddleware
+
+
+def assemble_prompt(*sections: str) -> str:
+    """Joins static prompt sections into one deterministic system prompt."""
+    return "\n\n".join(section.strip() for section in sections if section and section.strip()) + "\n"
+
+
+def prompt_cache_middleware(provider: str) -> list[AgentMiddleware]:
+    """Agent middleware that marks the static prefix for caching on providers that need it."""
+    if provider == "anthropic":
+        from langchain_anthropic.middleware import AnthropicPromptCachingMiddleware
+        return [AnthropicPromptCachingMiddleware(ttl="5m", unsupported_model_behavior="ignore")]
+    # OpenAI prefix caching is automatic; Ollama keeps its own KV cache per loaded model
+    return []
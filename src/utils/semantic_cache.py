@@ -0,0 +1,141 @@
+"""
+Semantic response cache.
+
+Stores final answers keyed by the embedding of the question that produced them.
+A new question whose cosine similarity to a stored one reaches the threshold
+gets the stored answer back, skipping the retrieval and generation chain.
+Entries expire after a TTL, the least recently used ones are evicted past
+max_entries, and everything is dropped when the corpus index version changes.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from .vector_store import normalize_rows
+
+
+class SemanticCache:
+    """Thread-safe question -> answer cache matched by embedding similarity."""
+
+    def __init__(
+        self,
+        embeddings: Embeddings | Callable[[], Embeddings],
+        threshold: float = 0.92,
+        max_entries: int = 512,
+        ttl_seconds: float | None = 3600,
+        version_fn: Callable[[], object] | None = None
+    ):
+        # A zero-arg factory defers creating the embeddings client until first use
+        self._embeddings = embeddings
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version_fn = version_fn
+        self.version = version_fn() if version_fn else None
+        self._entries: OrderedDict[int, dict] = OrderedDict()
+        self._next_key = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def embeddings(self) -> Embeddings:
+        if not hasattr(self._embeddings, "embed_query"):
+            self._embeddings = self._embeddings()
+        return self._embeddings
+
+    def _embed(self, question: str) -> np.ndarray:
+        return normalize_rows(self.embeddings.embed_query(question))
+
+    async def _aembed(self, question: str) -> np.ndarray:
+        return normalize_rows(await self.embeddings.aembed_query(question))
+
+    def _check_version(self) -> None:
+        # Caller holds self._lock
+        if self.version_fn is None:
+            return
+        version = self.version_fn()
+        if version != self.version:
+            self.version = version
+            if self._entries:
+                self._entries.clear()
+                self.invalidations += 1
+
+    def _expire(self, now: float) -> None:
+        # Caller holds self._lock; entries are in LRU order, not age order, so scan all
+        if self.ttl_seconds is None:
+            return
+        expired = [key for key, entry in self._entries.items() if now - entry["created"] > self.ttl_seconds]
+        for key in expired:
+            del self._entries[key]
+        self.expirations += len(expired)
+
+    def lookup(self, question: str) -> str | None:
+        """Returns a stored answer for a similar enough question, or None."""
+        return self._match(self._embed(question))
+
+    async def alookup(self, question: str) -> str | None:
+        return self._match(await self._aembed(question))
+
+    def store(self, question: str, answer: str) -> None:
+        self._insert(question, answer, self._embed(question))
+
+    async def astore(self, question: str, answer: str) -> None:
+        self._insert(question, answer, await self._aembed(question))
+
+    def _match(self, vector: np.ndarray) -> str | None:
+        with self._lock:
+            self._check_version()
+            self._expire(time.monotonic())
+            if not self._entries:
+                self.misses += 1
+                return None
+
+            keys = list(self._entries)
+            scores = np.stack([self._entries[key]["vector"] for key in keys]) @ vector
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end(keys[best])
+            return self._entries[keys[best]]["answer"]
+
+    def _insert(self, question: str, answer: str, vector: np.ndarray) -> None:
+        with self._lock:
+            self._check_version()
+            self._entries[self._next_key] = {
+                "question": question,
+                "answer": answer,
+                "vector": vector,
+                "created": time.monotonic(),
+            }
+            self._next_key += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,231 @@
+"""
+Labeler starter kit generator
+
+Renders approved label definitions into a copy of the labeler starter kit
+(STARTER_KIT_TEMPLATE, by default data/labeler-starter-kit-bsky-main), so a
+labeler project is generated from the label store without a model call:
+
+- src/constants.ts gets one LABELS entry per label, with its locales, severity,
+  blurs and default setting; DELETE and LABEL_LIMIT keep the template's values
+  unless given
+- src/types.ts and src/set-labels.ts are patched so set-labels publishes each
+  label's own severity, blurs and default setting instead of fixed values
+- package.json takes the project name; every other file is copied as is
+
+The template is read and split once per process and reused while none of its
+files' mtime or size change. Output is written incrementally: a file is only
+rewritten (through a temporary file and os.replace) when its content differs
+from what is already on disk, so regenerating after approving a few more labels
+touches src/constants.ts and nothing else.
+"""
+
+import json
+import os
+import re
+import string
+from functools import lru_cache
+from pathlib import Path
+
+from src.models.custom_schema import LabelValueDefinition
+from src.utils.label_store import LabelStore
+from src.utils.labeler_export import load_definitions, to_record_identifiers
+
+STARTER_KIT_TEMPLATE = os.getenv("STARTER_KIT_TEMPLATE", "data/labeler-starter-kit-bsky-main")
+RKEY_PLACEHOLDER = "insert-rkey-here"
+
+# Not part of a generated project: the upstream author's funding links and local state
+EXCLUDED = {".github", "node_modules", ".env", "cursor.txt", "labels.db"}
+
+LABELS_START = "export const LABELS: Label[] = [\n"
+LABELS_END = "];\n"
+
+# (file, template text, replacement); each must match exactly once
+PATCHES = [
+    (
+        "src/types.ts",
+        "  locales: LabelValueDefinitionStrings[];\n}",
+        "  locales: LabelValueDefinitionStrings[];\n"
+        "  severity?: 'alert' | 'inform' | 'none';\n"
+        "  blurs?: 'content' | 'media' | 'none';\n"
+        "  defaultSetting?: 'hide' | 'warn' | 'ignore';\n"
+        "}",
+    ),
+    ("src/set-labels.ts", "severity: 'inform',", "severity: label.severity ?? 'inform',"),
+    ("src/set-labels.ts", "blurs: 'none',", "blurs: label.blurs ?? 'none',"),
+    ("src/set-labels.ts", "defaultSetting: 'warn',", "defaultSetting: label.defaultSetting ?? 'warn',"),
+]
+
+
+class StarterKitTemplate:
+    """The starter kit split into static files and the pieces of constants.ts around LABELS."""
+
+    def __init__(self, files: dict[str, bytes], constants_head: string.Template, constants_tail: str, defaults: dict):
+        self.files = files
+        self.constants_head = constants_head
+        self.constants_tail = constants_tail
+        self.defaults = defaults
+
+
+def _template_files(directory: Path) -> list[Path]:
+    return sorted(
+        path for path in directory.rglob("*")
+        if path.is_file() and not EXCLUDED & set(path.relative_to(directory).parts)
+    )
+
+
+def _signature(directory: Path) -> tuple:
+    return tuple(
+        (path.relative_to(directory).as_posix(), stat.st_mtime_ns, stat.st_size)
+        for path in _template_files(directory)
+        for stat in [path.stat()]
+    )
+
+
+def _replace_once(text: str, old: str, new: str, name: str) -> str:
+    if text.count(old) != 1:
+        raise ValueError(f"Starter kit template {name} has changed: expected {old!r} exactly once")
+    return text.replace(old, new)
+
+
+@lru_cache(maxsize=8)
+def _parse_template(directory: Path, signature: tuple) -> StarterKitTemplate:
+    # signature is only part of the cache key, so edited templates are parsed again
+    files = {path.relative_to(directory).as_posix(): path.read_bytes() for path in _template_files(directory)}
+    for name, old, new in PATCHES:
+        files[name] = _replace_once(files[name].decode("utf-8"), old, new, name).encode("utf-8")
+
+    constants = files.pop("src/constants.ts").decode("utf-8")
+    head, _, rest = constants.partition(LABELS_START)
+    _, end, tail = rest.partition(LABELS_END)
+    delete = re.search(r"^export const DELETE = '([^']*)';$", head, re.MULTILINE)
+    label_limit = re.search(r"^export const LABEL_LIMIT = (\d+);$", head, re.MULTILINE)
+    if not (end and delete and label_limit):
+        raise ValueError("Starter kit template src/constants.ts has changed: DELETE, LABEL_LIMIT or LABELS not found")
+
+    head = head.replace("$", "$$")
+    head = head[:delete.start(1)] + "$delete" + head[delete.end(1):]
+    head = re.sub(r"(?m)^export const LABEL_LIMIT = \d+;$", "export const LABEL_LIMIT = $label_limit;", head)
+    return StarterKitTemplate(
+        files=files,
+        constants_head=string.Template(head + LABELS_START),
+        constants_tail=LABELS_END + tail,
+        defaults={"delete": delete.group(1), "label_limit": int(label_limit.group(1)), "name": json.loads(files["package.json"])["name"]},
+    )
+
+
+def load_template(directory: str | os.PathLike = STARTER_KIT_TEMPLATE) -> StarterKitTemplate:
+    """The parsed starter kit; parsed again only when a template file's mtime or size changes."""
+    directory = Path(directory).resolve()
+    return _parse_template(directory, _signature(directory))
+
+
+TS_ESCAPES = {"\\": "\\\\", "'": "\\'", "\n": "\\n", "\r": "\\r"}
+TS_SPECIAL = re.compile(r"[\\'\n\r]")
+
+
+def ts_string(value: str | None) -> str:
+    """A single-quoted TypeScript string literal, as the starter kit's prettier config writes them."""
+    value = value or ""
+    # Most values need no escaping; these substring checks are much cheaper than always running the regex
+    if "\\" in value or "'" in value or "\n" in value or "\r" in value:
+        value = TS_SPECIAL.sub(lambda match: TS_ESCAPES[match.group()], value)
+    return f"'{value}'"
+
+
+def render_label(label: LabelValueDefinition, rkey: str = RKEY_PLACEHOLDER) -> str:
+    """One LABELS entry, formatted like the template's."""
+    locales = "".join(
+        f"      {{ lang: {ts_string(locale.lang)}, name: {ts_string(locale.name)}, description: {ts_string(locale.description)} }},\n"
+        for locale in label.locales
+    )
+    return (
+        "  {\n"
+        f"    rkey: {ts_string(rkey)},\n"
+        f"    identifier: {ts_string(label.identifier)},\n"
+        # Literal fields from the schema, nothing to escape
+        f"    severity: '{label.severity}',\n"
+        f"    blurs: '{label.blurs}',\n"
+        f"    defaultSetting: '{label.default_setting}',\n"
+        "    locales: [\n"
+        f"{locales}"
+        "    ],\n"
+        "  },\n"
+    )
+
+
+def _package_name(name: str) -> str:
+    # npm names are lowercase, URL-safe and at most 214 characters
+    return re.sub(r"[^a-z0-9._-]+", "-", name.lower()).strip("-._")[:214] or "labeler"
+
+
+def render_project(
+    definitions: list[LabelValueDefinition],
+    template: StarterKitTemplate | None = None,
+    name: str | None = None,
+    rkeys: dict[str, str] | None = None,
+    delete: str | None = None,
+    label_limit: int | None = None,
+) -> dict[str, bytes]:
+    """Every file of the generated project, by relative path.
+
+    rkeys maps label identifiers to the rkeys of the posts users like to get them;
+    labels without one keep the template's placeholder.
+    """
+    template = template or load_template()
+    rkeys = rkeys or {}
+    # Looked up by the stored identifiers too, so rkeys may use either form
+    label_rkeys = [rkeys.get(label.identifier) for label in definitions]
+    definitions = to_record_identifiers(definitions)
+
+    files = dict(template.files)
+    constants = template.constants_head.substitute(
+        delete=delete if delete is not None else template.defaults["delete"],
+        label_limit=label_limit if label_limit is not None else template.defaults["label_limit"],
+    )
+    constants += "".join(
+        render_label(label, rkey or rkeys.get(label.identifier, RKEY_PLACEHOLDER))
+        for label, rkey in zip(definitions, label_rkeys)
+    )
+    files["src/constants.ts"] = (constants + template.constants_tail).encode("utf-8")
+    if name:
+        package = files["package.json"].decode("utf-8")
+        package = package.replace(
+            json.dumps(template.defaults["name"]), json.dumps(_package_name(name)), 1
+        )
+        files["package.json"] = package.encode("utf-8")
+    return files
+
+
+def _write_if_changed(path: Path, content: bytes) -> bool:
+    try:
+        if path.stat().st_size == len(content) and path.read_bytes() == content:
+            return False
+    except FileNotFoundError:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(content)
+    os.replace(tmp_path, path)
+    return True
+
+
+def generate_project(
+    output: str | os.PathLike,
+    store: LabelStore | None = None,
+    refs: dict[str, int] | None = None,
+    template: str | os.PathLike = STARTER_KIT_TEMPLATE,
+    **options,
+) -> dict[str, list[str]]:
+    """Writes a starter kit project for the store's labels (or the referenced versions) to output.
+
+    Options are passed to render_project; the project name defaults to output's
+    directory name. Returns the relative paths that were written and those left
+    unchanged because they already had the same content.
+    """
+    output = Path(output)
+    options.setdefault("name", output.resolve().name)
+    files = render_project(load_definitions(store, refs), load_template(template), **options)
+    result = {"written": [], "unchanged": []}
+    for relative, content in files.items():
+        changed = _write_if_changed(output / relative, content)
+        result["written" if changed else "unchanged"].append(relative)
+    return result
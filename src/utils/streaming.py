@@ -0,0 +1,97 @@
+"""
+Sub-agent streaming
+
+Runs a sub-agent in streaming mode and forwards its model tokens and tool results
+to the calling graph's custom stream, so a coordinator streamed with
+stream_mode="custom" shows sub-agent output as it is produced instead of only
+after the nested chain finishes. Each event is a dict:
+
+    {"agent": "researcher", "type": "token", "content": "..."}
+    {"agent": "researcher", "type": "tool", "name": "retrieve_context", "content": "..."}
+
+Only tokens from the sub-agent's answering node (create_agent's "model" node by
+default) are forwarded. Other model calls made while it runs, such as
+structured-output grading in a tool or another node, stream too but are
+internal; their JSON never reaches the custom stream.
+
+Outside a LangGraph run there is no stream to forward to and events are dropped.
+The sub-agent's final answer is returned either way. Model tokens also reach
+astream_events through callback propagation without any of this.
+"""
+
+from typing import Any, Callable
+
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+from langgraph.config import get_stream_writer
+
+from .instrumentation import span
+
+# create_agent runs the agent's own model calls in its "model" node
+ANSWER_NODES = ("model",)
+
+
+def stream_writer() -> Callable[[Any], None]:
+    """The current graph's custom stream writer; a no-op outside a LangGraph run."""
+    try:
+        return get_stream_writer()
+    except (RuntimeError, KeyError):
+        return lambda _: None
+
+
+def _request(content: str) -> dict:
+    return {"messages": [{"role": "user", "content": content}]}
+
+
+class _Forwarder:
+    """Turns (mode, chunk) pairs from a sub-agent stream into custom stream events."""
+
+    def __init__(self, agent_name: str, nodes: tuple[str, ...] = ANSWER_NODES):
+        self.agent_name = agent_name
+        self.nodes = nodes
+        self.write = stream_writer()
+        self.answer = ""
+
+    def __call__(self, mode: str, chunk: Any):
+        if mode == "messages":
+            token, metadata = chunk
+            if metadata.get("langgraph_node") not in self.nodes:
+                return
+            if isinstance(token, AIMessageChunk) and token.text:
+                self.write({"agent": self.agent_name, "type": "token", "content": token.text})
+            return
+
+        # "updates": one entry per node that ran, each with the messages it added
+        for update in chunk.values():
+            if not isinstance(update, dict):
+                continue
+            for message in update.get("messages", []):
+                if isinstance(message, ToolMessage):
+                    self.write({
+                        "agent": self.agent_name,
+                        "type": "tool",
+                        "name": message.name,
+                        "content": message.text
+                    })
+                elif isinstance(message, AIMessage) and not message.tool_calls:
+                    self.answer = message.text
+
+
+def stream_agent(agent, agent_name: str, content: str, nodes: tuple[str, ...] = ANSWER_NODES) -> str:
+    """Runs agent on a single user message, forwarding its events; returns the final answer.
+
+    Model tokens are forwarded only from the graph nodes named in nodes.
+    """
+    forward = _Forwarder(agent_name, nodes)
+    with span("subagent_seconds", agent=agent_name):
+        for mode, chunk in agent.stream(_request(content), stream_mode=["messages", "updates"]):
+            forward(mode, chunk)
+    return forward.answer
+
+
+async def astream_agent(agent, agent_name: str, content: str, nodes: tuple[str, ...] = ANSWER_NODES) -> str:
+    """Async variant of stream_agent()."""
+    forward = _Forwarder(agent_name, nodes)
+    with span("subagent_seconds", agent=agent_name):
+        async for mode, chunk in agent.astream(_request(content), stream_mode=["messages", "updates"]):
+            forward(mode, chunk)
+    return forward.answer
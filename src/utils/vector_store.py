@@ -0,0 +1,267 @@
+"""
+NumPy vector store.
+
+Exact cosine search over a contiguous float32 matrix whose rows are normalized
+once at insert time, so a query is one matrix-vector product plus an
+argpartition for the top k instead of a per-document Python loop.
+Several queries can be searched at once with a single matrix product.
+An optional ANN index (see ann_index.py) narrows large corpora to a candidate set,
+and an optional keyword index (see keyword_index.py) enables hybrid retrieval.
+"""
+
+import uuid
+from typing import Any, Callable, Iterable
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores along the last axis, best first."""
+    n = scores.shape[-1]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.int64)
+    if k < n:
+        candidates = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    else:
+        candidates = np.broadcast_to(np.arange(n), scores.shape[:-1] + (n,))
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=-1), axis=-1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=-1)
+
+
+class NumpyVectorStore(VectorStore):
+    """In-process exact vector store backed by a pre-normalized float32 matrix."""
+
+    def __init__(self, embedding: Embeddings, ann_index=None):
+        self.embedding = embedding
+        self.ann_index = ann_index
+        self.keyword_index = None
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._size = 0
+        self.ids: list[str] = []
+        self.texts: list[str] = []
+        self.metadatas: list[dict] = []
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return self._matrix[:self._size]
+
+    def __len__(self) -> int:
+        return self._size
+
+    @classmethod
+    def from_matrix(
+        cls,
+        matrix: np.ndarray,
+        texts: list[str],
+        metadatas: list[dict],
+        embedding: Embeddings,
+        ids: list[str] | None = None,
+        normalized: bool = False,
+        ann_index=None
+    ) -> "NumpyVectorStore":
+        """Wraps precomputed vectors; pass normalized=True to use them (e.g. a memmap) without copying."""
+        store = cls(embedding)
+        store._matrix = matrix if normalized else normalize_rows(matrix)
+        store._size = len(texts)
+        store.ids = list(ids) if ids is not None else [str(i) for i in range(len(texts))]
+        store.texts = list(texts)
+        store.metadatas = list(metadatas)
+        if ann_index is not None:
+            store.set_ann_index(ann_index)
+        return store
+
+    def set_ann_index(self, ann_index) -> None:
+        """Builds `ann_index` over the current rows and uses it for unfiltered searches (None for exact)."""
+        if ann_index is not None:
+            if self._size:
+                ann_index.build(self.matrix)
+            else:
+                # Nothing to index; the next add_vectors builds it from scratch
+                ann_index.reset()
+        self.ann_index = ann_index
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: list[str],
+        embedding: Embeddings,
+        metadatas: list[dict] | None = None,
+        **kwargs: Any
+    ) -> "NumpyVectorStore":
+        store = cls(embedding)
+        store.add_texts(texts, metadatas, **kwargs)
+        return store
+
+    def add_vectors(
+        self,
+        vectors: np.ndarray,
+        texts: list[str],
+        metadatas: list[dict] | None = None,
+        ids: list[str] | None = None
+    ) -> list[str]:
+        vectors = normalize_rows(vectors)
+        count = len(texts)
+        if count == 0:
+            return []
+
+        if self._size and vectors.shape[1] != self._matrix.shape[1]:
+            raise ValueError(f"Expected vectors of dimension {self._matrix.shape[1]}, got {vectors.shape[1]}")
+
+        needed = self._size + count
+        if self._matrix.shape[1] != vectors.shape[1] or needed > self._matrix.shape[0] or not self._matrix.flags.writeable:
+            # Grow geometrically (and copy off read-only memmaps) so inserts stay amortized O(1)
+            capacity = max(needed, 2 * self._matrix.shape[0], 16)
+            grown = np.empty((capacity, vectors.shape[1]), dtype=np.float32)
+            if self._size:
+                grown[:self._size] = self._matrix[:self._size]
+            self._matrix = grown
+        self._matrix[self._size:needed] = vectors
+        if self.ann_index is not None:
+            if self.ann_index.size:
+                self.ann_index.add(vectors, start=self._size)
+            else:
+                self.ann_index.build(self._matrix[:needed])
+        self._size = needed
+
+        ids = list(ids) if ids is not None else [str(uuid.uuid4()) for _ in range(count)]
+        self.ids.extend(ids)
+        self.texts.extend(texts)
+        self.metadatas.extend(metadatas or [{} for _ in range(count)])
+        if self.keyword_index is not None:
+            self.keyword_index.build(self.texts)
+        return ids
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: list[dict] | None = None,
+        *,
+        ids: list[str] | None = None,
+        **kwargs: Any
+    ) -> list[str]:
+        texts = list(texts)
+        vectors = np.asarray(self.embedding.embed_documents(texts), dtype=np.float32)
+        return self.add_vectors(vectors, texts, metadatas, ids)
+
+    def get_by_ids(self, ids) -> list[Document]:
+        positions = {doc_id: i for i, doc_id in enumerate(self.ids)}
+        return [self._document(positions[doc_id]) for doc_id in ids if doc_id in positions]
+
+    def _document(self, i: int) -> Document:
+        return Document(id=self.ids[i], page_content=self.texts[i], metadata=self.metadatas[i])
+
+    def documents(self, rows) -> list[Document]:
+        return [self._document(i) for i in rows]
+
+    def _rows(
+        self,
+        scores: np.ndarray,
+        k: int,
+        filter: Callable[[Document], bool] | None
+    ) -> list[tuple[int, float]]:
+        if filter is None:
+            return [(int(i), float(scores[i])) for i in top_k(scores, k)]
+
+        # Walk candidates best-first until k of them pass the filter
+        results = []
+        for i in np.argsort(-scores, kind="stable"):
+            if filter(self._document(i)):
+                results.append((int(i), float(scores[i])))
+                if len(results) == k:
+                    break
+        return results
+
+    def search_rows_by_vector(
+        self,
+        embedding: list[float],
+        k: int = 4,
+        filter: Callable[[Document], bool] | None = None
+    ) -> list[tuple[int, float]]:
+        """Top k (row, cosine score) pairs, best first."""
+        if self._size == 0:
+            return []
+        query = normalize_rows(np.asarray(embedding, dtype=np.float32))
+        if self.ann_index is not None and filter is None:
+            indices, scores = self.ann_index.search(self.matrix, query[None, :], k)
+            return [(int(i), float(score)) for i, score in zip(indices[0], scores[0])]
+        return self._rows(self.matrix @ query, k, filter)
+
+    def similarity_search_with_score_by_vector(
+        self,
+        embedding: list[float],
+        k: int = 4,
+        filter: Callable[[Document], bool] | None = None,
+        **kwargs: Any
+    ) -> list[tuple[Document, float]]:
+        return [(self._document(i), score) for i, score in self.search_rows_by_vector(embedding, k, filter)]
+
+    def similarity_search_by_vector(self, embedding: list[float], k: int = 4, **kwargs: Any) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, **kwargs)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> list[tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(self.embedding.embed_query(query), k, **kwargs)
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def batch_similarity_search_by_vector(
+        self,
+        embeddings: list[list[float]],
+        k: int = 4
+    ) -> list[list[tuple[Document, float]]]:
+        """Searches several query vectors with one matrix product."""
+        if self._size == 0:
+            return [[] for _ in embeddings]
+        queries = normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        if self.ann_index is not None:
+            indices, scores = self.ann_index.search(self.matrix, queries, k)
+            return [
+                [(self._document(i), float(score)) for i, score in zip(row_indices, row_scores)]
+                for row_indices, row_scores in zip(indices, scores)
+            ]
+        scores = queries @ self.matrix.T
+        return [
+            [(self._document(i), float(row[i])) for i in indices]
+            for row, indices in zip(scores, top_k(scores, k))
+        ]
+
+    def batch_similarity_search(self, queries: list[str], k: int = 4) -> list[list[Document]]:
+        vectors = [self.embedding.embed_query(query) for query in queries]
+        return [
+            [doc for doc, _ in results]
+            for results in self.batch_similarity_search_by_vector(vectors, k)
+        ]
+
+    def delete(self, ids: list[str] | None = None, **kwargs: Any) -> None:
+        if ids is None:
+            return
+        drop = set(ids)
+        keep = [i for i, doc_id in enumerate(self.ids) if doc_id not in drop]
+        self._matrix = np.ascontiguousarray(self.matrix[keep])
+        self._size = len(keep)
+        self.ids = [self.ids[i] for i in keep]
+        self.texts = [self.texts[i] for i in keep]
+        self.metadatas = [self.metadatas[i] for i in keep]
+        # Row positions shifted, so the ANN and keyword indexes are rebuilt
+        self.set_ann_index(self.ann_index)
+        if self.keyword_index is not None:
+            self.keyword_index.build(self.texts)
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        # Scores are already cosine similarities
+        return lambda score: score
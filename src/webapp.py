@@ -0,0 +1,27 @@
+"""
+Server app
+
+Mounted by the LangGraph server through http.app in langgraph.json. Its lifespan
+runs once when the server starts, and that is where the retrieval indexes start
+building in the background. Importing an agent module (tests, scripts, the CLIs)
+never starts network or embedding work; set RAG_WARM_UP=1 to warm up at import
+outside the server.
+"""
+
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    from brainstorming_agent.utils.tools import index_manager as brainstorming_index
+    from src.utils.indexing import index_manager
+
+    # The first retrieval blocks only if its index has not finished building yet
+    for manager in (index_manager, brainstorming_index):
+        manager.warm_up()
+    yield
+
+
+app = Starlette(lifespan=lifespan)
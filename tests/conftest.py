@@ -0,0 +1,15 @@
+"""
+Shared test setup.
+
+Tests run offline from the project root (python -m pytest). Provider clients are
+constructed at import time but never called, background warm-up is off, and
+labels and checkpoints stay in memory.
+"""
+
+import os
+
+for variable in ("OPENAI_API_KEY", "ANTHROPIC_API_KEY", "TAVILY_API_KEY"):
+    os.environ.setdefault(variable, "test")
+os.environ["RAG_WARM_UP"] = "0"
+os.environ["LABEL_STORE_PATH"] = ":memory:"
+os.environ.setdefault("USER_AGENT", "bsky-collective-eng-tests")
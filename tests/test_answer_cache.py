@@ -0,0 +1,93 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END
+from langgraph.types import Command
+
+from benchmarks.fakes import ScriptedChatModel
+from benchmarks.relevance_grading import HashingEmbeddings
+from brainstorming_agent.agent import workflow
+from brainstorming_agent.utils import nodes
+from src.utils.semantic_cache import SemanticCache
+
+QUESTION = "What does a Bluesky labeler do?"
+
+
+@pytest.fixture
+def model(monkeypatch):
+    model = ScriptedChatModel(latency=0.0)
+    calls = []
+    monkeypatch.setattr(nodes, "_get_model", lambda name: calls.append(name) or model)
+    monkeypatch.setattr(nodes, "answer_cache", SemanticCache(HashingEmbeddings()))
+    return calls
+
+
+def answered(messages, tool_name=None):
+    # The state generate_answer sees after retrieval: the question, the tool call and its result
+    tool_name = tool_name or nodes.retriever_tool.name
+    return {"messages": [
+        *messages,
+        AIMessage(content="", tool_calls=[{"name": tool_name, "args": {"query": "q"}, "id": "call_1"}]),
+        ToolMessage(content="Labelers assign labels to posts and accounts.", name=tool_name, tool_call_id="call_1"),
+    ]}
+
+
+def test_opening_question_is_answered_from_the_cache(model):
+    answer = nodes.generate_answer(answered([HumanMessage(QUESTION)]))["messages"][0].content
+
+    update = nodes.call_model({"messages": [HumanMessage(QUESTION)]}, {})
+
+    assert update["messages"][0].content == answer
+    assert model == ["openai"] # only generate_answer reached the model
+
+
+def test_unrelated_question_misses(model):
+    nodes.generate_answer(answered([HumanMessage(QUESTION)]))
+
+    nodes.call_model({"messages": [HumanMessage("How do I publish a post with images?")]}, {})
+
+    assert model == ["openai", "openai"]
+    assert nodes.answer_cache.stats()["misses"] == 1
+
+
+def test_follow_up_questions_are_isolated(model):
+    earlier_turn = [HumanMessage("Tell me about moderation lists"), AIMessage(content="They are shared block lists.")]
+    # Answered in another thread as a follow-up: not stored
+    nodes.generate_answer(answered([*earlier_turn, HumanMessage("Can you elaborate?")]))
+    assert nodes.answer_cache.stats()["entries"] == 0
+
+    # Stored as an opening question, but not served as a follow-up in another thread
+    nodes.generate_answer(answered([HumanMessage(QUESTION)]))
+    nodes.call_model({"messages": [*earlier_turn, HumanMessage(QUESTION)]}, {})
+    assert nodes.answer_cache.stats()["hits"] == 0
+    assert model == ["openai", "openai", "openai"]
+
+
+def test_answers_from_web_search_are_not_cached(model):
+    nodes.generate_answer(answered([HumanMessage(QUESTION)], tool_name="tavily_search_results_json"))
+
+    assert nodes.answer_cache.stats()["entries"] == 0
+
+
+def test_cached_answer_is_routed_to_feedback(model):
+    cached = nodes.call_model({"messages": [HumanMessage(QUESTION)]}, {})["messages"]
+    assert nodes.route_agent({"messages": cached}) == END # nothing cached yet: a direct reply ends the turn
+
+    nodes.generate_answer(answered([HumanMessage(QUESTION)]))
+    cached = nodes.call_model({"messages": [HumanMessage(QUESTION)]}, {})["messages"]
+    assert cached[0].name == nodes.CACHED
+    assert nodes.route_agent({"messages": cached}) == "give_feedback"
+
+
+def test_feedback_is_collected_after_a_cache_hit(model):
+    answer = nodes.generate_answer(answered([HumanMessage(QUESTION)]))["messages"][0].content
+    graph = workflow.compile(checkpointer=InMemorySaver())
+    config = {"configurable": {"thread_id": "cached"}}
+
+    state = graph.invoke({"messages": [HumanMessage(QUESTION)]}, config)
+    assert state["messages"][-1].content == answer
+    assert state["__interrupt__"][0].value == "Please share feedback:"
+    assert model == ["openai"] # the cached answer needed no model call
+
+    state = graph.invoke(Command(resume="Very helpful"), config)
+    assert state["messages"][-1].content == "Very helpful"
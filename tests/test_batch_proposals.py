@@ -0,0 +1,104 @@
+import re
+
+import pytest
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.types import Command
+
+from benchmarks.fakes import ScriptedChatModel
+from src import batch_proposal_agent
+from src.models.custom_schema import LabelValueDefinition, Locale
+from src.utils.label_store import LabelStore
+
+
+def _label(messages) -> dict:
+    identifier = re.search(r"Label (\w+)", messages[-1].content).group(1)
+    return {
+        "identifier": identifier,
+        "severity": "inform",
+        "blurs": "none",
+        "default_setting": "warn",
+        "locales": [{"lang": "en", "name": identifier.title(), "description": f"Posts about {identifier}"}],
+    }
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    store = LabelStore(":memory:")
+    model = ScriptedChatModel(latency=0.0, structured={"LabelValueDefinition": _label})
+    monkeypatch.setattr(batch_proposal_agent, "get_label_store", lambda: store)
+    monkeypatch.setattr(batch_proposal_agent, "get_model", lambda name, **kwargs: model.with_structured_output(LabelValueDefinition))
+    (tmp_path / "requests.csv").write_text("request\nLabel spam\nLabel gore\n", encoding="utf-8")
+    return store
+
+
+@pytest.fixture
+def graph(store, tmp_path):
+    return batch_proposal_agent.build_workflow(str(tmp_path)).compile(checkpointer=InMemorySaver())
+
+
+def _start(graph):
+    config = {"configurable": {"thread_id": "batch"}}
+    state = graph.invoke({"source": "requests.csv", "output": "proposals.jsonl", "requests_per_second": 100}, config)
+    return state, config
+
+
+def test_review_lists_existing_labels_and_reports_new_versions(store, graph):
+    store.put(LabelValueDefinition(identifier="spam", locales=[Locale(lang="en", name="Spam")]))
+
+    state, config = _start(graph)
+    assert state["__interrupt__"][0].value["existing_versions"] == {"spam": 1}
+
+    state = graph.invoke(Command(resume={"default": "approve"}), config)
+    assert state["labels"] == {"spam": 2, "gore": 1}
+    assert state["new_versions"] == ["spam"]
+
+
+def test_invalid_edit_saves_nothing(store, graph, tmp_path):
+    state, config = _start(graph)
+
+    edited_label = {"identifier": "Gore!", "locales": [{"lang": "en", "name": "Gore"}]}
+    edit = {"type": "edit", "edited_label": edited_label}
+    with pytest.raises(ValueError, match="gore"):
+        graph.invoke(Command(resume={"default": "approve", "decisions": {"gore": edit}}), config)
+
+    assert len(store) == 0
+    assert not (tmp_path / "proposals.approved.jsonl").exists()
+
+
+@pytest.mark.parametrize("field", ["source", "output", "approved_output"])
+def test_paths_outside_the_batch_directory_are_refused(graph, field):
+    state = {"source": "requests.csv", "output": "proposals.jsonl", field: "../outside.jsonl"}
+
+    with pytest.raises(ValueError, match="outside the batch directory"):
+        graph.invoke(state, {"configurable": {"thread_id": field}})
+
+
+@pytest.mark.parametrize("resume, approved", [("approve", 2), (True, 2), ("reject", 0), (False, 0)])
+def test_review_accepts_shorthand(store, graph, resume, approved):
+    state, config = _start(graph)
+
+    state = graph.invoke(Command(resume=resume), config)
+    assert state["approved"] == approved
+    assert state["rejected"] == 2 - approved
+    assert len(store) == approved
+
+
+@pytest.mark.parametrize("resume", ["yes", 1, {"default": "edit"}, {"decisions": {"gore": {"type": "edit"}}}])
+def test_review_rejects_malformed_resume(store, graph, resume):
+    state, config = _start(graph)
+
+    with pytest.raises(ValueError, match="gore|Resume the review"):
+        graph.invoke(Command(resume=resume), config)
+    assert len(store) == 0
+
+
+def test_workflow_is_confined_to_its_directory(store, tmp_path):
+    other = tmp_path / "other"
+    other.mkdir()
+    (other / "requests.csv").write_text("request\nLabel spam\n", encoding="utf-8")
+    graph = batch_proposal_agent.build_workflow(str(other)).compile(checkpointer=InMemorySaver())
+
+    state, config = _start(graph)
+    assert state["proposed"] == 1
+    assert (other / "proposals.jsonl").exists()
+    assert not (tmp_path / "proposals.jsonl").exists()
@@ -0,0 +1,76 @@
+import sqlite3
+
+from langchain_core.messages import AIMessage
+from langgraph.graph import END, START, MessagesState, StateGraph
+from langgraph.types import Command, interrupt
+
+from src.utils.checkpointing import BatchedSqliteSaver
+
+
+def build_graph(saver, ask: bool = False):
+    def respond(state):
+        if ask:
+            interrupt("approve?")
+        return {"messages": [AIMessage(content="reply")]}
+
+    workflow = StateGraph(MessagesState)
+    workflow.add_node("respond", respond)
+    workflow.add_edge(START, "respond")
+    workflow.add_edge("respond", END)
+    return workflow.compile(checkpointer=saver)
+
+
+def other_process(path):
+    # A second connection stands in for another worker; timeout=0 fails instead of waiting on a lock
+    return sqlite3.connect(path, timeout=0, check_same_thread=False)
+
+
+def test_run_is_committed_when_invoke_returns(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite")
+    saver = BatchedSqliteSaver.from_path(path)
+    config = {"configurable": {"thread_id": "one"}}
+    build_graph(saver).invoke({"messages": [("user", "hi")]}, config)
+
+    assert not saver.conn.in_transaction
+    other = other_process(path)
+    assert other.execute("SELECT COUNT(*) FROM checkpoints WHERE thread_id = 'one'").fetchone()[0] > 0
+    other.execute("DELETE FROM writes WHERE thread_id = 'missing'")
+    other.commit()
+
+    # The other process's saver resumes from the same state
+    reopened = BatchedSqliteSaver(other_process(path))
+    state = build_graph(reopened).get_state(config)
+    assert [message.content for message in state.values["messages"]] == ["hi", "reply"]
+
+
+def test_interrupt_is_committed_and_resumable_elsewhere(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite")
+    saver = BatchedSqliteSaver.from_path(path)
+    config = {"configurable": {"thread_id": "two"}}
+    result = build_graph(saver, ask=True).invoke({"messages": [("user", "hi")]}, config)
+    assert "__interrupt__" in result
+    assert not saver.conn.in_transaction
+
+    resumed = build_graph(BatchedSqliteSaver(other_process(path)), ask=True).invoke(Command(resume="yes"), config)
+    assert resumed["messages"][-1].content == "reply"
+
+
+def test_commits_once_per_superstep(tmp_path):
+    saver = BatchedSqliteSaver.from_path(str(tmp_path / "checkpoints.sqlite"))
+    graph = build_graph(saver)
+    graph.invoke({"messages": [("user", "hi")]}, {"configurable": {"thread_id": "three"}})
+    # Fewer commits than writes: each step's task writes ride along with its checkpoint
+    stats = saver.stats()
+    assert stats["pending_writes"] == 0
+    assert 0 < stats["commits"] < stats["checkpoints"] + stats["writes"]
+
+
+def test_stray_writes_are_committed_by_the_timer(tmp_path):
+    saver = BatchedSqliteSaver.from_path(str(tmp_path / "checkpoints.sqlite"), commit_interval=0.05)
+    with saver.cursor() as cur:
+        cur.execute("DELETE FROM writes WHERE thread_id = 'missing'")
+    assert saver.stats()["pending_writes"] == 1
+
+    saver._timer.join(1)
+    assert saver.stats()["pending_writes"] == 0
+    assert not saver.conn.in_transaction
@@ -0,0 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.relevance_grading import HashingEmbeddings
+from src.utils.embedding_cache import CachedEmbeddings, SQLiteEmbeddingStore
+
+
+class CountingEmbeddings(HashingEmbeddings):
+    def __init__(self):
+        super().__init__(size=64)
+        self.texts = []
+
+    def embed_documents(self, texts):
+        self.texts += texts
+        return super().embed_documents(texts)
+
+    def embed_query(self, text):
+        self.texts.append(text)
+        return super().embed_query(text)
+
+
+def test_repeated_text_is_embedded_once():
+    underlying = CountingEmbeddings()
+    cache = CachedEmbeddings(underlying, batch_size=2)
+
+    first = cache.embed_documents(["a b", "c d", "a b", "e f"])
+    second = cache.embed_documents(["e f", "a b"])
+
+    assert underlying.texts == ["a b", "c d", "e f"]
+    assert second == [first[3], first[0]]
+    stats = cache.stats()
+    assert (stats["misses"], stats["model_calls"], stats["memory_hits"]) == (3, 2, 2)
+
+
+def test_disk_tier_survives_a_new_wrapper(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite")
+    vector = CachedEmbeddings(CountingEmbeddings(), store=SQLiteEmbeddingStore(path)).embed_query("labels")
+
+    underlying = CountingEmbeddings()
+    cache = CachedEmbeddings(underlying, store=SQLiteEmbeddingStore(path))
+    assert cache.embed_query("labels") == vector
+    assert underlying.texts == []
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_counters_are_consistent_under_concurrency():
+    cache = CachedEmbeddings(CountingEmbeddings())
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(cache.embed_query, [f"query {i}" for i in range(400)]))
+
+    stats = cache.stats()
+    assert stats["model_calls"] == stats["misses"] == 400
@@ -0,0 +1,24 @@
+from benchmarks.relevance_grading import HashingEmbeddings
+from brainstorming_agent.utils.grading import LocalRelevanceScorer
+
+QUESTION = "How do I publish labels from a Bluesky labeler?"
+
+
+def test_unrelated_chunks_are_left_to_the_llm_by_default():
+    scorer = LocalRelevanceScorer(HashingEmbeddings())
+
+    verdicts = scorer.settle(QUESTION, ["Sourdough needs a long cold proof overnight."])
+
+    assert verdicts == [None]
+
+
+def test_near_verbatim_chunk_is_accepted_locally():
+    scorer = LocalRelevanceScorer(HashingEmbeddings())
+
+    assert scorer.settle(QUESTION, [QUESTION]) == ["yes"]
+
+
+def test_reject_threshold_opts_in_to_local_rejection():
+    scorer = LocalRelevanceScorer(HashingEmbeddings(), reject_threshold=0.25)
+
+    assert scorer.settle(QUESTION, ["Sourdough needs a long cold proof overnight."]) == ["no"]
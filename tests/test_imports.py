@@ -0,0 +1,16 @@
+import sys
+
+
+def test_agents_share_one_import_root():
+    import brainstorming_agent.agent  # noqa: F401
+    import src.batch_proposal_agent  # noqa: F401
+    import src.coordinator_agent  # noqa: F401
+
+    # Importing src modules as utils.* or models.* as well would give two copies
+    # of every cache, index manager and schema class
+    assert not [name for name in sys.modules if name.split(".")[0] in ("utils", "models")]
+
+    from brainstorming_agent.utils import nodes
+    from src import researcher_agent
+    from src.utils import embedding_cache
+    assert nodes.get_embeddings is embedding_cache.get_embeddings is researcher_agent.get_embeddings
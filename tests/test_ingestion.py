@@ -0,0 +1,96 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from benchmarks.relevance_grading import HashingEmbeddings
+from brainstorming_agent.utils import rag_utils
+from src.utils.persistent_index import PersistentIndex
+
+DELAY = 0.3
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the documentation sites: /slow/<n> pages, /flaky fails once, /down always fails."""
+    failures: dict[str, int] = {}
+
+    def do_GET(self):
+        failed = self.failures.get(self.path, 0)
+        if self.path == "/down" or (self.path == "/flaky" and not failed):
+            self.failures[self.path] = failed + 1
+            self.send_error(503)
+            return
+        time.sleep(DELAY)
+        body = f"<html><body><p>Page {self.path} about Bluesky labelers.</p></body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(rag_utils, "RETRY_BACKOFF", 0.0)
+    StandInHandler.failures = {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_sources_are_fetched_concurrently(server):
+    urls = [f"{server}/slow/{n}" for n in range(6)]
+
+    start = time.perf_counter()
+    splits = rag_utils.preprocess_docs(urls, max_workers=6)
+    elapsed = time.perf_counter() - start
+
+    assert {split.metadata["source"] for split in splits} == set(urls)
+    # One round of fetches, not six in a row
+    assert elapsed < 3 * DELAY
+
+
+def test_failed_fetches_are_retried_then_skipped(server):
+    splits = rag_utils.preprocess_docs([f"{server}/flaky", f"{server}/down"], retries=1)
+
+    assert [split.metadata["source"] for split in splits] == [f"{server}/flaky"]
+    assert StandInHandler.failures == {"/flaky": 1, "/down": 2}
+
+
+class RecordingEmbeddings(HashingEmbeddings):
+    batches: list = []
+
+    def embed_documents(self, texts):
+        self.batches = [*self.batches, texts]
+        return super().embed_documents(texts)
+
+
+def test_splits_are_embedded_as_each_source_arrives(server, tmp_path):
+    index = PersistentIndex(tmp_path / "index", RecordingEmbeddings())
+
+    rag_utils.preprocess_docs([f"{server}/slow/{n}" for n in range(3)], index=index)
+
+    assert len(index.embeddings.batches) == 3
+
+
+def test_unchanged_sources_are_not_embedded_again(tmp_path):
+    pages = {name: tmp_path / f"{name}.md" for name in ("labelers", "feeds")}
+    pages["labelers"].write_text("Labelers assign labels to posts.", encoding="utf-8")
+    pages["feeds"].write_text("Custom feeds pick posts.", encoding="utf-8")
+    sources = [str(path) for path in pages.values()]
+    PersistentIndex(tmp_path / "index", RecordingEmbeddings()).update(rag_utils.preprocess_docs(sources))
+
+    # A new process: nothing in the embedding cache, only the manifest on disk
+    pages["feeds"].write_text("Custom feeds pick and rank posts.", encoding="utf-8")
+    index = PersistentIndex(tmp_path / "index", RecordingEmbeddings())
+    splits = rag_utils.preprocess_docs(sources, index=index)
+
+    assert index.embeddings.batches == [["Custom feeds pick and rank posts."]]
+    assert index.update(splits)["reused"] == 1
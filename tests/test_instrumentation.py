@@ -0,0 +1,147 @@
+from typing import TypedDict
+
+import pytest
+from langchain_core.tools import tool
+from langgraph.graph import END, START, StateGraph
+
+from benchmarks.fakes import ScriptedChatModel
+from src.utils import instrumentation
+from src.utils.instrumentation import (
+    Histogram,
+    InstrumentationHandler,
+    MetricsRegistry,
+    instrument_graph,
+    instrument_node,
+    metrics,
+)
+
+
+class State(TypedDict, total=False):
+    question: str
+    answer: str
+
+
+@tool
+def lookup(query: str) -> str:
+    """Looks up a query."""
+    return f"Result for {query}"
+
+
+model = ScriptedChatModel(latency=0.0, metadata={"model_profile": "fake"})
+
+
+@instrument_node
+def prepare(state: State) -> dict:
+    return {"question": state["question"].strip()}
+
+
+@instrument_node(name="answer")
+def answer_question(state: State) -> dict:
+    context = lookup.invoke({"query": state["question"]})
+    return {"answer": model.invoke(f"{state['question']}\n{context}").text}
+
+
+@instrument_node
+def fail(state: State) -> dict:
+    raise RuntimeError("boom")
+
+
+def _graph(*nodes):
+    workflow = StateGraph(State)
+    previous = START
+    for node in nodes:
+        workflow.add_node(node.__name__, node)
+        workflow.add_edge(previous, node.__name__)
+        previous = node.__name__
+    workflow.add_edge(previous, END)
+    return instrument_graph(workflow.compile())
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    assert instrumentation.INSTRUMENTATION
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def _series(snapshot: dict, name: str) -> dict:
+    return {tuple(sorted(series["labels"].items())): series for series in snapshot["histograms"].get(name, [])}
+
+
+def test_graph_runs_record_node_model_and_tool_spans():
+    graph = _graph(prepare, answer_question)
+    for i in range(3):
+        graph.invoke({"question": f" question {i} "})
+
+    snapshot = metrics.snapshot()
+    nodes = _series(snapshot, "node_seconds")
+    assert {labels: series["count"] for labels, series in nodes.items()} == {
+        (("node", "answer"),): 3,
+        (("node", "prepare"),): 3,
+    }
+    llm = _series(snapshot, "llm_seconds")
+    assert llm[(("model", "fake"), ("node", "answer_question"))]["count"] == 3
+    tools = _series(snapshot, "tool_seconds")
+    assert tools[(("node", "answer_question"), ("tool", "lookup"))]["count"] == 3
+
+    tokens = {series["labels"]["direction"]: series["value"] for series in snapshot["counters"]["llm_tokens_total"]}
+    assert tokens["input"] > 0 and tokens["output"] > 0
+    assert "errors_total" not in snapshot["counters"]
+
+    text = metrics.prometheus()
+    assert 'node_seconds_count{node="prepare"} 3' in text
+    assert 'node_seconds_bucket{node="prepare",le="+Inf"} 3' in text
+    assert 'llm_seconds_count{model="fake",node="answer_question"} 3' in text
+
+
+def test_failing_node_is_timed_and_counted():
+    graph = _graph(prepare, fail)
+    with pytest.raises(RuntimeError):
+        graph.invoke({"question": "question"})
+
+    snapshot = metrics.snapshot()
+    assert _series(snapshot, "node_seconds")[(("node", "fail"),)]["count"] == 1
+    assert snapshot["counters"]["errors_total"] == [{"labels": {"kind": "node_seconds", "name": "fail"}, "value": 1}]
+
+
+def test_bucket_boundaries_are_inclusive():
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 1.0, 1.5):
+        histogram.observe(value)
+
+    # Prometheus buckets are "less than or equal", so a value on a bound lands in that bucket
+    assert histogram.counts == [2, 2, 1]
+    assert histogram.count == 5
+    assert histogram.sum == pytest.approx(3.15)
+    assert histogram.quantile(0.5) == pytest.approx(0.1 + 0.9 * 0.25)
+    assert histogram.quantile(1.0) == 1.0
+
+
+def test_prometheus_text_format():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.observe("node_seconds", 0.05, node="prepare")
+    registry.observe("node_seconds", 0.5, node="prepare")
+    registry.observe("node_seconds", 2.0, node="prepare")
+    registry.inc("errors_total", kind="node_seconds", name="prepare")
+
+    assert registry.prometheus() == (
+        "# TYPE node_seconds histogram\n"
+        'node_seconds_bucket{node="prepare",le="0.1"} 1\n'
+        'node_seconds_bucket{node="prepare",le="1.0"} 2\n'
+        'node_seconds_bucket{node="prepare",le="+Inf"} 3\n'
+        'node_seconds_sum{node="prepare"} 2.55\n'
+        'node_seconds_count{node="prepare"} 3\n'
+        "# TYPE errors_total counter\n"
+        'errors_total{kind="node_seconds",name="prepare"} 1.0\n'
+    )
+
+
+def test_handler_records_into_its_registry():
+    registry = MetricsRegistry()
+    model.invoke("Hello", config={"callbacks": [InstrumentationHandler(registry)]})
+
+    snapshot = registry.snapshot()
+    assert [series["count"] for series in snapshot["histograms"]["llm_seconds"]] == [1]
+    assert snapshot["histograms"]["llm_seconds"][0]["labels"] == {"model": "fake", "node": ""}
+    assert metrics.snapshot() == {"histograms": {}, "counters": {}}
@@ -0,0 +1,52 @@
+import pytest
+
+from benchmarks.relevance_grading import HashingEmbeddings
+from src.utils.keyword_index import KeywordIndex, hybrid_search, identifier_terms
+from src.utils.vector_store import NumpyVectorStore
+
+TEXTS = [
+    "Labelers publish an app.bsky.labeler.service record with a defaultSetting per label.",
+    "Reports use reason codes such as com.atproto.moderation.defs#reasonOther.",
+    "The service is identified by did:plc:ewvi7nxzyoun6zhxrhs64oiz.",
+    "How to set-up a well-known JavaScript client for the labeler.",
+    "Set up the well known starter kit with JavaScript and Node.",
+    "Labels can blur media or the whole post.",
+]
+
+
+class CountingEmbeddings(HashingEmbeddings):
+    queries: int = 0
+
+    def embed_query(self, text):
+        self.queries += 1
+        return super().embed_query(text)
+
+
+@pytest.fixture
+def store():
+    store = NumpyVectorStore.from_texts(TEXTS, CountingEmbeddings())
+    store.keyword_index = KeywordIndex().build(store.texts)
+    return store
+
+
+@pytest.mark.parametrize("query", [
+    "app.bsky.labeler.service",
+    "what does defaultSetting do",
+    "com.atproto.moderation.defs#reasonOther",
+    "did:plc:ewvi7nxzyoun6zhxrhs64oiz",
+])
+def test_identifier_queries_skip_the_embedding_call(store, query):
+    assert identifier_terms(query)
+
+    hybrid_search(store, query, k=1)
+
+    assert store.embedding.queries == 0
+
+
+@pytest.mark.parametrize("query", ["how do I set-up a labeler", "well-known JavaScript examples"])
+def test_compound_words_still_use_the_vector_ranking(store, query):
+    assert identifier_terms(query) == []
+
+    hybrid_search(store, query, k=1)
+
+    assert store.embedding.queries == 1
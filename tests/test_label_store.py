@@ -0,0 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from src.models.custom_schema import LabelValueDefinition, Locale
+from src.utils.label_store import LabelStore, merge_label_refs
+
+
+def label(identifier, name=None, severity="inform"):
+    return LabelValueDefinition(identifier=identifier, severity=severity, locales=[Locale(lang="en", name=name or identifier)])
+
+
+def test_versions_and_references():
+    store = LabelStore(":memory:")
+    assert store.put(label("spam_links")) == 1
+    assert store.put(label("spam_links", severity="alert")) == 2
+
+    assert store.get("spam_links").severity == "alert"
+    assert store.get("spam_links", 1).severity == "inform"
+    assert store.get_many({"spam_links": 1})["spam_links"].severity == "inform"
+    assert merge_label_refs({"spam_links": 1, "gore": 1}, {"spam_links": 2}) == {"spam_links": 2, "gore": 1}
+
+
+def test_search_and_suggestions():
+    store = LabelStore(":memory:")
+    store.put_many([label("spam_links", "Spam links"), label("scam_offers", "Scam offers"), label("gore")])
+
+    assert store.search("spam")["results"][0].startswith("spam_links v1")
+    assert "spam_links" in store.suggest("spam_lnks")
+    assert store.page(page_size=2)["pages"] == 2
+
+
+def test_stores_sharing_a_file_agree_on_versions(tmp_path):
+    # Two stores on one file stand in for two worker processes
+    path = str(tmp_path / "labels.sqlite")
+    first, second = LabelStore(path), LabelStore(path)
+
+    assert first.put(label("spam_links")) == 1
+    assert second.put(label("spam_links", "Spam links v2")) == 2
+    second.put(label("rumors", "Unverified rumors"))
+
+    assert first.version("spam_links") == 2
+    assert "rumors" in first and len(first) == 2
+    assert first.get("spam_links").locales[0].name == "Spam links v2"
+    assert first.suggest("rumor") == ["rumors"]
+
+
+def test_concurrent_saves_of_one_identifier_get_distinct_versions(tmp_path):
+    path = str(tmp_path / "labels.sqlite")
+    stores = [LabelStore(path) for _ in range(4)]
+
+    with ThreadPoolExecutor(4) as pool:
+        versions = list(pool.map(lambda i: stores[i % 4].put(label("spam_links")), range(40)))
+
+    assert sorted(versions) == list(range(1, 41))
+    assert all(store.version("spam_links") == 40 for store in stores)
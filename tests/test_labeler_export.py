@@ -0,0 +1,36 @@
+import pytest
+
+from src.batch_proposal_agent import validate_label
+from src.models.custom_schema import LabelValueDefinition, Locale
+from src.utils.labeler_export import build_declaration, to_record_identifiers
+
+
+def _label(identifier: str) -> LabelValueDefinition:
+    return LabelValueDefinition(identifier=identifier, locales=[Locale(lang="en", name=identifier)])
+
+
+@pytest.mark.parametrize("identifier", ["spam_2024", "Spam", "spam.links", "x" * 101])
+def test_proposals_are_held_to_the_export_rule(identifier):
+    with pytest.raises(ValueError, match="can't be exported"):
+        validate_label(_label(identifier))
+
+
+def test_snake_case_proposal_exports_with_hyphens():
+    label = validate_label(_label("spam_links"))
+
+    assert build_declaration([label]).policies.labelValues == ["spam-links"]
+
+
+def test_export_leaves_the_callers_definitions_alone():
+    labels = [_label("spam_links"), _label("gore")]
+
+    records = to_record_identifiers(labels)
+    build_declaration(labels)
+
+    assert [label.identifier for label in records] == ["spam-links", "gore"]
+    assert [label.identifier for label in labels] == ["spam_links", "gore"]
+
+
+def test_colliding_identifiers_are_rejected():
+    with pytest.raises(ValueError, match="declared twice"):
+        to_record_identifiers([_label("spam_links"), _label("spam-links")])
@@ -0,0 +1,62 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.documents import Document
+
+from benchmarks import import_budget
+from benchmarks.relevance_grading import HashingEmbeddings
+from src.utils.indexing import IndexManager, IndexRetriever
+from src.utils.vector_store import NumpyVectorStore
+
+
+# Far above the benchmark's budget: only work at import (an index build, a network
+# fetch) should fail this, not a slow or busy machine
+LOOSE_IMPORT_BUDGET = 6 * import_budget.DEFAULT_BUDGET
+
+
+def test_brainstorming_graph_import_does_no_work():
+    probe = import_budget.probe()
+
+    assert import_budget.MODULE in probe["modules"]
+    assert not probe["index_built"]
+    assert probe["embedding_clients"] == []
+    assert probe["connections"] == []
+    # Provider packages are imported only when a profile using them is built
+    assert "langchain_ollama" not in probe["modules"]
+    assert probe["seconds"] < LOOSE_IMPORT_BUDGET
+
+
+def _slow_builder(calls):
+    def build(refresh=False):
+        calls.append(threading.current_thread().name)
+        time.sleep(0.2)
+        return NumpyVectorStore.from_documents(
+            [Document(page_content="Labelers assign labels to posts."), Document(page_content="Feeds rank posts.")],
+            HashingEmbeddings(),
+        )
+    return build
+
+
+def test_index_is_built_on_first_retrieval():
+    calls = []
+    manager = IndexManager(builder=_slow_builder(calls))
+    retriever = IndexRetriever(manager=manager, k=1, hybrid=False)
+    assert calls == []
+
+    docs = retriever.invoke("Who assigns labels?")
+
+    assert docs[0].page_content == "Labelers assign labels to posts."
+    assert len(calls) == 1
+
+
+def test_concurrent_first_retrievals_share_one_build():
+    calls = []
+    manager = IndexManager(builder=_slow_builder(calls))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        stores = list(pool.map(lambda _: manager.get(), range(8)))
+
+    assert len(calls) == 1
+    assert all(store is stores[0] for store in stores)
+    assert manager.stats()["misses"] + manager.stats()["hits"] == 8
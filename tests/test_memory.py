@@ -0,0 +1,39 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from benchmarks.fakes import ScriptedChatModel
+from brainstorming_agent.utils import nodes
+from src.utils.memory import ConversationMemory, is_user_message
+
+
+def _retrieval(question: str, n: int) -> list:
+    call = {"name": "retrieve", "args": {"query": question}, "id": f"call_{n}"}
+    return [AIMessage(content="", tool_calls=[call]), ToolMessage(content="context " * 200, name="retrieve", tool_call_id=f"call_{n}")]
+
+
+def _turn_with_rewrite(question: str, n: int) -> list:
+    # What the brainstorming graph leaves behind when the first retrieval is graded irrelevant
+    rewritten = nodes.rewrite_question({"messages": [HumanMessage(question)]})["messages"][0]
+    return [HumanMessage(question), *_retrieval(question, n), rewritten, *_retrieval(rewritten.content, n + 1), AIMessage(content="answer")]
+
+
+def test_rewritten_questions_do_not_start_turns(monkeypatch):
+    monkeypatch.setattr(nodes, "_get_model", lambda name: ScriptedChatModel(latency=0.0))
+    first, second = _turn_with_rewrite("What is a labeler?", 1), _turn_with_rewrite("How are labels published?", 3)
+    messages = [*first, *second]
+
+    assert not is_user_message(second[3])
+    assert ConversationMemory(lambda summary, messages: "", keep_turns=1)._recent_start(messages) == len(first)
+    assert nodes._latest_question(messages) == "How are labels published?"
+
+
+def test_summary_is_not_a_user_question():
+    memory = ConversationMemory(lambda summary, messages: "they asked about labelers", token_budget=50, keep_turns=1)
+    messages = [HumanMessage("What is a labeler?"), *_retrieval("labeler", 1), AIMessage(content="answer"), HumanMessage("Thanks!")]
+
+    compacted = memory.compact(messages)
+
+    assert compacted[0].text.startswith("Summary of the earlier conversation")
+    assert not nodes._is_user_question(compacted, 0)
+    assert nodes._cacheable_question(compacted) is None
+    # A later compaction still finds the single real turn and leaves it alone
+    assert memory._recent_start(compacted) == 1
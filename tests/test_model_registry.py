@@ -0,0 +1,132 @@
+import pytest
+from langchain_core.tools import tool
+from pydantic import BaseModel
+
+from benchmarks.fakes import ScriptedChatModel
+from src.utils.model_registry import ModelRegistry, provider_settings
+
+PROFILES = {
+    "claude": {"provider": "anthropic", "model": "claude-sonnet-4-5-20250929", "max_tokens": 100},
+    "gpt": {"provider": "openai", "model": "gpt-4o-mini", "temperature": 0},
+}
+
+
+class Verdict(BaseModel):
+    approved: bool
+
+
+@tool
+def retrieve_documents(query: str) -> str:
+    """Search the docs."""
+    return query
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    for provider in ("", "_OPENAI", "_ANTHROPIC"):
+        for variable in ("MODEL_TIMEOUT", "MODEL_MAX_RETRIES", "MODEL_MAX_CONNECTIONS", "MODEL_POOL_TIMEOUT"):
+            monkeypatch.delenv(variable + provider, raising=False)
+    registry = ModelRegistry(PROFILES)
+    yield registry
+    registry.close()
+
+
+def test_variants_are_cached(registry):
+    model = registry.get("gpt")
+    assert registry.get("gpt") is model
+
+    structured = registry.get("gpt", structured_output=Verdict)
+    assert registry.get("gpt", structured_output=Verdict) is structured
+    assert structured is not model
+
+    tools = registry.get("gpt", tools=[retrieve_documents])
+    assert registry.get("gpt", tools=[retrieve_documents]) is tools
+    assert registry.get("gpt", tools=[retrieve_documents], tool_choice="any") is not tools
+
+
+def test_unknown_profile(registry):
+    with pytest.raises(ValueError, match="Unsupported model type"):
+        registry.get("missing")
+
+
+def test_register_replaces_variants(registry):
+    structured = registry.get("gpt", structured_output=Verdict)
+    fake = ScriptedChatModel(latency=0.0)
+    registry.register("gpt", fake)
+
+    assert registry.get("gpt") is fake
+    assert registry.get("gpt", structured_output=Verdict) is not structured
+    assert fake.metadata["model_profile"] == "gpt"
+
+
+def test_provider_overrides(monkeypatch):
+    monkeypatch.setenv("MODEL_TIMEOUT", "5")
+    monkeypatch.setenv("MODEL_TIMEOUT_OPENAI", "3")
+    monkeypatch.setenv("MODEL_MAX_RETRIES_ANTHROPIC", "4")
+    monkeypatch.delenv("MODEL_TIMEOUT_ANTHROPIC", raising=False)
+    monkeypatch.delenv("MODEL_MAX_RETRIES", raising=False)
+    monkeypatch.delenv("MODEL_MAX_RETRIES_OPENAI", raising=False)
+
+    assert provider_settings("openai")["timeout"] == 3.0
+    assert provider_settings("openai")["max_retries"] == 2
+    assert provider_settings("anthropic")["timeout"] == 5.0
+    assert provider_settings("anthropic")["max_retries"] == 4
+
+
+def test_settings_applied_per_profile(registry, monkeypatch):
+    monkeypatch.setenv("MODEL_TIMEOUT_OPENAI", "3")
+    monkeypatch.setenv("MODEL_MAX_RETRIES_ANTHROPIC", "4")
+    monkeypatch.setenv("MODEL_MAX_CONNECTIONS_ANTHROPIC", "7")
+
+    gpt = registry.get("gpt")
+    assert gpt.request_timeout == 3.0
+    assert gpt.max_retries == 2
+    assert gpt.temperature == 0
+    assert gpt.metadata["model_profile"] == "gpt"
+    assert gpt.callbacks == [registry.metrics]
+    assert gpt.root_client._client is registry.http_client("openai")
+
+    claude = registry.get("claude")
+    assert claude.default_request_timeout == 10.0
+    assert claude.max_retries == 4
+    assert claude.max_tokens == 100
+    assert claude.metadata["model_profile"] == "claude"
+
+
+def test_anthropic_uses_shared_pool(registry, monkeypatch):
+    monkeypatch.setenv("MODEL_MAX_CONNECTIONS_ANTHROPIC", "7")
+    claude = registry.get("claude")
+
+    sync_pool = registry.http_client("anthropic")
+    async_pool = registry.http_client("anthropic", is_async=True)
+    assert claude._client._client is sync_pool
+    assert claude._async_client._client is async_pool
+    assert sync_pool._transport._pool._max_connections == 7
+    # The SDK client still carries the model's own settings
+    assert claude._client.max_retries == claude.max_retries
+    assert claude._client.timeout == claude.default_request_timeout
+
+
+def test_metrics_count_calls(registry):
+    registry.register("fake", ScriptedChatModel(latency=0.0, callbacks=[registry.metrics]))
+    model = registry.get("fake")
+    for _ in range(3):
+        model.invoke("Hello")
+
+    stats = registry.metrics.snapshot()["models"]["fake"]
+    assert stats["calls"] == 3
+    assert stats["errors"] == 0
+    assert stats["mean_latency"] >= 0.0
+
+
+def test_metrics_count_provider_requests(registry):
+    registry.metrics.record_request("openai")
+    registry.metrics.record_request("openai")
+    registry.metrics.record_response("openai", 429)
+    registry.metrics.record_response("openai", 200)
+
+    assert registry.metrics.snapshot()["providers"]["openai"] == {
+        "requests": 2,
+        "retryable_responses": 1,
+        "retries": 2,
+    }
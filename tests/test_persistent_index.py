@@ -0,0 +1,99 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from langchain_core.documents import Document
+
+from benchmarks.relevance_grading import HashingEmbeddings
+from src.utils.persistent_index import PersistentIndex
+from src.utils.vector_store import normalize_rows
+
+
+class CountingEmbeddings(HashingEmbeddings):
+    embedded: int = 0
+
+    def embed_documents(self, texts):
+        self.embedded += len(texts)
+        return super().embed_documents(texts)
+
+
+def _docs(source: str, *texts: str) -> list[Document]:
+    return [Document(page_content=text, metadata={"source": source}) for text in texts]
+
+
+def test_only_changed_sources_are_embedded_again(tmp_path):
+    embeddings = CountingEmbeddings()
+    index = PersistentIndex(tmp_path, embeddings)
+    labelers = _docs("labelers.md", "Labelers assign labels to posts.", "Users subscribe to labelers.")
+    feeds = _docs("feeds.md", "Custom feeds pick posts.")
+    assert index.update(labelers + feeds) == {"reused": 0, "embedded": 3, "removed_sources": 0}
+
+    stats = index.update(labelers + _docs("feeds.md", "Custom feeds pick and rank posts."))
+
+    assert stats == {"reused": 2, "embedded": 1, "removed_sources": 0}
+    assert embeddings.embedded == 4
+
+
+def test_restart_loads_from_disk_without_embedding(tmp_path):
+    PersistentIndex(tmp_path, CountingEmbeddings()).update(
+        _docs("labelers.md", "Labelers assign labels to posts.") + _docs("feeds.md", "Custom feeds pick posts.")
+    )
+    embeddings = CountingEmbeddings()
+
+    restarted = PersistentIndex(tmp_path, embeddings)
+    assert restarted.load()
+    store = restarted.to_vector_store()
+
+    assert embeddings.embedded == 0
+    assert store.similarity_search("Which service assigns labels to posts?", k=1)[0].metadata["source"] == "labelers.md"
+
+
+def test_failed_fetch_keeps_the_previous_chunks(tmp_path):
+    index = PersistentIndex(tmp_path, CountingEmbeddings())
+    index.update(_docs("https://example.com/a", "Labelers assign labels.") + _docs("https://example.com/b", "Feeds rank posts."))
+
+    stats = index.update(_docs("https://example.com/a", "Labelers assign labels."), keep_sources=["https://example.com/b"])
+
+    assert stats["removed_sources"] == 0
+    assert [chunk["text"] for chunk in index.chunks] == ["Labelers assign labels.", "Feeds rank posts."]
+
+
+def test_index_built_with_another_model_is_not_loaded(tmp_path):
+    PersistentIndex(tmp_path, CountingEmbeddings()).update(_docs("labelers.md", "Labelers assign labels."))
+
+    assert not PersistentIndex(tmp_path, HashingEmbeddings()).load()
+
+
+class SlowEmbeddings(HashingEmbeddings):
+    def embed_documents(self, texts):
+        time.sleep(0.05)  # long enough for the other writer to get in between
+        return super().embed_documents(texts)
+
+
+def _build(path, n: int) -> None:
+    docs = [doc for i in range(3) for doc in _docs(f"writer-{n}-{i}.md", f"Writer {n} document {i} about labelers.")]
+    PersistentIndex(path, SlowEmbeddings()).update(docs)
+
+
+def _assert_consistent(path):
+    index = PersistentIndex(path, SlowEmbeddings())
+    assert index.load()
+    expected = normalize_rows(np.array(HashingEmbeddings().embed_documents([chunk["text"] for chunk in index.chunks])))
+    assert np.allclose(np.asarray(index.matrix), expected, atol=1e-6)
+    assert sorted(p.name for p in Path(path).iterdir()) == [".lock", "embeddings.f32", "keywords.npz", "manifest.json"]
+
+
+def test_concurrent_updates_leave_a_consistent_index(tmp_path):
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda n: _build(tmp_path, n), range(4)))
+
+    _assert_consistent(tmp_path)
+
+
+def test_updates_from_separate_processes_are_serialized(tmp_path):
+    with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("fork")) as pool:
+        list(pool.map(_build, [tmp_path] * 4, range(4)))
+
+    _assert_consistent(tmp_path)
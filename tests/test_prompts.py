@@ -0,0 +1,54 @@
+import pytest
+from langchain.agents import create_agent
+from langchain_anthropic.middleware import AnthropicPromptCachingMiddleware
+from langchain_core.messages import SystemMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+from benchmarks.fakes import ScriptedChatModel
+from src.coordinator_agent import COORDINATOR_AGENT_PROMPT
+from src.utils.prompts import assemble_prompt, prompt_cache_middleware
+
+
+def test_assemble_prompt_is_deterministic():
+    sections = ("  Intro:\n", "", "Definition\n\n", "   ", "Rules")
+    assert assemble_prompt(*sections) == "Intro:\n\nDefinition\n\nRules\n"
+    # Changing a later section leaves the bytes before it untouched
+    changed = assemble_prompt(*sections[:-1], "Other rules")
+    assert changed.startswith("Intro:\n\nDefinition\n\n")
+
+
+def test_system_prompt_prefix_is_identical_across_turns():
+    requests = []
+
+    def script(messages):
+        requests.append([(type(message).__name__, message.text) for message in messages])
+        return None
+
+    agent = create_agent(
+        model=ScriptedChatModel(latency=0.0, script=script),
+        system_prompt=COORDINATOR_AGENT_PROMPT,
+        checkpointer=InMemorySaver(),
+    )
+    config = {"configurable": {"thread_id": "prompts"}}
+    for question in ("What is a labeler?", "Label posts with spam links", "Summarize the conversation"):
+        agent.invoke({"messages": [{"role": "user", "content": question}]}, config)
+
+    assert len(requests) == 3
+    for request in requests:
+        assert request[0] == (SystemMessage.__name__, COORDINATOR_AGENT_PROMPT)
+    # Every turn resends the previous turn's request unchanged and only appends to it
+    for previous, request in zip(requests, requests[1:]):
+        assert request[:len(previous)] == previous
+        assert len(request) == len(previous) + 2
+
+
+def test_anthropic_gets_prompt_caching():
+    middleware = prompt_cache_middleware("anthropic")
+    assert len(middleware) == 1
+    assert isinstance(middleware[0], AnthropicPromptCachingMiddleware)
+    assert middleware[0].ttl == "5m"
+
+
+@pytest.mark.parametrize("provider", ["openai", "ollama", "custom"])
+def test_other_providers_get_no_middleware(provider):
+    assert prompt_cache_middleware(provider) == []
@@ -0,0 +1,17 @@
+import tiktoken
+
+from brainstorming_agent.utils import rag_utils
+
+
+def test_splitting_needs_no_tokenizer_download(monkeypatch, tmp_path):
+    def no_download(*args, **kwargs):
+        raise AssertionError("tiktoken encodings are downloaded on first use")
+    monkeypatch.setattr(tiktoken, "get_encoding", no_download)
+    monkeypatch.setattr(tiktoken, "encoding_for_model", no_download)
+    source = tmp_path / "labelers.md"
+    source.write_text("\n\n".join(f"Paragraph {n} about labelers and how they label posts. " * 5 for n in range(20)), encoding="utf-8")
+
+    splits = rag_utils.preprocess_docs([str(source)])
+
+    assert len(splits) > 1
+    assert all(len(split.page_content) <= rag_utils.CHUNK_SIZE * rag_utils.CHARS_PER_TOKEN for split in splits)
@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+from src.models.custom_schema import LabelValueDefinition, Locale
+from src.utils.label_store import LabelStore
+from src.utils import starter_kit
+from src.utils.starter_kit import generate_project, ts_string
+
+OLD = 1_000_000_000 # seconds; any rewrite moves a file's mtime away from this
+
+
+def _label(description: str) -> LabelValueDefinition:
+    return LabelValueDefinition(
+        identifier="spam_links",
+        severity="alert",
+        locales=[Locale(lang="en", name="Spam 'links'", description=description)],
+    )
+
+
+@pytest.fixture
+def store():
+    store = LabelStore(":memory:")
+    store.put(_label("Links to C:\\spam\nand more"))
+    store.put(LabelValueDefinition(identifier="gore", locales=[Locale(lang="en", name="Gore")]))
+    return store
+
+
+def _age(project) -> dict[str, int]:
+    mtimes = {}
+    for path in project.rglob("*"):
+        if path.is_file():
+            os.utime(path, (OLD, OLD))
+            mtimes[path.relative_to(project).as_posix()] = path.stat().st_mtime_ns
+    return mtimes
+
+
+def _rewritten(project, mtimes) -> list[str]:
+    return sorted(name for name, mtime in mtimes.items() if (project / name).stat().st_mtime_ns != mtime)
+
+
+def test_label_strings_are_escaped_typescript_literals(store, tmp_path):
+    generate_project(tmp_path / "kit", store)
+
+    constants = (tmp_path / "kit" / "src" / "constants.ts").read_text(encoding="utf-8")
+    assert "identifier: 'spam-links'," in constants
+    assert "name: 'Spam \\'links\\''" in constants
+    assert "description: 'Links to C:\\\\spam\\nand more'" in constants
+    assert ts_string("it's") == "'it\\'s'"
+    assert "severity: label.severity ?? 'inform'," in (tmp_path / "kit" / "src" / "set-labels.ts").read_text(encoding="utf-8")
+
+
+def test_regenerating_the_same_labels_rewrites_nothing(store, tmp_path):
+    project = tmp_path / "kit"
+    generate_project(project, store)
+    mtimes = _age(project)
+
+    hits = starter_kit._parse_template.cache_info().hits
+    result = generate_project(project, store)
+
+    assert result["written"] == []
+    assert starter_kit._parse_template.cache_info().hits == hits + 1 # template not parsed again
+    assert _rewritten(project, mtimes) == []
+
+
+def test_changing_one_label_rewrites_only_constants(store, tmp_path):
+    project = tmp_path / "kit"
+    generate_project(project, store)
+    mtimes = _age(project)
+
+    store.put(_label("Links to known spam domains"))
+    result = generate_project(project, store)
+
+    assert result["written"] == ["src/constants.ts"]
+    assert _rewritten(project, mtimes) == ["src/constants.ts"]
+    assert "Links to known spam domains" in (project / "src" / "constants.ts").read_text(encoding="utf-8")
@@ -0,0 +1,123 @@
+import asyncio
+import time
+
+from typing import TypedDict
+
+import pytest
+from langchain.agents import create_agent
+from langchain_core.tools import tool
+from langgraph.graph import END, START, MessagesState, StateGraph
+from pydantic import BaseModel
+
+from benchmarks.coordinator_load import _conversation, build_coordinator
+from benchmarks.fakes import ScriptedChatModel
+from src import coordinator_agent, researcher_agent
+from src.utils.streaming import stream_agent
+
+
+@pytest.fixture
+def coordinator(monkeypatch):
+    # build_coordinator swaps the sub-agents for fakes; monkeypatch puts the real ones back
+    for module, name in [(researcher_agent, "researcher_agent"), (researcher_agent, "answer_cache"), (coordinator_agent, "feedback_agent")]:
+        monkeypatch.setattr(module, name, getattr(module, name))
+    return build_coordinator(latency=0.05, token_latency=0.02)
+
+
+def test_sub_agent_tokens_reach_the_coordinator_stream_as_they_arrive(coordinator):
+    async def collect():
+        start, events = time.perf_counter(), []
+        async for event in coordinator.astream(_conversation(0), stream_mode="custom"):
+            events.append((time.perf_counter() - start, event))
+        return events, time.perf_counter() - start
+
+    events, total = asyncio.run(collect())
+
+    tokens = {}
+    for _, event in events:
+        if event["type"] == "token":
+            tokens[event["agent"]] = tokens.get(event["agent"], "") + event["content"]
+    assert tokens["researcher"].startswith("Research: label posts about topic 0")
+    assert tokens["feedback"].startswith("Feedback: label posts about topic 0")
+    first_token = next(seconds for seconds, event in events if event["type"] == "token")
+    assert first_token < total / 2
+
+
+def _helper_agent():
+    @tool
+    def lookup(query: str) -> str:
+        """Looks up labeler documentation."""
+        return "Labelers assign labels to posts."
+
+    return create_agent(ScriptedChatModel(latency=0.0, tool_calls=[("lookup", "query")]), tools=[lookup])
+
+
+class State(TypedDict):
+    answer: str
+
+
+def _stream_through_graph(agent, **kwargs) -> list[dict]:
+    def node(state):
+        return {"answer": stream_agent(agent, "helper", "What do labelers do?", **kwargs)}
+
+    graph = StateGraph(State)
+    graph.add_node(node)
+    graph.add_edge(START, "node")
+    return list(graph.compile().stream({"answer": ""}, stream_mode="custom"))
+
+
+def test_sub_agent_tool_results_are_forwarded():
+    events = _stream_through_graph(_helper_agent())
+
+    assert {"agent": "helper", "type": "tool", "name": "lookup", "content": "Labelers assign labels to posts."} in events
+
+
+def test_outside_a_graph_run_only_the_answer_is_returned():
+    answer = stream_agent(_helper_agent(), "helper", "What do labelers do?")
+
+    assert answer == "Answer: What do labelers do? | Labelers assign labels to posts."
+
+
+class Grade(BaseModel):
+    binary_score: str
+
+
+def _tokens(events: list[dict]) -> str:
+    return "".join(event["content"] for event in events if event["type"] == "token")
+
+
+def test_structured_output_tokens_are_not_forwarded():
+    grader = ScriptedChatModel(latency=0.0, structured={"Grade": {"binary_score": "yes"}}).with_structured_output(Grade)
+
+    @tool
+    def lookup(query: str) -> str:
+        """Looks up labeler documentation and keeps it if relevant."""
+        return f"Labelers assign labels to posts ({grader.invoke(query).binary_score})."
+
+    agent = create_agent(ScriptedChatModel(latency=0.0, tool_calls=[("lookup", "query")]), tools=[lookup])
+    events = _stream_through_graph(agent)
+
+    assert _tokens(events) == "Answer: What do labelers do? | Labelers assign labels to posts (yes)."
+    assert "binary_score" not in str(events)
+
+
+def test_structured_output_node_tokens_are_not_forwarded():
+    # A hand-built sub-agent that grades in its own node, like the brainstorming graph's grade_documents
+    model = ScriptedChatModel(latency=0.0, structured={"Grade": {"binary_score": "yes"}})
+
+    def grade(state):
+        model.with_structured_output(Grade).invoke(state["messages"])
+        return {}
+
+    def answer(state):
+        return {"messages": [model.invoke(state["messages"])]}
+
+    graph = StateGraph(MessagesState)
+    graph.add_node(grade)
+    graph.add_node(answer)
+    graph.add_edge(START, "grade")
+    graph.add_edge("grade", "answer")
+    graph.add_edge("answer", END)
+    events = _stream_through_graph(graph.compile(), nodes=("answer",))
+
+    assert _tokens(events) == "Answer: What do labelers do?"
+    assert "binary_score" not in str(events)
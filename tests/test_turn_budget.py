@@ -0,0 +1,90 @@
+import pytest
+from langchain_core.messages import HumanMessage, SystemMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+from benchmarks.fakes import ScriptedChatModel
+from benchmarks.relevance_grading import HashingEmbeddings
+from brainstorming_agent import agent
+from brainstorming_agent.utils import budget, nodes
+from brainstorming_agent.utils.grading import LocalRelevanceScorer
+from brainstorming_agent.utils.tools import index_manager, retriever_tool
+from src.utils.semantic_cache import SemanticCache
+from src.utils.vector_store import NumpyVectorStore
+
+CHUNK = "Labelers publish an app.bsky.labeler.service record declaring their labels."
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+        self.step = 0.0 # seconds each grading call takes
+
+    def time(self) -> float:
+        return self.now
+
+
+def _retrieve_on_questions(messages):
+    # The agent model retrieves for every question it is asked, rewritten or not
+    if isinstance(messages[0], SystemMessage) and isinstance(messages[-1], HumanMessage):
+        return [(retriever_tool.name, {"query": messages[-1].content})]
+    return None
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    clock = Clock()
+    grades = []
+
+    def grade(messages):
+        grades.append(clock.now)
+        clock.now += clock.step
+        return {"binary_score": "no"}
+
+    model = ScriptedChatModel(latency=0.0, script=_retrieve_on_questions)
+    grader = ScriptedChatModel(latency=0.0, structured={"EvaluateDocument": grade})
+    monkeypatch.setattr(budget, "time", clock)
+    monkeypatch.setattr(nodes, "_get_model", lambda name: model)
+    monkeypatch.setattr(nodes, "get_model", lambda name, structured_output=None: grader.with_structured_output(structured_output))
+    # Nothing is settled locally, so every chunk reaches the grader
+    monkeypatch.setattr(nodes, "local_scorer", LocalRelevanceScorer(HashingEmbeddings(), accept_threshold=2.0))
+    monkeypatch.setattr(nodes, "answer_cache", SemanticCache(HashingEmbeddings()))
+    builder = index_manager._builder
+    index_manager.set_builder(lambda refresh=False: NumpyVectorStore.from_texts([CHUNK], HashingEmbeddings()))
+    yield agent.workflow.compile(checkpointer=InMemorySaver()), clock, grades
+    index_manager.set_builder(builder)
+
+
+def _ask(graph, **budget_state):
+    config = {"configurable": {"thread_id": "turn"}}
+    return graph.invoke({"messages": [HumanMessage("How does a labeler declare its labels?")], **budget_state}, config)
+
+
+def test_rewrites_stop_at_max_rewrites(graph):
+    graph, _, grades = graph
+
+    state = _ask(graph)
+
+    assert state["rewrites"] == budget.MAX_REWRITES
+    assert len(grades) == budget.MAX_REWRITES + 1
+    assert "__interrupt__" in state # answered, now waiting for feedback
+
+
+def test_rewrites_stop_when_the_turn_runs_out_of_time(graph):
+    graph, clock, grades = graph
+    # Each grading takes 0.6 of the turn's time budget on the fake clock
+    clock.step = 0.6 * budget.MAX_TURN_SECONDS
+
+    state = _ask(graph, max_rewrites=10)
+
+    assert state["rewrites"] == 1
+    assert len(grades) == 2
+
+
+def test_exhausted_budget_answers_from_the_best_context(graph):
+    graph, _, _ = graph
+
+    state = _ask(graph)
+
+    assert state["relevant_docs"] == 0
+    assert state["best_context"] == CHUNK
+    assert state["messages"][-1].content.endswith(f"Context: {CHUNK}")
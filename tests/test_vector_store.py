@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.utils import ann_index
+from src.utils.ann_index import IVFIndex, make_ann_index
+from src.utils.vector_store import NumpyVectorStore, normalize_rows
+
+
+def random_vectors(n, dim=16, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+def test_exact_search_matches_brute_force():
+    vectors = random_vectors(200)
+    store = NumpyVectorStore.from_matrix(vectors, [str(i) for i in range(200)], [{} for _ in range(200)], DeterministicFakeEmbedding(size=16))
+    query = random_vectors(1, seed=1)[0]
+
+    rows = [row for row, _ in store.search_rows_by_vector(query, k=5)]
+
+    expected = np.argsort(-(normalize_rows(vectors) @ normalize_rows(query)))[:5]
+    assert rows == expected.tolist()
+
+
+def test_ann_index_is_rebuilt_after_the_store_is_emptied():
+    store = NumpyVectorStore(DeterministicFakeEmbedding(size=16), ann_index=IVFIndex(n_probe=4))
+    ids = store.add_vectors(random_vectors(2), ["a", "b"])
+    store.delete(ids)
+    assert store.ann_index.size == 0
+
+    store.add_vectors(random_vectors(3, seed=2), ["c", "d", "e"])
+
+    assert store.ann_index.size == 3
+    query = random_vectors(3, seed=2)[1]
+    assert store.similarity_search_by_vector(query, k=1)[0].page_content == "d"
+
+
+def test_search_config_without_mode_uses_the_default(monkeypatch):
+    monkeypatch.setattr(ann_index, "SEARCH_MODE", "ivf")
+    index = make_ann_index({"n_probe": 4})
+    assert isinstance(index, IVFIndex) and index.n_probe == 4
+
+    monkeypatch.setattr(ann_index, "SEARCH_MODE", "exact")
+    assert make_ann_index() is None
+    with pytest.raises(ValueError):
+        make_ann_index({"n_probe": 4})
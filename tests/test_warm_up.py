@@ -0,0 +1,23 @@
+import os
+import subprocess
+import sys
+
+# Runs in a fresh interpreter, with warm_up replaced by a marker, so the import is the only trigger
+SNIPPET = (
+    "from src.utils import indexing; "
+    "indexing.IndexManager.warm_up = lambda self: print('warm-up'); "
+    "import brainstorming_agent.agent, src.researcher_agent"
+)
+
+
+def _import_agents(**env) -> str:
+    env = {key: value for key, value in {**os.environ, **env}.items() if value is not None}
+    return subprocess.run([sys.executable, "-c", SNIPPET], capture_output=True, text=True, env=env, check=True).stdout
+
+
+def test_importing_the_agents_does_not_warm_up_the_index():
+    assert "warm-up" not in _import_agents(RAG_WARM_UP=None)
+
+
+def test_warm_up_at_import_is_opt_in():
+    assert "warm-up" in _import_agents(RAG_WARM_UP="1")